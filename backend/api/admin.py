@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import DengueStatistic, Estado, Municipio, CasoDengue, DashboardCache
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .models import DengueStatistic, SecaoEstatistica, Estado, Municipio, CasoDengue, DashboardCache, TarefaCarga
 
 @admin.register(DengueStatistic)
 class DengueStatisticAdmin(admin.ModelAdmin):
@@ -7,6 +10,12 @@ class DengueStatisticAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     search_fields = ['name']
 
+@admin.register(SecaoEstatistica)
+class SecaoEstatisticaAdmin(admin.ModelAdmin):
+    list_display = ['estatistica', 'secao']
+    list_filter = ['estatistica']
+    search_fields = ['secao']
+
 @admin.register(Estado)
 class EstadoAdmin(admin.ModelAdmin):
     list_display = ['nome', 'codigo_uf', 'total_casos']
@@ -30,6 +39,51 @@ class CasoDengueAdmin(admin.ModelAdmin):
 
 @admin.register(DashboardCache)
 class DashboardCacheAdmin(admin.ModelAdmin):
-    list_display = ['cache_key', 'expires_at', 'created_at']
-    readonly_fields = ['created_at']
-    search_fields = ['cache_key']
\ No newline at end of file
+    list_display = ['cache_key', 'tamanho', 'acertos_memoria', 'acertos_banco', 'faltas', 'taxa_acertos',
+                    'acessado_em', 'expires_at', 'expirada']
+    readonly_fields = ['cache_key', 'expires_at', 'created_at', 'tamanho', 'acertos_memoria', 'acertos_banco',
+                       'faltas', 'acessado_em']
+    exclude = ['data']
+    search_fields = ['cache_key']
+    ordering = ['-acessado_em']
+    actions = ['remover_expiradas']
+    change_list_template = 'admin/api/dashboardcache/change_list.html'
+
+    @admin.display(description='Acertos (%)')
+    def taxa_acertos(self, obj):
+        acertos = obj.acertos_memoria + obj.acertos_banco
+        total = acertos + obj.faltas
+        return f'{acertos / total * 100:.1f}' if total else '-'
+
+    @admin.display(description='Expirada', boolean=True)
+    def expirada(self, obj):
+        return obj.expires_at <= timezone.now()
+
+    @admin.action(description='Remover as entradas expiradas')
+    def remover_expiradas(self, request, queryset):
+        removidas, _ = queryset.filter(expires_at__lte=timezone.now()).delete()
+        self.message_user(request, f'{removidas} entradas expiradas removidas.')
+
+    def changelist_view(self, request, extra_context=None):
+        # Inclui os contadores ainda não gravados por este processo
+        gravar_contadores = getattr(cache, 'gravar_contadores', None)
+        if gravar_contadores is not None:
+            gravar_contadores()
+
+        totais = DashboardCache.objects.aggregate(
+            entradas=Count('id'), tamanho=Sum('tamanho'), acertos_memoria=Sum('acertos_memoria'),
+            acertos_banco=Sum('acertos_banco'), faltas=Sum('faltas'),
+            expiradas=Count('id', filter=Q(expires_at__lte=timezone.now()))
+        )
+        totais = {campo: valor or 0 for campo, valor in totais.items()}
+        acessos = totais['acertos_memoria'] + totais['acertos_banco'] + totais['faltas']
+        totais['taxa_acertos'] = (
+            (totais['acertos_memoria'] + totais['acertos_banco']) / acessos * 100 if acessos else None
+        )
+        return super().changelist_view(request, {**(extra_context or {}), 'totais_cache': totais})
+
+@admin.register(TarefaCarga)
+class TarefaCargaAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'status', 'progresso', 'etapa', 'created_at', 'concluida_em']
+    list_filter = ['tipo', 'status']
+    readonly_fields = ['created_at', 'updated_at', 'iniciada_em', 'concluida_em']
\ No newline at end of file
@@ -1,6 +1,33 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def _processo_servidor():
+    """
+    Verdadeiro só nos processos reconhecidos como servidor
+
+    runserver (no processo filho do autoreloader, que é o que atende),
+    gunicorn (arbiter carregado) e uwsgi (módulo uwsgi embutido). Qualquer
+    outro ponto de entrada (comandos do manage.py, pytest, scripts,
+    python -c) não é servidor.
+    """
+    programa = os.path.basename(sys.argv[0]) if sys.argv else ''
+    if programa in ('manage.py', 'django-admin', '__main__.py') and sys.argv[1:2] == ['runserver']:
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+    return 'gunicorn.arbiter' in sys.modules or 'uwsgi' in sys.builtin_module_names
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        aquecer = getattr(settings, 'DENGUE_AQUECER_AO_INICIAR', None)
+        if aquecer is None:
+            aquecer = _processo_servidor()
+        if aquecer:
+            from .aquecimento import aquecer_na_inicializacao
+            aquecer_na_inicializacao()
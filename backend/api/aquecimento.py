@@ -0,0 +1,111 @@
+"""
+Aquecimento do cache: payloads de todos os endpoints calculados antes do tráfego
+
+Os endpoints fixos de views.py e views_advanced.py se registram em
+respostas.PAYLOADS (@payload) e cache_versionado.ENTRADAS (@em_cache); o
+aquecimento percorre esses registros, estatística por estatística, na
+versão atual dos dados.
+
+Roda em três momentos:
+
+- na inicialização de cada processo do servidor (ApiConfig.ready), antes
+  de ele atender requisições: reaproveita o que já está no cache
+  compartilhado e só calcula o que falta, deixando as respostas prontas na
+  memória do processo;
+- ao fim de cada carga de estatísticas (tarefas.py), recalculando tudo da
+  versão nova;
+- sob demanda, com `manage.py aquecer_cache`.
+"""
+
+import importlib
+import logging
+import time
+import warnings
+
+from .cache_versionado import ENTRADAS, aquecer, obter
+from .condicional import versao_estatisticas
+from .cubo import obter_cubo
+from .respostas import PAYLOADS, corpos_prontos, pre_renderizar
+
+# Módulos cujas views registram os payloads (importados só no aquecimento,
+# pois as views dependem de tarefas.py, que usa este módulo)
+MODULOS_VIEWS = ('api.views', 'api.views_advanced')
+
+logger = logging.getLogger(__name__)
+
+
+def estatisticas_registradas():
+    """
+    Estatísticas de origem dos payloads e entradas registrados pelas views
+    """
+    for modulo in MODULOS_VIEWS:
+        importlib.import_module(modulo)
+    origens = {estatistica for estatistica, _ in PAYLOADS.values()}
+    origens.update(estatistica for estatistica, _ in ENTRADAS.values())
+    return sorted(origens)
+
+
+def aquecer_estatistica(estatistica, forcar=False):
+    """
+    Prepara os payloads de uma estatística na versão atual
+
+    Com forcar (após uma carga), recalcula e regrava todos; sem forcar,
+    só calcula os que faltam no cache compartilhado. Devolve os nomes dos
+    endpoints e entradas aquecidos ([] se a estatística não foi carregada).
+    """
+    if forcar:
+        return pre_renderizar(estatistica) + aquecer(estatistica)
+
+    versao = versao_estatisticas(estatistica)()
+    if versao is None:
+        return []
+
+    aquecidos = []
+    for endpoint, (origem, _) in PAYLOADS.items():
+        if origem == estatistica:
+            corpos_prontos(endpoint, versao[0])
+            aquecidos.append(endpoint)
+    for nome, (origem, _) in ENTRADAS.items():
+        if origem == estatistica:
+            obter(nome, versao[0])
+            aquecidos.append(nome)
+    return aquecidos
+
+
+def aquecer_tudo(forcar=False):
+    """
+    Aquece todas as estatísticas registradas e carrega o cubo de casos
+
+    Devolve {estatística: nomes aquecidos}, com 'cubo' (['cubo'] se o
+    arquivo existir).
+    """
+    resultado = {
+        estatistica: aquecer_estatistica(estatistica, forcar)
+        for estatistica in estatisticas_registradas()
+    }
+    resultado['cubo'] = ['cubo'] if obter_cubo() is not None else []
+    return resultado
+
+
+def aquecer_na_inicializacao():
+    """
+    Aquecimento chamado por ApiConfig.ready(); erros só são registrados
+
+    Um processo que não conseguiu aquecer (ex.: migrações pendentes) sobe
+    mesmo assim e calcula os payloads no primeiro acesso.
+    """
+    inicio = time.monotonic()
+    try:
+        with warnings.catch_warnings():
+            # O acesso ao banco durante a inicialização é intencional aqui
+            warnings.filterwarnings(
+                'ignore', message='Accessing the database during app initialization', category=RuntimeWarning
+            )
+            resultado = aquecer_tudo()
+    except Exception:
+        logger.exception('Falha ao aquecer o cache na inicialização')
+        return None
+
+    total = sum(len(nomes) for nomes in resultado.values())
+    logger.info('Cache aquecido na inicialização: %d payloads em %.2fs', total, time.monotonic() - inicio)
+    return resultado
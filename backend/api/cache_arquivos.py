@@ -0,0 +1,38 @@
+"""
+Backend de cache em arquivos compartilhado entre os processos do servidor
+
+É o FileBasedCache do Django com add() atômico entre processos: a entrada é
+escrita num arquivo temporário e publicada com os.link, que falha se outro
+processo já criou o arquivo. Com isso cache.add() serve de trava para que só
+um worker recalcule uma entrada ausente (ver cache_versionado.py).
+"""
+
+import os
+import tempfile
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class CacheEmArquivos(FileBasedCache):
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        self._cull()
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as f:
+                self._write_content(f, timeout, value)
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, fname)
+                    return True
+                except FileExistsError:
+                    if self.has_key(key, version):
+                        return False
+                    # Arquivo expirado: remove e tenta publicar mais uma vez
+                    self._delete(fname)
+            return False
+        finally:
+            os.remove(tmp_path)
@@ -0,0 +1,285 @@
+"""
+Backend de cache em dois níveis: memória do processo sobre a tabela DashboardCache
+
+O primeiro nível (L1) é um dict LRU em memória, limitado em bytes
+(MEMORIA_MAXIMA) e com validade curta (TEMPO_MEMORIA), que serve as leituras
+repetidas sem consulta ao banco. O segundo nível (L2) é a tabela
+DashboardCache, compartilhada pelos workers e preservada entre reinícios:
+um worker recém-iniciado lê dela os valores já calculados em vez de
+recalculá-los.
+
+Só get() usa o L1; has_key(), add() e delete() vão direto ao banco, de modo
+que as travas de cálculo (cache_versionado.obter_compartilhado) continuam
+valendo entre processos. add() é atômico pela restrição única de cache_key.
+Os valores do L1 são devolvidos sem cópia e não devem ser alterados.
+
+As gravações removem periodicamente (INTERVALO_VARREDURA) as linhas
+expiradas e, acima de MAX_ENTRIES, as menos acessadas. Os acertos (L1 e L2)
+e as faltas são contados em memória e gravados nas linhas em lote
+(INTERVALO_CONTADORES), para não transformar cada leitura numa escrita; os
+totais aparecem no admin de DashboardCache.
+"""
+
+import base64
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DashboardCache
+
+MEMORIA_MAXIMA = 64 * 1024 * 1024
+TEMPO_MEMORIA = 300
+
+# Intervalos (segundos) entre varreduras das expiradas e gravações dos contadores
+INTERVALO_VARREDURA = 60
+INTERVALO_CONTADORES = 10
+
+SEM_EXPIRACAO = datetime.max.replace(tzinfo=dt_timezone.utc)
+
+ACERTO_MEMORIA, ACERTO_BANCO, FALTA = range(3)
+CAMPOS_CONTADORES = ('acertos_memoria', 'acertos_banco', 'faltas')
+
+# O Django cria uma instância do backend por thread: o L1 e os contadores
+# ficam aqui, um por LOCATION, para valerem no processo todo
+_memorias = {}
+_memorias_lock = threading.Lock()
+
+
+class _Memoria:
+    """
+    L1 de um processo: chave -> (valor, expira em (epoch), tamanho em bytes)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entradas = OrderedDict()
+        self.ocupada = 0
+        self.contadores = {}
+        self.contada_em = time.monotonic()
+        self.varrida_em = None
+
+    def contar(self, chave, tipo):
+        with self.lock:
+            self.contadores.setdefault(chave, [0, 0, 0])[tipo] += 1
+
+    def obter(self, chave, agora):
+        with self.lock:
+            entrada = self.entradas.get(chave)
+            if entrada is None:
+                return False, None
+            valor, expira, tamanho = entrada
+            if expira <= agora:
+                del self.entradas[chave]
+                self.ocupada -= tamanho
+                return False, None
+            self.entradas.move_to_end(chave)
+            self.contadores.setdefault(chave, [0, 0, 0])[ACERTO_MEMORIA] += 1
+            return True, valor
+
+    def guardar(self, chave, valor, expira, tamanho, maxima):
+        with self.lock:
+            self._remover(chave)
+            if tamanho > maxima:
+                return
+            self.entradas[chave] = (valor, expira, tamanho)
+            self.ocupada += tamanho
+            while self.ocupada > maxima:
+                _, (_, _, removido) = self.entradas.popitem(last=False)
+                self.ocupada -= removido
+
+    def remover(self, chave):
+        with self.lock:
+            self._remover(chave)
+
+    def _remover(self, chave):
+        entrada = self.entradas.pop(chave, None)
+        if entrada is not None:
+            self.ocupada -= entrada[2]
+
+    def limpar(self):
+        with self.lock:
+            self.entradas.clear()
+            self.ocupada = 0
+            self.contadores.clear()
+
+
+def _serializar(valor):
+    bruto = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+    return base64.b64encode(bruto).decode('ascii'), len(bruto)
+
+
+def _desserializar(dados):
+    return pickle.loads(base64.b64decode(dados))
+
+
+class CacheDashboard(BaseCache):
+    """
+    Cache do Django em memória (L1) sobre a tabela DashboardCache (L2)
+
+    OPTIONS: MAX_ENTRIES e CULL_FREQUENCY (linhas no banco, como nos
+    backends do Django), MEMORIA_MAXIMA (bytes no L1) e TEMPO_MEMORIA
+    (validade máxima no L1, em segundos).
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        opcoes = params.get('OPTIONS', {})
+        self._memoria_maxima = int(opcoes.get('MEMORIA_MAXIMA', MEMORIA_MAXIMA))
+        self._tempo_memoria = int(opcoes.get('TEMPO_MEMORIA', TEMPO_MEMORIA))
+        with _memorias_lock:
+            self._memoria = _memorias.setdefault(location, _Memoria())
+
+    def _expiracao(self, timeout):
+        expira = self.get_backend_timeout(timeout)
+        if expira is None:
+            return SEM_EXPIRACAO
+        return datetime.fromtimestamp(expira, tz=dt_timezone.utc)
+
+    def _guardar_na_memoria(self, chave, valor, expires_at, tamanho):
+        expira = min(expires_at.timestamp(), time.time() + self._tempo_memoria)
+        self._memoria.guardar(chave, valor, expira, tamanho, self._memoria_maxima)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version)
+        achou, valor = self._memoria.obter(key, time.time())
+        if achou:
+            return valor
+
+        linha = DashboardCache.objects.filter(
+            cache_key=key, expires_at__gt=timezone.now()
+        ).values_list('data', 'expires_at', 'tamanho').first()
+        if linha is None:
+            self._memoria.contar(key, FALTA)
+            self._gravar_contadores_se_preciso()
+            return default
+
+        dados, expires_at, tamanho = linha
+        valor = _desserializar(dados)
+        self._memoria.contar(key, ACERTO_BANCO)
+        self._guardar_na_memoria(key, valor, expires_at, tamanho)
+        self._gravar_contadores_se_preciso()
+        return valor
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version)
+        expires_at = self._expiracao(timeout)
+        dados, tamanho = _serializar(value)
+        self._manutencao()
+
+        DashboardCache.objects.update_or_create(
+            cache_key=key, defaults={'data': dados, 'expires_at': expires_at, 'tamanho': tamanho}
+        )
+        self._guardar_na_memoria(key, value, expires_at, tamanho)
+        # As faltas que levaram a este valor vão para a linha agora criada
+        self._gravar_contadores([key])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version)
+        expires_at = self._expiracao(timeout)
+        dados, tamanho = _serializar(value)
+        self._manutencao()
+
+        for _ in range(2):
+            try:
+                with transaction.atomic():
+                    DashboardCache.objects.create(
+                        cache_key=key, data=dados, expires_at=expires_at, tamanho=tamanho
+                    )
+            except IntegrityError:
+                # Linha expirada ainda não varrida: remove e tenta mais uma vez
+                expiradas, _ = DashboardCache.objects.filter(
+                    cache_key=key, expires_at__lte=timezone.now()
+                ).delete()
+                if not expiradas:
+                    return False
+            else:
+                self._memoria.remover(key)
+                return True
+        return False
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version)
+        self._memoria.remover(key)
+        return bool(DashboardCache.objects.filter(
+            cache_key=key, expires_at__gt=timezone.now()
+        ).update(expires_at=self._expiracao(timeout)))
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version)
+        self._memoria.remover(key)
+        removidas, _ = DashboardCache.objects.filter(cache_key=key).delete()
+        return bool(removidas)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version)
+        return DashboardCache.objects.filter(cache_key=key, expires_at__gt=timezone.now()).exists()
+
+    def clear(self):
+        self._memoria.limpar()
+        DashboardCache.objects.all().delete()
+
+    def _manutencao(self):
+        agora = time.monotonic()
+        memoria = self._memoria
+        if memoria.varrida_em is None or agora - memoria.varrida_em >= INTERVALO_VARREDURA:
+            memoria.varrida_em = agora
+            self.varrer()
+        else:
+            self._gravar_contadores_se_preciso()
+
+    def _gravar_contadores_se_preciso(self):
+        if time.monotonic() - self._memoria.contada_em >= INTERVALO_CONTADORES:
+            self.gravar_contadores()
+
+    def gravar_contadores(self):
+        """
+        Soma nas linhas os acertos e faltas acumulados neste processo
+        """
+        self._gravar_contadores()
+
+    def _gravar_contadores(self, chaves=None):
+        memoria = self._memoria
+        with memoria.lock:
+            if chaves is None:
+                pendentes, memoria.contadores = memoria.contadores, {}
+                memoria.contada_em = time.monotonic()
+            else:
+                pendentes = {
+                    chave: memoria.contadores.pop(chave) for chave in chaves if chave in memoria.contadores
+                }
+
+        agora = timezone.now()
+        for chave, contagens in pendentes.items():
+            campos = {
+                campo: F(campo) + quantidade
+                for campo, quantidade in zip(CAMPOS_CONTADORES, contagens) if quantidade
+            }
+            if contagens[ACERTO_MEMORIA] or contagens[ACERTO_BANCO]:
+                campos['acessado_em'] = agora
+            # Chaves sem linha (faltas de valores nunca gravados) são descartadas
+            DashboardCache.objects.filter(cache_key=chave).update(**campos)
+
+    def varrer(self):
+        """
+        Remove as linhas expiradas e, acima de MAX_ENTRIES, as menos acessadas
+
+        Devolve quantas linhas foram removidas.
+        """
+        self.gravar_contadores()
+        removidas, _ = DashboardCache.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        excesso = DashboardCache.objects.count() - self._max_entries
+        if excesso > 0:
+            folga = self._max_entries // self._cull_frequency if self._cull_frequency else self._max_entries
+            menos_acessadas = DashboardCache.objects.order_by(
+                F('acessado_em').asc(nulls_first=True), 'created_at'
+            ).values_list('pk', flat=True)[:excesso + folga]
+            removidas += DashboardCache.objects.filter(pk__in=list(menos_acessadas)).delete()[0]
+        return removidas
@@ -0,0 +1,205 @@
+"""
+Cache de payloads calculados, com chaves por estatística e versão dos dados
+
+Cada entrada é gravada como 'dengue:<estatística>:<nome>' com o version= do
+cache do Django igual à versão atual da estatística (a mesma do ETag, ver
+condicional.py). Uma nova carga muda a versão e, com ela, todas as chaves:
+nada é apagado (as entradas antigas só deixam de ser lidas e expiram pelo
+timeout) e nenhuma outra entrada do cache é afetada. Depois da carga,
+aquecer() calcula de uma vez as entradas registradas na versão nova.
+
+O cache é compartilhado entre os workers (ver CACHES em settings.py), e
+obter_compartilhado() evita o estouro de recálculos quando uma entrada
+falta: o worker que consegue a trava (cache.add) calcula, e os demais
+aguardam o valor aparecer no cache em vez de calcular ao mesmo tempo.
+
+Os valores ficam frescos por TEMPO_CACHE e continuam guardados por mais
+TEMPO_OBSOLETO (stale-while-revalidate): uma leitura de valor vencido o
+devolve na hora e dispara o recálculo numa thread, com a mesma trava, de
+modo que nenhuma requisição espera pelo fim do TTL. Como a chave inclui a
+versão dos dados, o valor vencido é o mesmo que seria recalculado (e casa
+com o ETag); o TTL só limita quanto tempo ele fica no cache.
+"""
+
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connections
+
+from .condicional import versao_estatisticas
+
+TEMPO_CACHE = 3600
+TEMPO_OBSOLETO = 24 * 3600
+
+# Validade da trava de cálculo e espera máxima de quem não a obteve (segundos)
+TEMPO_TRAVA = 60
+ESPERA_MAXIMA = 10
+INTERVALO_ESPERA = 0.05
+
+# Nome -> (estatística de origem, função que calcula o valor)
+ENTRADAS = {}
+
+logger = logging.getLogger(__name__)
+
+
+class EntradaCache:
+    """
+    Valor gravado no cache e o instante (epoch) até o qual está fresco
+    """
+
+    def __init__(self, valor, fresca_ate):
+        self.valor = valor
+        self.fresca_ate = fresca_ate
+
+    def vencida(self):
+        return time.time() >= self.fresca_ate
+
+
+def em_cache(nome, estatistica):
+    """
+    Registra a função que calcula uma entrada do cache
+    """
+    def registrar(calcular):
+        ENTRADAS[nome] = (estatistica, calcular)
+        return calcular
+    return registrar
+
+
+def chave(nome):
+    estatistica, _ = ENTRADAS[nome]
+    return f'dengue:{estatistica}:{nome}'
+
+
+def versao_entrada(nome):
+    """
+    Versão atual dos dados de origem da entrada (None se não carregados)
+    """
+    estatistica, _ = ENTRADAS[nome]
+    versao = versao_estatisticas(estatistica)()
+    return versao[0] if versao else None
+
+
+def gravar(chave_cache, versao, valor, timeout=TEMPO_CACHE):
+    """
+    Grava o valor, fresco por timeout e guardado por mais TEMPO_OBSOLETO
+    """
+    entrada = EntradaCache(valor, time.time() + timeout)
+    cache.set(chave_cache, entrada, timeout + TEMPO_OBSOLETO, version=versao)
+
+
+def _ler(chave_cache, versao):
+    entrada = cache.get(chave_cache, version=versao)
+    # Valores gravados antes do stale-while-revalidate contam como ausentes
+    return entrada if isinstance(entrada, EntradaCache) else None
+
+
+def _trava(chave_cache):
+    return f'{chave_cache}:calculando'
+
+
+def obter_compartilhado(chave_cache, versao, calcular, timeout=TEMPO_CACHE):
+    """
+    Valor de chave_cache na versão dada; só um processo calcula um valor ausente
+
+    Quem não obtém a trava espera até ESPERA_MAXIMA pelo valor (ou até a
+    trava ser solta sem valor, como num erro) e então calcula por conta
+    própria. Um valor vencido é devolvido na hora e recalculado em segundo
+    plano (revalidar). Valores None não são gravados.
+    """
+    entrada = _ler(chave_cache, versao)
+    if entrada is not None:
+        if entrada.vencida():
+            revalidar(chave_cache, versao, calcular, timeout)
+        return entrada.valor
+
+    trava = _trava(chave_cache)
+    dono = cache.add(trava, True, TEMPO_TRAVA, version=versao)
+    if not dono:
+        prazo = time.monotonic() + ESPERA_MAXIMA
+        while time.monotonic() < prazo:
+            time.sleep(INTERVALO_ESPERA)
+            entrada = _ler(chave_cache, versao)
+            if entrada is not None:
+                return entrada.valor
+            if not cache.has_key(trava, version=versao):
+                break
+
+    try:
+        valor = calcular()
+        if valor is not None:
+            gravar(chave_cache, versao, valor, timeout)
+        return valor
+    finally:
+        if dono:
+            cache.delete(trava, version=versao)
+
+
+def revalidar(chave_cache, versao, calcular, timeout=TEMPO_CACHE):
+    """
+    Recalcula o valor numa thread, se nenhum processo já o estiver fazendo
+
+    Devolve a thread iniciada (None se outro processo tem a trava).
+    """
+    trava = _trava(chave_cache)
+    if not cache.add(trava, True, TEMPO_TRAVA, version=versao):
+        return None
+
+    thread = threading.Thread(
+        target=_revalidar, args=(chave_cache, versao, calcular, timeout, trava),
+        name=f'revalidar-{chave_cache}', daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def _revalidar(chave_cache, versao, calcular, timeout, trava):
+    try:
+        valor = calcular()
+        if valor is not None:
+            gravar(chave_cache, versao, valor, timeout)
+    except Exception:
+        # O valor vencido continua sendo servido; a próxima leitura tenta de novo
+        logger.exception('Falha ao revalidar %s', chave_cache)
+    finally:
+        cache.delete(trava, version=versao)
+        connections.close_all()
+
+
+def obter(nome, versao=None):
+    """
+    Valor da entrada na versão dada (ou na atual), calculando se preciso
+
+    A view que já tem a versão (request.versao_dados do GET condicional)
+    deve passá-la, para não consultá-la de novo. Exceções de quem calcula
+    (ex.: DengueStatistic.DoesNotExist) são propagadas.
+    """
+    _, calcular = ENTRADAS[nome]
+    if versao is None:
+        versao = versao_entrada(nome)
+    if versao is None:
+        return calcular()
+
+    return obter_compartilhado(chave(nome), versao, calcular)
+
+
+def aquecer(estatistica):
+    """
+    Calcula e grava, na versão atual, as entradas de uma estatística
+
+    Chamado logo após a carga; devolve os nomes das entradas gravadas.
+    """
+    versao = versao_estatisticas(estatistica)()
+    if versao is None:
+        return []
+
+    aquecidas = []
+    for nome, (origem, calcular) in ENTRADAS.items():
+        if origem != estatistica:
+            continue
+        valor = calcular()
+        if valor is not None:
+            gravar(chave(nome), versao[0], valor)
+        aquecidas.append(nome)
+    return aquecidas
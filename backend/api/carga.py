@@ -0,0 +1,271 @@
+"""
+Carga em massa dos casos individuais (CasoDengue) a partir do CSV do SINAN
+
+O CSV é lido em blocos só com as colunas usadas, nos tipos e com a
+decodificação de idade dos processadores (data_schema, data_idade), e
+convertido de forma vetorizada (pandas/NumPy). Estado e município de cada linha viram ids por
+dicionários em memória (código -> id); códigos ainda não cadastrados são
+criados de uma vez por bloco. As linhas são inseridas com executemany, uma
+transação por bloco, com os índices compostos de CasoDengue removidos
+durante a carga e recriados ao final.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from data_idade import idade_em_anos
+from data_schema import SINTOMAS, TIPOS_COLUNAS
+
+from .models import CasoDengue, Estado, Municipio
+
+TAMANHO_LOTE = 100_000
+
+# Colunas do CSV lidas na carga (as ausentes no arquivo são ignoradas)
+COLUNAS_CSV = [
+    'DT_NOTIFIC', 'NU_ANO', 'SG_UF_NOT', 'ID_MUNICIP', 'CS_SEXO', 'ANO_NASC', 'NU_IDADE_N',
+    'CLASSI_FIN', 'EVOLUCAO', *SINTOMAS,
+]
+
+COLUNAS_OBRIGATORIAS = ['DT_NOTIFIC', 'SG_UF_NOT']
+
+COLUNAS_INSERT = [
+    'data_notificacao', 'ano', 'mes', 'estado_id', 'municipio_id', 'sexo', 'idade',
+    'febre', 'mialgia', 'cefaleia', 'exantema', 'vomito', 'nausea',
+    'classificacao_final', 'evolucao', 'created_at',
+]
+
+
+class ResultadoCarga:
+    """
+    Contadores de uma carga
+    """
+
+    def __init__(self):
+        self.inseridos = 0
+        self.descartados = 0
+        self.estados_criados = 0
+        self.municipios_criados = 0
+        self.segundos = 0.0
+
+    @property
+    def linhas_por_segundo(self):
+        return self.inseridos / self.segundos if self.segundos else 0.0
+
+
+def _nulos(serie):
+    """
+    Lista Python da coluna, com None nos ausentes
+    """
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def _idade(bloco):
+    """
+    Idade em anos completos, pela mesma regra das estatísticas (data_idade.idade_em_anos)
+    """
+    return pd.Series(np.floor(idade_em_anos(bloco)), index=bloco.index).astype('Int16')
+
+
+class CarregadorCasos:
+    """
+    Insere os casos do CSV em CasoDengue, bloco a bloco
+
+    progresso(resultado), se dado, é chamado após cada bloco.
+    """
+
+    def __init__(self, tamanho_lote=TAMANHO_LOTE, nomes_estados=None, progresso=None):
+        self.tamanho_lote = tamanho_lote
+        self.nomes_estados = nomes_estados or {}
+        self.progresso = progresso
+        self.resultado = ResultadoCarga()
+        self.estados = dict(Estado.objects.values_list('codigo_uf', 'id'))
+        self.municipios = dict(Municipio.objects.values_list('codigo_ibge', 'id'))
+        self._criado_em = connection.ops.adapt_datetimefield_value(timezone.now())
+        self._sql = (
+            f"INSERT INTO {CasoDengue._meta.db_table} ({', '.join(COLUNAS_INSERT)}) "
+            f"VALUES ({', '.join(['%s'] * len(COLUNAS_INSERT))})"
+        )
+
+    def carregar(self, csv_path, substituir=False, adiar_indices=True):
+        """
+        Carrega o CSV; com substituir, apaga antes os casos existentes
+        """
+        cabecalho = pd.read_csv(csv_path, nrows=0).columns
+        faltantes = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in cabecalho]
+        if faltantes:
+            raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltantes)}")
+
+        tipos = {coluna: TIPOS_COLUNAS[coluna] for coluna in COLUNAS_CSV if coluna in cabecalho}
+        leitor = pd.read_csv(csv_path, usecols=list(tipos), dtype=tipos, chunksize=self.tamanho_lote)
+
+        inicio = time.perf_counter()
+        sincronizacao = self._acelerar_sqlite()
+        try:
+            if adiar_indices:
+                self._remover_indices()
+            try:
+                if substituir:
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"DELETE FROM {CasoDengue._meta.db_table}")
+
+                for bloco in leitor:
+                    self._inserir(bloco)
+                    self.resultado.segundos = time.perf_counter() - inicio
+                    if self.progresso:
+                        self.progresso(self.resultado)
+            finally:
+                if adiar_indices:
+                    self._criar_indices()
+        finally:
+            self._restaurar_sqlite(sincronizacao)
+
+        self._atualizar_totais()
+        self.resultado.segundos = time.perf_counter() - inicio
+        return self.resultado
+
+    def _inserir(self, bloco):
+        datas = pd.to_datetime(bloco['DT_NOTIFIC'], errors='coerce')
+        validas = datas.notna() & bloco['SG_UF_NOT'].notna()
+        self.resultado.descartados += int((~validas).sum())
+        bloco, datas = bloco[validas], datas[validas]
+        if bloco.empty:
+            return
+
+        ufs = bloco['SG_UF_NOT'].astype(str).str.zfill(2)
+        estado_id = ufs.map(self._ids_estados(ufs.unique()))
+
+        if 'ID_MUNICIP' in bloco.columns:
+            codigos = bloco['ID_MUNICIP'].astype(str).where(bloco['ID_MUNICIP'].notna())
+            municipio_id = codigos.map(self._ids_municipios(codigos.dropna().unique()))
+        else:
+            municipio_id = pd.Series(None, index=bloco.index, dtype=object)
+
+        sexo = bloco['CS_SEXO'].astype(object).where(bloco['CS_SEXO'].isin(['M', 'F']), 'I') \
+            if 'CS_SEXO' in bloco.columns else pd.Series('I', index=bloco.index)
+
+        colunas = [
+            datas.dt.strftime('%Y-%m-%d').tolist(),
+            datas.dt.year.tolist(),
+            datas.dt.month.tolist(),
+            estado_id.tolist(),
+            _nulos(municipio_id.astype('Int64')),
+            sexo.tolist(),
+            _nulos(_idade(bloco)),
+        ]
+        for sintoma in SINTOMAS:
+            if sintoma in bloco.columns:
+                colunas.append((bloco[sintoma] == 1).fillna(False).tolist())
+            else:
+                colunas.append([False] * len(bloco))
+        for coluna in ('CLASSI_FIN', 'EVOLUCAO'):
+            colunas.append(_nulos(bloco[coluna]) if coluna in bloco.columns else [None] * len(bloco))
+        colunas.append([self._criado_em] * len(bloco))
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.executemany(self._sql, list(zip(*colunas)))
+        self.resultado.inseridos += len(bloco)
+
+    @staticmethod
+    def _criar_faltantes(modelo, campo, ids, codigos, novo):
+        """
+        Cria os registros de `codigos` ausentes em `ids` (código -> id); devolve quantos criou
+
+        Os já inseridos por outro processo desde a leitura de `ids` são relidos
+        antes e não entram na contagem; bulk_create(ignore_conflicts) cobre a
+        corrida restante, e o mapa é relido ao final.
+        """
+        faltantes = [codigo for codigo in codigos if codigo not in ids]
+        if not faltantes:
+            return 0
+        ids.update(modelo.objects.filter(**{f'{campo}__in': faltantes}).values_list(campo, 'id'))
+        faltantes = [codigo for codigo in faltantes if codigo not in ids]
+        if not faltantes:
+            return 0
+        modelo.objects.bulk_create([novo(codigo) for codigo in faltantes], ignore_conflicts=True)
+        ids.update(modelo.objects.filter(**{f'{campo}__in': faltantes}).values_list(campo, 'id'))
+        return len(faltantes)
+
+    def _ids_estados(self, codigos):
+        self.resultado.estados_criados += self._criar_faltantes(
+            Estado, 'codigo_uf', self.estados, codigos,
+            lambda codigo: Estado(codigo_uf=codigo, nome=self.nomes_estados.get(codigo, codigo))
+        )
+        return self.estados
+
+    def _ids_municipios(self, codigos):
+        """
+        Ids dos municípios; os novos entram no estado dos dois primeiros dígitos do código IBGE
+
+        O CSV não traz o nome do município: os novos são criados com o código
+        como nome, para serem renomeados depois (admin).
+        """
+        novos = [codigo for codigo in codigos if codigo not in self.municipios]
+        if novos:
+            estados = self._ids_estados({codigo[:2] for codigo in novos})
+            self.resultado.municipios_criados += self._criar_faltantes(
+                Municipio, 'codigo_ibge', self.municipios, novos,
+                lambda codigo: Municipio(codigo_ibge=codigo, nome=codigo, estado_id=estados[codigo[:2]])
+            )
+        return self.municipios
+
+    def _indices_existentes(self):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(cursor, CasoDengue._meta.db_table)
+
+    def _remover_indices(self):
+        editor = connection.schema_editor()
+        existentes = self._indices_existentes()
+        with connection.cursor() as cursor:
+            for indice in CasoDengue._meta.indexes:
+                if indice.name in existentes:
+                    cursor.execute(editor.sql_delete_index % {
+                        'table': editor.quote_name(CasoDengue._meta.db_table),
+                        'name': editor.quote_name(indice.name),
+                    })
+
+    def _criar_indices(self):
+        editor = connection.schema_editor()
+        existentes = self._indices_existentes()
+        with connection.cursor() as cursor:
+            for indice in CasoDengue._meta.indexes:
+                if indice.name not in existentes:
+                    cursor.execute(str(indice.create_sql(CasoDengue, editor)))
+            if connection.vendor in ('sqlite', 'postgresql'):
+                cursor.execute(f"ANALYZE {CasoDengue._meta.db_table}")
+
+    def _acelerar_sqlite(self):
+        """
+        No SQLite (fora de transação), desliga o fsync durante a carga
+        """
+        if connection.vendor != 'sqlite' or connection.in_atomic_block:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            anterior = cursor.fetchone()[0]
+            cursor.execute("PRAGMA synchronous = OFF")
+        return anterior
+
+    def _restaurar_sqlite(self, anterior):
+        if anterior is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(f"PRAGMA synchronous = {int(anterior)}")
+
+    def _atualizar_totais(self):
+        """
+        Recalcula total_casos de estados e municípios a partir dos casos
+        """
+        with transaction.atomic():
+            for modelo, campo in ((Estado, 'estado_id'), (Municipio, 'municipio_id')):
+                totais = dict(
+                    CasoDengue.objects.order_by().values_list(campo).annotate(total=Count('id'))
+                )
+                registros = list(modelo.objects.all())
+                for registro in registros:
+                    registro.total_casos = totais.get(registro.pk, 0)
+                modelo.objects.bulk_update(registros, ['total_casos'], batch_size=1000)
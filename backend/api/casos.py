@@ -0,0 +1,301 @@
+"""
+Consultas filtradas e agregadas sobre os casos individuais (CasoDengue)
+
+Os filtros são traduzidos para condições sobre as colunas cobertas pelos
+índices compostos do modelo (estado+ano+mes, municipio+data_notificacao,
+classificacao_final+evolucao). Estado e município chegam pelo código
+(UF / IBGE) e viram subconsultas pelo id, sem junção na tabela de casos. A
+contagem por dimensão é feita pelo banco (GROUP BY), agrupando estado e
+município pelo id e trazendo códigos e nomes só para os grupos devolvidos.
+
+Uma consulta custa no máximo quatro queries: total, grupos e os rótulos de
+estado e de município.
+
+A exportação (paginar_casos) percorre os casos filtrados em páginas por
+chave (data_notificacao, id), sem OFFSET: cada página começa no índice
+caso_data_id logo depois da última linha da anterior, então o custo por
+página não cresce com a profundidade e a memória fica limitada a uma página.
+"""
+
+import csv
+import io
+from datetime import date
+
+from django.db.models import Count, Q
+from rest_framework.fields import DateTimeField
+from rest_framework.utils.encoders import JSONEncoder
+
+from data_schema import SINTOMAS as SINTOMAS_SINAN
+
+from .models import CasoDengue, Estado, Municipio
+
+# Campos booleanos de CasoDengue, um por sintoma do SINAN
+SINTOMAS = [sintoma.lower() for sintoma in SINTOMAS_SINAN]
+
+# Parâmetro -> conversão do valor vindo da requisição
+FILTROS = {
+    'estado': str,
+    'municipio': str,
+    'ano': int,
+    'mes': int,
+    'sexo': str,
+    'classificacao_final': int,
+    'evolucao': int,
+}
+
+# Dimensão de agrupamento -> coluna
+DIMENSOES = {
+    'estado': 'estado_id',
+    'municipio': 'municipio_id',
+    'ano': 'ano',
+    'mes': 'mes',
+    'sexo': 'sexo',
+    'idade': 'idade',
+    'classificacao_final': 'classificacao_final',
+    'evolucao': 'evolucao',
+    'data_notificacao': 'data_notificacao',
+}
+
+
+# Campos do CasoDengueSerializer -> coluna lida (nomes vêm por JOIN no SQL)
+CAMPOS_EXPORTACAO = {
+    'id': 'id',
+    'data_notificacao': 'data_notificacao',
+    'ano': 'ano',
+    'mes': 'mes',
+    'estado_nome': 'estado__nome',
+    'municipio_nome': 'municipio__nome',
+    'sexo': 'sexo',
+    'idade': 'idade',
+    **{sintoma: sintoma for sintoma in SINTOMAS},
+    'classificacao_final': 'classificacao_final',
+    'evolucao': 'evolucao',
+    'created_at': 'created_at',
+}
+
+TAMANHO_PAGINA = 5000
+
+
+def _converter(parametro, valores, conversao):
+    try:
+        return [conversao(valor) for valor in valores]
+    except ValueError:
+        raise ValueError(f"Valor inválido para {parametro}: {', '.join(valores)}")
+
+
+def _data(parametro, valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f"Data inválida para {parametro}: {valor} (use AAAA-MM-DD)")
+
+
+def filtrar_casos(filtros=None, sintomas=(), data_inicio=None, data_fim=None,
+                  idade_min=None, idade_max=None):
+    """
+    QuerySet dos casos que passam nos filtros; ValueError se algum for inválido
+
+    filtros: {parâmetro de FILTROS: [valores aceitos]}; sintomas: casos com
+    todos esses sintomas; datas em AAAA-MM-DD (inclusivas).
+    """
+    casos = CasoDengue.objects.all()
+
+    for parametro, valores in (filtros or {}).items():
+        if parametro not in FILTROS:
+            raise ValueError(f"Filtro desconhecido: {parametro}")
+        valores = _converter(parametro, valores, FILTROS[parametro])
+
+        if parametro == 'estado':
+            ids = Estado.objects.filter(codigo_uf__in=valores).values('id')
+            casos = casos.filter(estado_id__in=ids)
+        elif parametro == 'municipio':
+            ids = Municipio.objects.filter(codigo_ibge__in=valores).values('id')
+            casos = casos.filter(municipio_id__in=ids)
+        else:
+            casos = casos.filter(**{f'{parametro}__in': valores})
+
+    for sintoma in sintomas:
+        if sintoma not in SINTOMAS:
+            raise ValueError(f"Sintoma desconhecido: {sintoma}")
+        casos = casos.filter(**{sintoma: True})
+
+    if data_inicio:
+        casos = casos.filter(data_notificacao__gte=_data('data_inicio', data_inicio))
+    if data_fim:
+        casos = casos.filter(data_notificacao__lte=_data('data_fim', data_fim))
+    if idade_min is not None:
+        casos = casos.filter(idade__gte=_converter('idade_min', [idade_min], int)[0])
+    if idade_max is not None:
+        casos = casos.filter(idade__lte=_converter('idade_max', [idade_max], int)[0])
+
+    return casos
+
+
+def _rotulos(linhas, dimensao, modelo, campo_codigo):
+    """
+    Troca os ids de estado/município das linhas por código e nome
+    """
+    coluna = DIMENSOES[dimensao]
+    ids = {linha[coluna] for linha in linhas if linha[coluna] is not None}
+    rotulos = {
+        pk: (codigo, nome)
+        for pk, codigo, nome in modelo.objects.filter(pk__in=ids).values_list('pk', campo_codigo, 'nome')
+    }
+    for linha in linhas:
+        codigo, nome = rotulos.get(linha.pop(coluna), (None, None))
+        linha[dimensao] = codigo
+        linha[f'{dimensao}_nome'] = nome
+
+
+def contar_casos(casos, agrupar=(), limite=None):
+    """
+    Total de casos e contagem por combinação das dimensões de `agrupar`
+
+    Devolve (total, linhas), com as linhas em ordem decrescente de casos.
+    """
+    agrupar = list(dict.fromkeys(agrupar))
+    for dimensao in agrupar:
+        if dimensao not in DIMENSOES:
+            raise ValueError(f"Dimensão desconhecida: {dimensao}")
+
+    total = casos.count()
+    if not agrupar:
+        return total, []
+
+    colunas = [DIMENSOES[dimensao] for dimensao in agrupar]
+    grupos = (
+        casos.order_by()
+        .values(*colunas)
+        .annotate(casos=Count('id'))
+        .order_by('-casos', *colunas)
+    )
+    if limite is not None:
+        grupos = grupos[:limite]
+    linhas = list(grupos)
+
+    if 'estado' in agrupar:
+        _rotulos(linhas, 'estado', Estado, 'codigo_uf')
+    if 'municipio' in agrupar:
+        _rotulos(linhas, 'municipio', Municipio, 'codigo_ibge')
+
+    resultado = []
+    for linha in linhas:
+        if 'data_notificacao' in linha:
+            linha['data_notificacao'] = linha['data_notificacao'].isoformat()
+
+        saida = {}
+        for dimensao in agrupar:
+            saida[dimensao] = linha[dimensao]
+            if dimensao in ('estado', 'municipio'):
+                saida[f'{dimensao}_nome'] = linha[f'{dimensao}_nome']
+        saida['casos'] = linha['casos']
+        resultado.append(saida)
+
+    return total, resultado
+
+
+def cursor_exportacao(valor):
+    """
+    (data, id) a partir de "AAAA-MM-DD,id", a última linha já recebida
+    """
+    data, _, pk = valor.partition(',')
+    try:
+        return _data('apos', data), int(pk)
+    except ValueError:
+        raise ValueError(f"Cursor inválido para apos: {valor} (use AAAA-MM-DD,id)")
+
+
+def paginar_casos(casos, apos=None, limite=None, tamanho_pagina=TAMANHO_PAGINA):
+    """
+    Páginas (listas de tuplas na ordem de CAMPOS_EXPORTACAO) dos casos em ordem de (data_notificacao, id)
+
+    apos = (data, id) retoma a exportação depois dessa linha; limite
+    restringe o total de linhas. Cada página é uma query.
+    """
+    colunas = list(CAMPOS_EXPORTACAO.values())
+    posicao_data = colunas.index('data_notificacao')
+    casos = casos.order_by('data_notificacao', 'id')
+    restantes = limite
+
+    while restantes is None or restantes > 0:
+        pagina = casos
+        if apos is not None:
+            data, pk = apos
+            # O >= delimita a faixa no índice; o OR desempata a data da última linha
+            pagina = pagina.filter(data_notificacao__gte=data).filter(
+                Q(data_notificacao__gt=data) | Q(id__gt=pk)
+            )
+
+        tamanho = tamanho_pagina if restantes is None else min(tamanho_pagina, restantes)
+        linhas = list(pagina.values_list(*colunas)[:tamanho])
+        if not linhas:
+            return
+
+        yield linhas
+        if len(linhas) < tamanho:
+            return
+
+        apos = (linhas[-1][posicao_data], linhas[-1][0])
+        if restantes is not None:
+            restantes -= len(linhas)
+
+
+def _formatadores():
+    """
+    Conversão por coluna para o mesmo texto que o CasoDengueSerializer geraria
+    """
+    data_hora = DateTimeField()
+    campos = list(CAMPOS_EXPORTACAO)
+    data = campos.index('data_notificacao')
+    criado = campos.index('created_at')
+    booleanos = [campos.index(sintoma) for sintoma in SINTOMAS]
+
+    def formatar(linha):
+        linha = list(linha)
+        linha[data] = linha[data].isoformat()
+        linha[criado] = data_hora.to_representation(linha[criado])
+        return linha
+
+    return formatar, booleanos
+
+
+def ndjson(paginas):
+    """
+    Um objeto JSON por linha, um pedaço de texto por página
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    formatar, _ = _formatadores()
+    campos = list(CAMPOS_EXPORTACAO)
+    for linhas in paginas:
+        yield ''.join(encoder.encode(dict(zip(campos, formatar(linha)))) + '\n' for linha in linhas)
+
+
+def csv_texto(paginas):
+    """
+    CSV com cabeçalho (booleanos como true/false), um pedaço de texto por página
+    """
+    formatar, booleanos = _formatadores()
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator='\n')
+
+    escritor.writerow(CAMPOS_EXPORTACAO)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for linhas in paginas:
+        for linha in linhas:
+            linha = formatar(linha)
+            for posicao in booleanos:
+                linha[posicao] = 'true' if linha[posicao] else 'false'
+            escritor.writerow(linha)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+# Formato -> (content type, gerador de texto a partir das páginas)
+FORMATOS_EXPORTACAO = {
+    'ndjson': ('application/x-ndjson; charset=utf-8', ndjson),
+    'csv': ('text/csv; charset=utf-8', csv_texto),
+}
@@ -0,0 +1,104 @@
+"""
+GET condicional (ETag / Last-Modified / 304) nas views do dashboard
+
+Os dados só mudam quando as estatísticas (ou o cubo) são recarregados, então
+o ETag e o Last-Modified vêm da versão dos dados, não da resposta: uma
+requisição com If-None-Match / If-Modified-Since da versão atual recebe 304
+sem corpo, antes de a view ser executada.
+
+As respostas levam Cache-Control: max-age=0, stale-while-revalidate: o
+navegador (ou a CDN) mostra na hora a cópia que já tem e a revalida em
+segundo plano com If-None-Match, que custa um 304 enquanto os dados não
+mudam. Respostas de erro seguem com no-cache.
+"""
+
+import functools
+from datetime import datetime, timezone
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .cubo import versao_cubo
+from .estatisticas import versao_atual
+
+# Por quanto tempo (segundos) depois de vencida a cópia do cliente ainda pode
+# ser mostrada enquanto é revalidada
+STALE_WHILE_REVALIDATE = 3600
+
+
+def cabecalhos_cache(response):
+    """
+    Cache-Control das respostas com ETag (stale-while-revalidate)
+    """
+    if response.status_code in (200, 304):
+        patch_cache_control(response, max_age=0, stale_while_revalidate=STALE_WHILE_REVALIDATE)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def condicional(versao):
+    """
+    Decorador de views: versao() devolve (etag, última modificação) ou None
+
+    A versão é consultada uma única vez por requisição e fica disponível
+    para a view em request.versao_dados.
+    """
+    def versao_da_requisicao(request):
+        versoes = request.__dict__.setdefault('_versoes_condicionais', {})
+        if versao not in versoes:
+            versoes[versao] = versao()
+        return versoes[versao]
+
+    def etag(request, *args, **kwargs):
+        atual = versao_da_requisicao(request)
+        return atual[0] if atual else None
+
+    def ultima_modificacao(request, *args, **kwargs):
+        atual = versao_da_requisicao(request)
+        return atual[1] if atual else None
+
+    def decorador(view):
+        condicionada = condition(etag_func=etag, last_modified_func=ultima_modificacao)(view)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            # A view pode usar a versão como chave (ver respostas.py)
+            request.versao_dados = versao_da_requisicao(request)
+            return cabecalhos_cache(condicionada(request, *args, **kwargs))
+
+        return wrapper
+
+    return decorador
+
+
+def versao_estatisticas(nome):
+    """
+    Função de versão de uma DengueStatistic (id e updated_at)
+    """
+    def versao():
+        atual = versao_atual(nome)
+        if atual is None:
+            return None
+        pk, atualizado_em = atual
+        return f'{nome}-{pk}-{int(atualizado_em.timestamp() * 1_000_000)}', atualizado_em
+
+    return versao
+
+
+def _versao_do_cubo():
+    atual = versao_cubo()
+    if atual is None:
+        return None
+    tamanho, modificado_ns = atual
+    return f'cubo-{tamanho}-{modificado_ns}', datetime.fromtimestamp(modificado_ns / 1e9, tz=timezone.utc)
+
+
+def estatisticas_condicionais(nome):
+    """
+    Decorador de views que servem dados da estatística `nome`
+    """
+    return condicional(versao_estatisticas(nome))
+
+
+cubo_condicional = condicional(_versao_do_cubo)
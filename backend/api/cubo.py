@@ -0,0 +1,191 @@
+"""
+Consultas ao cubo de casos gerado pelo processador avançado (dengue_cubo.npz)
+
+O arquivo traz uma linha por combinação de dimensões com casos: um array de
+inteiros por dimensão (-1 = ignorado) e o array casos. Ele é carregado uma
+única vez por processo (e recarregado se o arquivo mudar); filtros e
+agrupamentos são feitos com NumPy sobre os arrays, sem tocar no banco.
+"""
+
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from data_schema import SINTOMAS as SINTOMAS_SINAN
+
+# Mesma ordem de bits de padrao_sintomas no processador (data_aggregates)
+SINTOMAS = [sintoma.lower() for sintoma in SINTOMAS_SINAN]
+
+# Agrupamentos com até este número de combinações possíveis usam bincount direto
+LIMITE_DENSO = 1 << 22
+
+_cubo = None
+_assinatura = None
+_lock = threading.Lock()
+
+
+def caminho_cubo():
+    return str(getattr(settings, 'DENGUE_CUBO_PATH', 'dengue_cubo.npz'))
+
+
+def versao_cubo():
+    """
+    (tamanho, mtime em ns) do arquivo do cubo, ou None se ele não existir
+    """
+    try:
+        info = os.stat(caminho_cubo())
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+def obter_cubo():
+    """
+    Cubo carregado em memória (None se o arquivo não existir)
+    """
+    global _cubo, _assinatura
+
+    caminho = caminho_cubo()
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+
+    assinatura = (caminho, info.st_size, info.st_mtime_ns)
+    with _lock:
+        if _assinatura != assinatura:
+            _cubo = CuboCasos.carregar(caminho)
+            _assinatura = assinatura
+        return _cubo
+
+
+class CuboCasos:
+    """
+    Cubo esparso de contagens com filtro e agrupamento por qualquer dimensão
+    """
+
+    def __init__(self, dimensoes, codigos, casos, rotulos):
+        self.dimensoes = dimensoes
+        self.codigos = codigos
+        self.casos = casos
+        self.rotulos = rotulos
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho) as arquivo:
+            dimensoes = [str(d) for d in arquivo['dimensoes']]
+            codigos = {dimensao: arquivo[dimensao] for dimensao in dimensoes}
+            rotulos = {
+                nome[len('rotulos_'):]: [str(r) for r in arquivo[nome]]
+                for nome in arquivo.files if nome.startswith('rotulos_')
+            }
+            casos = arquivo['casos'].astype(np.int64)
+        return cls(dimensoes, codigos, casos, rotulos)
+
+    @property
+    def total(self):
+        return int(self.casos.sum())
+
+    def codificar(self, dimensao, valor):
+        """
+        Código de um valor vindo da requisição; ValueError se inválido
+        """
+        if dimensao not in self.codigos:
+            raise ValueError(f"Dimensão desconhecida: {dimensao}")
+
+        if valor == 'ignorado':
+            return -1
+        if dimensao in self.rotulos:
+            try:
+                return self.rotulos[dimensao].index(valor)
+            except ValueError:
+                raise ValueError(f"Valor inválido para {dimensao}: {valor}")
+        try:
+            return int(valor)
+        except ValueError:
+            raise ValueError(f"Valor inválido para {dimensao}: {valor}")
+
+    def decodificar(self, dimensao, codigo):
+        """
+        Valor legível de um código (None para ignorado)
+        """
+        codigo = int(codigo)
+        if codigo < 0:
+            return None
+        if dimensao in self.rotulos:
+            return self.rotulos[dimensao][codigo]
+        return codigo
+
+    def _mascara(self, filtros, sintomas):
+        mascara = np.ones(len(self.casos), dtype=bool)
+
+        for dimensao, valores in (filtros or {}).items():
+            aceitos = [self.codificar(dimensao, valor) for valor in valores]
+            mascara &= np.isin(self.codigos[dimensao], aceitos)
+
+        if sintomas:
+            bits = 0
+            for sintoma in sintomas:
+                if sintoma not in SINTOMAS:
+                    raise ValueError(f"Sintoma desconhecido: {sintoma}")
+                bits |= 1 << SINTOMAS.index(sintoma)
+            padrao = self.codigos['padrao_sintomas'].astype(np.int16)
+            mascara &= (padrao >= 0) & ((padrao & bits) == bits)
+
+        return mascara
+
+    def consultar(self, filtros=None, agrupar=(), sintomas=(), limite=None):
+        """
+        Soma os casos das células que passam nos filtros, agrupando por `agrupar`
+
+        filtros: {dimensão: [valores aceitos]}; sintomas: casos com pelo menos
+        todos esses sintomas. Devolve (total, linhas), com as linhas ordenadas
+        por casos em ordem decrescente.
+        """
+        agrupar = list(dict.fromkeys(agrupar))
+        for dimensao in agrupar:
+            if dimensao not in self.codigos:
+                raise ValueError(f"Dimensão desconhecida: {dimensao}")
+
+        mascara = self._mascara(filtros, sintomas)
+        casos = self.casos[mascara]
+        total = int(casos.sum())
+
+        if not agrupar:
+            return total, []
+
+        # Códigos de cada dimensão deslocados para começar em 0
+        deslocados, minimos, tamanhos = [], [], []
+        for dimensao in agrupar:
+            valores = self.codigos[dimensao][mascara].astype(np.int64)
+            minimo = int(valores.min()) if len(valores) else 0
+            deslocados.append(valores - minimo)
+            minimos.append(minimo)
+            tamanhos.append((int(valores.max()) - minimo + 1) if len(valores) else 1)
+
+        chave = np.ravel_multi_index(deslocados, tamanhos)
+        if np.prod(tamanhos, dtype=np.float64) <= LIMITE_DENSO:
+            somas = np.bincount(chave, weights=casos, minlength=int(np.prod(tamanhos)))
+            grupos = np.flatnonzero(somas)
+            somas = somas[grupos]
+        else:
+            # Muitas combinações possíveis (ex.: município x semana): só as presentes
+            grupos, inverso = np.unique(chave, return_inverse=True)
+            somas = np.bincount(inverso, weights=casos)
+        indices = np.unravel_index(grupos, tamanhos)
+
+        colunas = [indice + minimo for indice, minimo in zip(indices, minimos)]
+
+        ordem = np.argsort(-somas, kind='stable')
+        if limite is not None:
+            ordem = ordem[:limite]
+
+        linhas = []
+        for i in ordem:
+            linha = {dimensao: self.decodificar(dimensao, coluna[i]) for dimensao, coluna in zip(agrupar, colunas)}
+            linha['casos'] = int(somas[i])
+            linhas.append(linha)
+
+        return total, linhas
@@ -0,0 +1,127 @@
+"""
+Estatísticas por seção, já decodificadas e mantidas em memória por processo
+
+O JSON de cada processador é gravado com uma linha de SecaoEstatistica por
+chave de primeiro nível (geral, por_estado, faixa_etaria...), e cada view
+lê só as seções de que precisa. Cada seção é lida e decodificada uma única
+vez por versão: a cada requisição só se consulta a versão atual (id e
+updated_at do DengueStatistic, sem o campo data) e, se ela mudou, o
+snapshot é trocado de uma vez e as seções são relidas sob demanda.
+
+As estruturas devolvidas são compartilhadas entre requisições e threads e
+não devem ser modificadas pelas views.
+"""
+
+import threading
+
+from django.db import transaction
+
+from .models import DengueStatistic, SecaoEstatistica
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+class Snapshot:
+    """
+    Seções já decodificadas de uma estatística e a versão de onde vieram
+
+    Seções inexistentes ficam como None, para não serem consultadas de novo.
+    """
+
+    def __init__(self, versao, secoes=None):
+        self.versao = versao
+        self.secoes = secoes or {}
+
+
+def _versao(stat):
+    return (stat.pk, stat.updated_at)
+
+
+def versao_atual(nome):
+    """
+    Versão gravada no banco (None se a estatística não existir)
+    """
+    versao = DengueStatistic.objects.filter(name=nome).values_list('pk', 'updated_at').first()
+    return tuple(versao) if versao else None
+
+
+def obter_secoes(nome, secoes):
+    """
+    {seção: dados} das seções pedidas (None para as que não existem)
+
+    DengueStatistic.DoesNotExist se a estatística não foi carregada.
+    """
+    versao = versao_atual(nome)
+    if versao is None:
+        raise DengueStatistic.DoesNotExist(f"Estatística {nome} não encontrada")
+
+    snapshot = _snapshots.get(nome)
+    if snapshot is None or snapshot.versao != versao or any(s not in snapshot.secoes for s in secoes):
+        with _lock:
+            # Outra thread pode ter recarregado enquanto esperávamos
+            snapshot = _snapshots.get(nome)
+            if snapshot is None or snapshot.versao != versao:
+                snapshot = Snapshot(versao)
+
+            faltantes = [secao for secao in secoes if secao not in snapshot.secoes]
+            if faltantes:
+                lidas = dict.fromkeys(faltantes)
+                lidas.update(
+                    SecaoEstatistica.objects
+                    .filter(estatistica_id=versao[0], secao__in=faltantes)
+                    .values_list('secao', 'data')
+                )
+                snapshot = Snapshot(versao, {**snapshot.secoes, **lidas})
+
+            _snapshots[nome] = snapshot
+
+    return {secao: snapshot.secoes[secao] for secao in secoes}
+
+
+def obter_secao(nome, secao, padrao=None):
+    """
+    Dados de uma seção (padrao se ela não existir)
+    """
+    dados = obter_secoes(nome, [secao])[secao]
+    return padrao if dados is None else dados
+
+
+@transaction.atomic
+def salvar_estatisticas(nome, dados):
+    """
+    Grava o JSON de um processador, uma linha por seção
+
+    Devolve (stat, created) como update_or_create e publica o novo snapshot.
+    """
+    stat, created = DengueStatistic.objects.update_or_create(
+        name=nome,
+        defaults={'data': {'secoes': list(dados)}}
+    )
+    stat.secoes.all().delete()
+    SecaoEstatistica.objects.bulk_create([
+        SecaoEstatistica(estatistica=stat, secao=secao, data=valor)
+        for secao, valor in dados.items()
+    ])
+
+    transaction.on_commit(lambda: publicar(stat, dados))
+    return stat, created
+
+
+def publicar(stat, dados):
+    """
+    Troca o snapshot pelos dados recém-gravados, sem reler o banco
+    """
+    with _lock:
+        _snapshots[stat.name] = Snapshot(_versao(stat), dict(dados))
+
+
+def descartar(nome=None):
+    """
+    Remove o snapshot de uma estatística (ou todos)
+    """
+    with _lock:
+        if nome is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(nome, None)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.aquecimento import aquecer_tudo
+
+
+class Command(BaseCommand):
+    help = "Calcula os payloads de todos os endpoints e os grava no cache compartilhado"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forcar', action='store_true',
+            help="Recalcula e regrava todos os payloads, mesmo os que já estão no cache"
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        resultado = aquecer_tudo(forcar=options['forcar'])
+
+        for origem, nomes in resultado.items():
+            if nomes:
+                self.stdout.write(f"{origem}: {', '.join(nomes)}")
+            else:
+                self.stdout.write(f"{origem}: não carregado")
+        total = sum(len(nomes) for nomes in resultado.values())
+        self.stdout.write(self.style.SUCCESS(f"{total} payloads aquecidos em {time.monotonic() - inicio:.2f}s"))
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.carga import TAMANHO_LOTE, CarregadorCasos
+from api.views import UF_CODES
+
+
+class Command(BaseCommand):
+    help = "Carrega os casos individuais do CSV do SINAN em CasoDengue (com estados e municípios)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv', nargs='?', default=str(settings.DENGUE_CSV_PATH),
+            help="Exportação do SINAN a carregar (padrão: settings.DENGUE_CSV_PATH)"
+        )
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_LOTE,
+            help=f"Linhas lidas e inseridas por transação (padrão: {TAMANHO_LOTE:,})"
+        )
+        parser.add_argument(
+            '--substituir', action='store_true',
+            help="Apaga os casos já carregados antes da carga"
+        )
+        parser.add_argument(
+            '--manter-indices', action='store_true',
+            help="Não remove os índices durante a carga (mais lento; útil para cargas pequenas)"
+        )
+
+    def handle(self, *args, **options):
+        def progresso(resultado):
+            self.stdout.write(
+                f"{resultado.inseridos:,} casos inseridos "
+                f"({resultado.linhas_por_segundo:,.0f} linhas/s)"
+            )
+
+        carregador = CarregadorCasos(options['lote'], nomes_estados=UF_CODES, progresso=progresso)
+        try:
+            resultado = carregador.carregar(
+                options['csv'],
+                substituir=options['substituir'],
+                adiar_indices=not options['manter_indices']
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Erro ao carregar casos: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.inseridos:,} casos carregados em {resultado.segundos:.1f}s "
+            f"({resultado.linhas_por_segundo:,.0f} linhas/s); "
+            f"{resultado.descartados:,} linhas descartadas (sem data ou UF), "
+            f"{resultado.estados_criados} estados e {resultado.municipios_criados} municípios criados"
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.tarefas import executar_pendentes
+
+
+class Command(BaseCommand):
+    help = "Executa as tarefas de carga pendentes (o servidor só as enfileira)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo', action='store_true',
+            help="Continua aguardando novas tarefas em vez de sair quando a fila esvazia"
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=2.0,
+            help="Segundos entre as verificações da fila no modo contínuo (padrão: 2)"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            executadas = executar_pendentes()
+            if executadas:
+                self.stdout.write(f"{executadas} tarefa(s) executada(s)")
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
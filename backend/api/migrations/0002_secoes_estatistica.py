@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:21
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def separar_secoes(apps, schema_editor):
+    """
+    Move cada chave de primeiro nível dos JSONs já carregados para a sua linha
+    """
+    DengueStatistic = apps.get_model('api', 'DengueStatistic')
+    SecaoEstatistica = apps.get_model('api', 'SecaoEstatistica')
+
+    for stat in DengueStatistic.objects.all():
+        dados = stat.data if isinstance(stat.data, dict) else {}
+        SecaoEstatistica.objects.bulk_create([
+            SecaoEstatistica(estatistica=stat, secao=secao, data=valor)
+            for secao, valor in dados.items()
+        ])
+        stat.data = {'secoes': list(dados)}
+        stat.save()
+
+
+def juntar_secoes(apps, schema_editor):
+    DengueStatistic = apps.get_model('api', 'DengueStatistic')
+
+    for stat in DengueStatistic.objects.all():
+        stat.data = {secao.secao: secao.data for secao in stat.secoes.all()}
+        stat.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecaoEstatistica',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('secao', models.CharField(max_length=100)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('estatistica', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='secoes', to='api.denguestatistic')),
+            ],
+            options={
+                'verbose_name': 'Seção de Estatística',
+                'verbose_name_plural': 'Seções de Estatísticas',
+                'constraints': [models.UniqueConstraint(fields=('estatistica', 'secao'), name='secao_unica_por_estatistica')],
+            },
+        ),
+        migrations.RunPython(separar_secoes, juntar_secoes),
+    ]
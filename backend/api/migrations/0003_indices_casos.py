@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_secoes_estatistica'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='casodengue',
+            name='estado',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.estado'),
+        ),
+        migrations.AlterField(
+            model_name='casodengue',
+            name='municipio',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.municipio'),
+        ),
+        migrations.AddIndex(
+            model_name='casodengue',
+            index=models.Index(fields=['estado', 'ano', 'mes'], name='caso_estado_ano_mes'),
+        ),
+        migrations.AddIndex(
+            model_name='casodengue',
+            index=models.Index(fields=['municipio', 'data_notificacao'], name='caso_municipio_data'),
+        ),
+        migrations.AddIndex(
+            model_name='casodengue',
+            index=models.Index(fields=['classificacao_final', 'evolucao'], name='caso_classificacao_evolucao'),
+        ),
+    ]
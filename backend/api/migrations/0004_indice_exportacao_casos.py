@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_indices_casos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='casodengue',
+            index=models.Index(fields=['data_notificacao', 'id'], name='caso_data_id'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:39
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_indice_exportacao_casos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaCarga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('estatisticas', 'Carregar estatísticas'), ('estatisticas_avancadas', 'Carregar estatísticas avançadas'), ('processador', 'Processar o CSV e carregar as estatísticas'), ('processador_avancado', 'Processar o CSV (avançado) e carregar as estatísticas avançadas')], max_length=30)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=12)),
+                ('ativa', models.BooleanField(default=True, null=True)),
+                ('progresso', models.IntegerField(default=0)),
+                ('etapa', models.CharField(blank=True, max_length=200)),
+                ('resultado', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('erro', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tarefa de Carga',
+                'verbose_name_plural': 'Tarefas de Carga',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('ativa',), name='uma_tarefa_ativa')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_tarefas_carga'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardcache',
+            name='acertos_banco',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dashboardcache',
+            name='acertos_memoria',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dashboardcache',
+            name='acessado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dashboardcache',
+            name='faltas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dashboardcache',
+            name='tamanho',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='dashboardcache',
+            name='cache_key',
+            field=models.CharField(max_length=250, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='dashboardcache',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -5,6 +5,10 @@ import json
 class DengueStatistic(models.Model):
     """
     Modelo para armazenar estatísticas gerais de dengue
+
+    Cada seção do JSON do processador fica em SecaoEstatistica; data guarda
+    só a lista das seções ({'secoes': [...]}). updated_at muda a cada
+    carga e serve de versão das seções.
     """
     name = models.CharField(max_length=100, unique=True)
     data = models.JSONField(encoder=DjangoJSONEncoder)
@@ -18,6 +22,24 @@ class DengueStatistic(models.Model):
         verbose_name = "Estatística de Dengue"
         verbose_name_plural = "Estatísticas de Dengue"
 
+class SecaoEstatistica(models.Model):
+    """
+    Modelo para armazenar uma seção (chave de primeiro nível) de uma estatística
+    """
+    estatistica = models.ForeignKey(DengueStatistic, on_delete=models.CASCADE, related_name='secoes')
+    secao = models.CharField(max_length=100)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    
+    def __str__(self):
+        return f"{self.estatistica.name}.{self.secao}"
+    
+    class Meta:
+        verbose_name = "Seção de Estatística"
+        verbose_name_plural = "Seções de Estatísticas"
+        constraints = [
+            models.UniqueConstraint(fields=['estatistica', 'secao'], name='secao_unica_por_estatistica')
+        ]
+
 class Estado(models.Model):
     """
     Modelo para armazenar dados por estado
@@ -79,9 +101,9 @@ class CasoDengue(models.Model):
     ano = models.IntegerField()
     mes = models.IntegerField()
     
-    # Localização
-    estado = models.ForeignKey(Estado, on_delete=models.CASCADE)
-    municipio = models.ForeignKey(Municipio, on_delete=models.CASCADE, null=True, blank=True)
+    # Localização (indexadas pelos índices compostos de Meta.indexes)
+    estado = models.ForeignKey(Estado, on_delete=models.CASCADE, db_index=False)
+    municipio = models.ForeignKey(Municipio, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
     
     # Demográficos
     sexo = models.CharField(max_length=1, choices=SEXO_CHOICES)
@@ -108,19 +130,80 @@ class CasoDengue(models.Model):
         verbose_name = "Caso de Dengue"
         verbose_name_plural = "Casos de Dengue"
         ordering = ['-data_notificacao']
+        # Índices dos filtros de api/casos.py
+        indexes = [
+            models.Index(fields=['estado', 'ano', 'mes'], name='caso_estado_ano_mes'),
+            models.Index(fields=['municipio', 'data_notificacao'], name='caso_municipio_data'),
+            models.Index(fields=['classificacao_final', 'evolucao'], name='caso_classificacao_evolucao'),
+            # Paginação por chave (keyset) da exportação
+            models.Index(fields=['data_notificacao', 'id'], name='caso_data_id'),
+        ]
 
 class DashboardCache(models.Model):
     """
     Modelo para cache de dados do dashboard
+
+    Segundo nível do backend de cache api.cache_dashboard.CacheDashboard:
+    data guarda o valor serializado (pickle em base64) e os contadores são
+    acumulados por processo e gravados em lote.
     """
-    cache_key = models.CharField(max_length=100, unique=True)
+    cache_key = models.CharField(max_length=250, unique=True)
     data = models.JSONField(encoder=DjangoJSONEncoder)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    tamanho = models.PositiveIntegerField(default=0)
+    acertos_memoria = models.PositiveIntegerField(default=0)
+    acertos_banco = models.PositiveIntegerField(default=0)
+    faltas = models.PositiveIntegerField(default=0)
+    acessado_em = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
         return self.cache_key
     
     class Meta:
         verbose_name = "Cache do Dashboard"
-        verbose_name_plural = "Caches do Dashboard"
\ No newline at end of file
+        verbose_name_plural = "Caches do Dashboard"
+
+class TarefaCarga(models.Model):
+    """
+    Carga de estatísticas (ou processamento do CSV) executada em segundo plano
+    """
+    TIPO_CHOICES = [
+        ('estatisticas', 'Carregar estatísticas'),
+        ('estatisticas_avancadas', 'Carregar estatísticas avançadas'),
+        ('processador', 'Processar o CSV e carregar as estatísticas'),
+        ('processador_avancado', 'Processar o CSV (avançado) e carregar as estatísticas avançadas'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('executando', 'Executando'),
+        ('concluida', 'Concluída'),
+        ('falhou', 'Falhou'),
+    ]
+    
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='pendente')
+    # True enquanto pendente ou executando, None depois: a restrição única
+    # impede duas tarefas ativas ao mesmo tempo, mesmo entre processos
+    ativa = models.BooleanField(null=True, default=True)
+    progresso = models.IntegerField(default=0)
+    etapa = models.CharField(max_length=200, blank=True)
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    erro = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.get_tipo_display()} ({self.get_status_display()})"
+    
+    class Meta:
+        verbose_name = "Tarefa de Carga"
+        verbose_name_plural = "Tarefas de Carga"
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['ativa'], name='uma_tarefa_ativa'),
+        ]
\ No newline at end of file
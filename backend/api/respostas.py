@@ -0,0 +1,236 @@
+"""
+Respostas pré-renderizadas e pré-comprimidas dos endpoints fixos
+
+Os endpoints fixos (sem parâmetros) devolvem sempre o mesmo JSON para uma
+mesma versão das estatísticas. Esse JSON é montado, renderizado em bytes e
+comprimido (gzip e, se o pacote brotli estiver instalado, br) uma única vez
+por versão: na carga das estatísticas ou no primeiro acesso do processo.
+Depois, cada requisição custa uma busca num dict e a escrita dos bytes na
+codificação aceita pelo cliente (Accept-Encoding).
+
+A versão vem do GET condicional (condicional.py), que já a consulta antes
+da view. Os corpos renderizados também vão para o cache compartilhado
+(cache_versionado.py): num reinício ou numa carga nova, só um worker
+renderiza cada endpoint e os demais reaproveitam os bytes; corpos vencidos
+são servidos enquanto são renderizados de novo em segundo plano. O endpoint
+de lote (resposta_lote) junta os bytes prontos de vários endpoints numa só
+resposta.
+"""
+
+import gzip
+import hashlib
+import threading
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from .cache_versionado import gravar, obter_compartilhado
+from .condicional import cabecalhos_cache, versao_estatisticas
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+NIVEL_GZIP = 9
+QUALIDADE_BROTLI = 9
+
+# O lote é montado a cada requisição: compressão mais leve, só acima deste tamanho
+NIVEL_GZIP_LOTE = 5
+TAMANHO_MINIMO_COMPRESSAO = 1024
+
+# Endpoint -> (estatística de origem, função que monta o payload)
+PAYLOADS = {}
+
+_respostas = {}
+_lock = threading.Lock()
+
+
+class RespostaPronta:
+    """
+    Corpo de um endpoint em cada codificação, para uma versão dos dados
+    """
+
+    def __init__(self, versao, corpos):
+        self.versao = versao
+        self.corpos = corpos
+
+
+def payload(endpoint, estatistica):
+    """
+    Registra a função que monta o payload de um endpoint fixo
+    """
+    def registrar(gerar):
+        PAYLOADS[endpoint] = (estatistica, gerar)
+        return gerar
+    return registrar
+
+
+def renderizar(dados):
+    """
+    {codificação: bytes} do JSON, como o JSONRenderer do DRF o geraria
+    """
+    corpo = JSONRenderer().render(dados)
+    corpos = {
+        'identity': corpo,
+        'gzip': gzip.compress(corpo, compresslevel=NIVEL_GZIP, mtime=0),
+    }
+    if brotli is not None:
+        corpos['br'] = brotli.compress(corpo, quality=QUALIDADE_BROTLI)
+    return corpos
+
+
+def codificacao_aceita(request, disponiveis):
+    """
+    Melhor codificação disponível segundo o Accept-Encoding (br > gzip > identity)
+    """
+    aceitas = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        nome, _, parametros = item.strip().partition(';')
+        qualidade = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith('q='):
+            try:
+                qualidade = float(parametros[2:])
+            except ValueError:
+                qualidade = 0.0
+        if nome:
+            aceitas[nome.strip().lower()] = qualidade
+
+    for codificacao in ('br', 'gzip'):
+        qualidade = aceitas.get(codificacao, aceitas.get('*', 0.0))
+        if codificacao in disponiveis and qualidade > 0:
+            return codificacao
+    return 'identity'
+
+
+def _resposta(request, corpos):
+    codificacao = codificacao_aceita(request, corpos)
+    response = HttpResponse(corpos[codificacao], content_type='application/json')
+    if codificacao != 'identity':
+        response['Content-Encoding'] = codificacao
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _chave(endpoint):
+    return f'dengue:resposta:{endpoint}'
+
+
+def _versao_da_requisicao(request):
+    versao = getattr(request, 'versao_dados', None)
+    return versao[0] if versao else None
+
+
+def corpos_prontos(endpoint, versao):
+    """
+    {codificação: bytes} do endpoint fixo na versão dada, renderizando se preciso
+
+    Exceções de quem monta o payload (ex.: DengueStatistic.DoesNotExist)
+    são propagadas.
+    """
+    pronta = _respostas.get(endpoint)
+    if pronta is not None and versao is not None and pronta.versao == versao:
+        return pronta.corpos
+
+    _, gerar = PAYLOADS[endpoint]
+    if versao is None:
+        return renderizar(gerar())
+
+    pronta = RespostaPronta(versao, obter_compartilhado(_chave(endpoint), versao, lambda: renderizar(gerar())))
+    with _lock:
+        _respostas[endpoint] = pronta
+    return pronta.corpos
+
+
+def resposta_pronta(request, endpoint):
+    """
+    Resposta do endpoint fixo para a versão atual da requisição
+    """
+    return _resposta(request, corpos_prontos(endpoint, _versao_da_requisicao(request)))
+
+
+def resposta_lote(request, endpoints, conhecidas=()):
+    """
+    Vários endpoints fixos numa única resposta JSON
+
+    {"secoes": {endpoint: {"etag": ..., "dados": ...}}}, montada com os
+    mesmos bytes prontos de cada endpoint. Endpoints cuja ETag está em
+    conhecidas voltam só com "nao_modificado"; os de estatísticas não
+    carregadas, com "error" e "status" 404. A resposta tem ETag própria
+    (derivada das ETags das seções) e responde 304 ao If-None-Match.
+    """
+    versoes = {}
+    for endpoint in endpoints:
+        estatistica, _ = PAYLOADS[endpoint]
+        if estatistica not in versoes:
+            versao = versao_estatisticas(estatistica)()
+            versoes[estatistica] = versao[0] if versao else None
+
+    etags = [(endpoint, versoes[PAYLOADS[endpoint][0]]) for endpoint in endpoints]
+    assinatura = '|'.join(f'{endpoint}={etag}' for endpoint, etag in etags)
+    assinatura += '|' + ','.join(sorted(conhecidas))
+    etag_lote = quote_etag('lote-' + hashlib.sha1(assinatura.encode()).hexdigest()[:20])
+
+    if etag_lote in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag_lote
+        return cabecalhos_cache(response)
+
+    renderer = JSONRenderer()
+    partes = []
+    for endpoint, etag in etags:
+        if etag is None:
+            estatistica = PAYLOADS[endpoint][0]
+            item = renderer.render({
+                'error': f'Estatística {estatistica} não encontrada. Execute o processamento dos dados primeiro.',
+                'status': 404
+            })
+        elif etag in conhecidas:
+            item = renderer.render({'etag': etag, 'nao_modificado': True})
+        else:
+            dados = corpos_prontos(endpoint, etag)['identity']
+            item = b'{"etag":' + renderer.render(etag) + b',"dados":' + dados + b'}'
+        partes.append(renderer.render(endpoint) + b':' + item)
+    corpo = b'{"secoes":{' + b','.join(partes) + b'}}'
+
+    corpos = {'identity': corpo}
+    if len(corpo) >= TAMANHO_MINIMO_COMPRESSAO and codificacao_aceita(request, ('gzip',)) == 'gzip':
+        corpos['gzip'] = gzip.compress(corpo, compresslevel=NIVEL_GZIP_LOTE, mtime=0)
+
+    response = _resposta(request, corpos)
+    response['ETag'] = etag_lote
+    return cabecalhos_cache(response)
+
+
+def pre_renderizar(estatistica):
+    """
+    Renderiza de uma vez todos os endpoints fixos de uma estatística
+
+    Chamado logo após a carga; devolve os endpoints renderizados.
+    """
+    versao = versao_estatisticas(estatistica)()
+    if versao is None:
+        return []
+
+    versao = versao[0]
+    renderizados = []
+    for endpoint, (origem, gerar) in PAYLOADS.items():
+        if origem != estatistica:
+            continue
+        pronta = RespostaPronta(versao, renderizar(gerar()))
+        gravar(_chave(endpoint), versao, pronta.corpos)
+        with _lock:
+            _respostas[endpoint] = pronta
+        renderizados.append(endpoint)
+    return renderizados
+
+
+def descartar():
+    """
+    Remove todas as respostas prontas
+    """
+    with _lock:
+        _respostas.clear()
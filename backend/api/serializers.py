@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import DengueStatistic, Estado, Municipio, CasoDengue, DashboardCache
+from .models import DengueStatistic, Estado, Municipio, CasoDengue, DashboardCache, TarefaCarga
 
 class EstadoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -34,7 +34,18 @@ class DengueStatisticSerializer(serializers.ModelSerializer):
 class DashboardCacheSerializer(serializers.ModelSerializer):
     class Meta:
         model = DashboardCache
-        fields = ['cache_key', 'data', 'expires_at', 'created_at']
+        fields = [
+            'cache_key', 'expires_at', 'created_at', 'tamanho', 'acertos_memoria', 'acertos_banco',
+            'faltas', 'acessado_em'
+        ]
+
+class TarefaCargaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TarefaCarga
+        fields = [
+            'id', 'tipo', 'status', 'progresso', 'etapa', 'resultado', 'erro',
+            'created_at', 'iniciada_em', 'concluida_em'
+        ]
 
 # Serializers para dados agregados
 class EstatisticasGeraisSerializer(serializers.Serializer):
@@ -0,0 +1,275 @@
+"""
+Cargas de estatísticas e processamento do CSV em segundo plano (TarefaCarga)
+
+As views só registram a tarefa e respondem 202; o trabalho (ler e gravar o
+JSON, ou rodar o processador num subprocesso e depois carregar o JSON) roda
+fora da requisição, atualizando progresso e etapa na tabela, que é consultada
+por GET /api/tarefas/<id>/.
+
+Por padrão as tarefas ficam pendentes para `manage.py executar_tarefas
+--continuo`, num processo à parte, e os workers web ficam só com as
+leituras. Com DENGUE_TAREFAS_EM_THREAD = True (desenvolvimento) cada tarefa
+roda numa thread do próprio processo web, iniciada após o commit.
+
+Só uma tarefa fica ativa por vez (restrição única em TarefaCarga.ativa);
+uma tarefa sem progresso há mais de TEMPO_SEM_PROGRESSO é dada como
+abandonada (processo encerrado no meio) e marcada como falha, tanto ao
+enfileirar uma nova quanto ao consultar o status.
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .aquecimento import aquecer_estatistica
+from .estatisticas import salvar_estatisticas
+from .models import TarefaCarga
+
+TEMPO_SEM_PROGRESSO = timedelta(minutes=30)
+
+# Intervalo mínimo entre gravações da etapa durante o processador (segundos)
+INTERVALO_ETAPA = 1.0
+
+# Sinal de vida gravado enquanto o processador roda, mesmo sem saída (segundos);
+# bem abaixo de TEMPO_SEM_PROGRESSO
+INTERVALO_SINAL = 60.0
+
+# Tipo -> função que executa a tarefa
+TAREFAS = {}
+
+
+class TarefaEmAndamento(Exception):
+    """
+    Já existe uma tarefa pendente ou executando
+    """
+
+    def __init__(self, tarefa):
+        super().__init__(f"Tarefa {tarefa.pk if tarefa else '?'} em andamento")
+        self.tarefa = tarefa
+
+
+def tarefa(tipo):
+    """
+    Registra a função que executa as tarefas de um tipo
+    """
+    def registrar(executar):
+        TAREFAS[tipo] = executar
+        return executar
+    return registrar
+
+
+def diretorio_dados():
+    return str(getattr(settings, 'DENGUE_DADOS_DIR', settings.BASE_DIR.parent))
+
+
+def arquivo_estatisticas(nome):
+    """
+    Caminho do JSON gerado pelo processador para a estatística `nome`
+    """
+    return os.path.join(diretorio_dados(), f'{nome}.json')
+
+
+def progresso(tarefa, percentual, etapa):
+    """
+    Grava o progresso da tarefa (também serve de sinal de vida)
+    """
+    tarefa.progresso, tarefa.etapa = percentual, etapa[:200]
+    TarefaCarga.objects.filter(pk=tarefa.pk).update(
+        progresso=tarefa.progresso, etapa=tarefa.etapa, updated_at=timezone.now()
+    )
+
+
+def liberar_abandonadas():
+    """
+    Marca como falha as tarefas ativas sem sinal de vida há TEMPO_SEM_PROGRESSO
+    """
+    limite = timezone.now() - TEMPO_SEM_PROGRESSO
+    TarefaCarga.objects.filter(ativa=True, updated_at__lt=limite).update(
+        status='falhou', ativa=None, erro='Tarefa abandonada (sem progresso).',
+        concluida_em=timezone.now()
+    )
+
+
+def enfileirar(tipo):
+    """
+    Cria uma tarefa pendente (iniciada numa thread após o commit se
+    DENGUE_TAREFAS_EM_THREAD)
+
+    TarefaEmAndamento se outra tarefa estiver ativa.
+    """
+    if tipo not in TAREFAS:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+
+    liberar_abandonadas()
+    try:
+        with transaction.atomic():
+            nova = TarefaCarga.objects.create(tipo=tipo)
+    except IntegrityError:
+        raise TarefaEmAndamento(TarefaCarga.objects.filter(ativa=True).first())
+
+    if getattr(settings, 'DENGUE_TAREFAS_EM_THREAD', False):
+        transaction.on_commit(lambda: iniciar_thread(nova.pk))
+    return nova
+
+
+def iniciar_thread(pk):
+    thread = threading.Thread(target=_executar_em_thread, args=(pk,), name=f'tarefa-{pk}', daemon=True)
+    thread.start()
+    return thread
+
+
+def _executar_em_thread(pk):
+    try:
+        executar(pk)
+    finally:
+        connections.close_all()
+
+
+def executar(pk):
+    """
+    Executa a tarefa pendente pk; devolve a tarefa (None se outro a pegou)
+    """
+    agora = timezone.now()
+    pegou = TarefaCarga.objects.filter(pk=pk, status='pendente').update(
+        status='executando', iniciada_em=agora, updated_at=agora
+    )
+    if not pegou:
+        return None
+
+    atual = TarefaCarga.objects.get(pk=pk)
+    try:
+        resultado = TAREFAS[atual.tipo](atual)
+    except Exception as e:
+        atual.status, atual.erro = 'falhou', str(e) or e.__class__.__name__
+    else:
+        atual.status, atual.resultado, atual.progresso = 'concluida', resultado, 100
+        atual.etapa = 'Concluída'
+    atual.ativa = None
+    atual.concluida_em = timezone.now()
+    atual.save(update_fields=['status', 'erro', 'resultado', 'progresso', 'etapa', 'ativa',
+                              'concluida_em', 'updated_at'])
+    return atual
+
+
+def executar_pendentes():
+    """
+    Executa, em ordem de criação, as tarefas pendentes; devolve quantas rodaram
+    """
+    executadas = 0
+    while True:
+        pendente = TarefaCarga.objects.filter(status='pendente').order_by('created_at').first()
+        if pendente is None:
+            return executadas
+        if executar(pendente.pk) is not None:
+            executadas += 1
+
+
+def _carregar(atual, nome):
+    caminho = arquivo_estatisticas(nome)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Arquivo {os.path.basename(caminho)} não encontrado. Execute o processamento primeiro.")
+
+    progresso(atual, max(atual.progresso, 10), f'Lendo {os.path.basename(caminho)}')
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+
+    progresso(atual, max(atual.progresso, 40), 'Gravando seções no banco')
+    stat, created = salvar_estatisticas(nome, dados)
+
+    # A versão nova já muda as chaves do cache: só é preciso aquecê-lo
+    progresso(atual, max(atual.progresso, 80), 'Renderizando respostas e aquecendo o cache')
+    aquecer_estatistica(nome, forcar=True)
+    return dados, created
+
+
+@tarefa('estatisticas')
+def carregar_estatisticas(atual):
+    dados, created = _carregar(atual, 'dengue_statistics')
+    return {
+        'total_registros': dados.get('geral', {}).get('total_casos', 0),
+        'created': created
+    }
+
+
+@tarefa('estatisticas_avancadas')
+def carregar_estatisticas_avancadas(atual):
+    _, created = _carregar(atual, 'dengue_advanced_statistics')
+    return {'created': created}
+
+
+def _ler_saida(saida, linhas):
+    """
+    Thread: repassa as linhas da saída do subprocesso; None ao fim
+    """
+    try:
+        for linha in saida:
+            linhas.put(linha)
+    finally:
+        linhas.put(None)
+
+
+def _rodar_processador(atual, comando, nome):
+    """
+    Roda o processador num subprocesso, com a última linha da saída como etapa
+
+    A saída é lida numa thread à parte; a tarefa grava progresso pelo menos
+    a cada INTERVALO_SINAL, mesmo numa etapa em que o processador não
+    imprime nada, para não ser dada como abandonada enquanto ele roda.
+    """
+    caminho = arquivo_estatisticas(nome)
+    antes = os.path.getmtime(caminho) if os.path.exists(caminho) else None
+    raiz = str(settings.BASE_DIR.parent)
+    ambiente = {**os.environ, 'PYTHONPATH': raiz, 'PYTHONUNBUFFERED': '1'}
+
+    progresso(atual, 5, 'Iniciando o processador')
+    processo = subprocess.Popen(
+        [sys.executable, *comando], cwd=diretorio_dados(), env=ambiente,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace'
+    )
+    linhas = queue.Queue()
+    threading.Thread(target=_ler_saida, args=(processo.stdout, linhas), daemon=True).start()
+    ultimas, gravada_em = [], 0.0
+    while True:
+        try:
+            linha = linhas.get(timeout=INTERVALO_SINAL)
+        except queue.Empty:
+            linha = ''
+        if linha is None:
+            break
+        linha = linha.strip()
+        if linha:
+            ultimas = (ultimas + [linha])[-20:]
+        desde = time.monotonic() - gravada_em
+        if (linha and desde >= INTERVALO_ETAPA) or desde >= INTERVALO_SINAL:
+            progresso(atual, 5, ultimas[-1] if ultimas else atual.etapa)
+            gravada_em = time.monotonic()
+
+    if processo.wait() != 0:
+        raise RuntimeError('Processador terminou com erro: ' + ' | '.join(ultimas[-5:]))
+    if not os.path.exists(caminho) or os.path.getmtime(caminho) == antes:
+        raise RuntimeError(f'O processador não gerou {os.path.basename(caminho)}: ' + ' | '.join(ultimas[-5:]))
+    progresso(atual, 60, 'Processamento concluído')
+
+
+@tarefa('processador')
+def processar(atual):
+    raiz = str(settings.BASE_DIR.parent)
+    _rodar_processador(atual, [os.path.join(raiz, 'data_processor.py')], 'dengue_statistics')
+    return carregar_estatisticas(atual)
+
+
+@tarefa('processador_avancado')
+def processar_avancado(atual):
+    raiz = str(settings.BASE_DIR.parent)
+    comando = [os.path.join(raiz, 'scripts', 'run_advanced_processor.py'), '--csv', str(settings.DENGUE_CSV_PATH)]
+    _rodar_processador(atual, comando, 'dengue_advanced_statistics')
+    return carregar_estatisticas_avancadas(atual)
@@ -1,3 +1,881 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+from datetime import date, datetime, timezone
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .apps import _processo_servidor
+from .aquecimento import aquecer_tudo
+from .estatisticas import descartar, obter_secao, obter_secoes, salvar_estatisticas
+from .cache_versionado import aquecer, chave, gravar, obter_compartilhado, versao_entrada
+from .carga import CarregadorCasos
+from .casos import CAMPOS_EXPORTACAO, SINTOMAS, contar_casos, filtrar_casos, paginar_casos
+from .models import CasoDengue, DashboardCache, DengueStatistic, Estado, Municipio, TarefaCarga
+from .serializers import CasoDengueSerializer
+from . import tarefas
+from .tarefas import TEMPO_SEM_PROGRESSO, executar_pendentes
+from .respostas import descartar as descartar_respostas, pre_renderizar
+
+
+class PadroesSintomasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        # bit 0 = febre, bit 1 = mialgia, bit 2 = cefaleia
+        contagens = [0] * 64
+        contagens[0b000] = 5
+        contagens[0b001] = 10
+        contagens[0b011] = 20
+        contagens[0b111] = 15
+        descartar()
+        salvar_estatisticas(
+            'dengue_advanced_statistics',
+            {
+                'padroes_sintomas': {
+                    'sintomas': ['febre', 'mialgia', 'cefaleia', 'exantema', 'vomito', 'nausea'],
+                    'contagens': contagens,
+                    'total_casos': 50
+                }
+            }
+        )
+
+    def test_conjuntos_exatos(self):
+        response = self.client.get('/api/avancado/padroes-sintomas/')
+        self.assertEqual(response.status_code, 200)
+
+        conjuntos = response.json()['conjuntos']
+        self.assertEqual(conjuntos[0], {
+            'sintomas': ['febre', 'mialgia'], 'grau': 2, 'casos': 20, 'percentual': 40.0
+        })
+        self.assertEqual(sum(c['casos'] for c in conjuntos), 50)
+
+    def test_combinacoes_k(self):
+        response = self.client.get('/api/avancado/padroes-sintomas/', {'k': 2})
+        combinacoes = {tuple(c['sintomas']): c['casos'] for c in response.json()['combinacoes']}
+
+        self.assertEqual(combinacoes[('febre', 'mialgia')], 35)
+        self.assertEqual(combinacoes[('febre', 'cefaleia')], 15)
+        self.assertNotIn(('febre', 'exantema'), combinacoes)
+
+        response = self.client.get('/api/avancado/padroes-sintomas/', {'k': 3})
+        self.assertEqual(response.json()['combinacoes'][0]['casos'], 15)
+
+    def test_k_invalido(self):
+        response = self.client.get('/api/avancado/padroes-sintomas/', {'k': 7})
+        self.assertEqual(response.status_code, 400)
+
+    def test_limite_negativo(self):
+        response = self.client.get('/api/avancado/padroes-sintomas/', {'limite': -1})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/avancado/padroes-sintomas/', {'limite': 0})
+        self.assertEqual(response.json()['combinacoes'], [])
+
+
+class CacheVersionadoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar()
+        self.client = APIClient()
+
+    def _carregar(self, total):
+        contagens = [0] * 64
+        contagens[1] = total
+        salvar_estatisticas('dengue_advanced_statistics', {
+            'padroes_sintomas': {'sintomas': ['febre', 'mialgia'], 'contagens': contagens, 'total_casos': total}
+        })
+
+    def test_nova_versao_sem_limpar_o_cache(self):
+        cache.set('outra_aplicacao', 'mantida')
+        self._carregar(10)
+        self.assertEqual(self.client.get('/api/avancado/padroes-sintomas/').json()['total_casos'], 10)
+
+        versao_antiga = versao_entrada('padroes_sintomas')
+        self._carregar(30)
+        self.assertNotEqual(versao_entrada('padroes_sintomas'), versao_antiga)
+        self.assertEqual(self.client.get('/api/avancado/padroes-sintomas/').json()['total_casos'], 30)
+
+        # A entrada antiga só deixa de ser lida; as demais chaves não são tocadas
+        self.assertEqual(cache.get(chave('padroes_sintomas'), version=versao_antiga).valor['total_casos'], 10)
+        self.assertEqual(cache.get('outra_aplicacao'), 'mantida')
+
+    def test_aquecer(self):
+        self._carregar(10)
+        self.assertEqual(aquecer('dengue_advanced_statistics'), ['padroes_sintomas'])
+
+        # Com o cache aquecido, a view só consulta a versão
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/avancado/padroes-sintomas/')
+        self.assertEqual(response.json()['total_casos'], 10)
+
+
+
+class CacheCompartilhadoTests(TestCase):
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        configuracao = override_settings(CACHES={'default': {
+            'BACKEND': 'api.cache_arquivos.CacheEmArquivos', 'LOCATION': diretorio.name
+        }})
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def test_add_atomico(self):
+        self.assertTrue(cache.add('trava', 1, 60))
+        self.assertFalse(cache.add('trava', 2, 60))
+        self.assertEqual(cache.get('trava'), 1)
+
+        # Entrada expirada não impede a nova trava
+        cache.set('expirada', 1, -1)
+        self.assertTrue(cache.add('expirada', 2, 60))
+        self.assertEqual(cache.get('expirada'), 2)
+
+    def test_um_calculo_por_chave(self):
+        calculos = []
+
+        def calcular():
+            calculos.append(1)
+            time.sleep(0.2)
+            return {'valor': 42}
+
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda: resultados.append(obter_compartilhado('payload', 'v1', calcular)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calculos), 1)
+        self.assertEqual(resultados, [{'valor': 42}] * 8)
+
+    def test_vencido_servido_e_recalculado_em_segundo_plano(self):
+        calculos = []
+
+        def calcular():
+            calculos.append(1)
+            time.sleep(0.3)
+            return {'valor': 2}
+
+        gravar('payload', 'v1', {'valor': 1}, timeout=0)
+
+        # O valor vencido sai na hora, sem esperar o recálculo
+        inicio = time.monotonic()
+        self.assertEqual(obter_compartilhado('payload', 'v1', calcular), {'valor': 1})
+        self.assertEqual(obter_compartilhado('payload', 'v1', calcular), {'valor': 1})
+        self.assertLess(time.monotonic() - inicio, 0.2)
+
+        prazo = time.monotonic() + 5
+        while obter_compartilhado('payload', 'v1', calcular) != {'valor': 2} and time.monotonic() < prazo:
+            time.sleep(0.05)
+        self.assertEqual(obter_compartilhado('payload', 'v1', calcular), {'valor': 2})
+        self.assertEqual(len(calculos), 1)
+
+
+
+class CacheDashboardTests(TestCase):
+    def setUp(self):
+        configuracao = override_settings(CACHES={'default': {
+            'BACKEND': 'api.cache_dashboard.CacheDashboard', 'LOCATION': 'testes',
+            'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 4, 'MEMORIA_MAXIMA': 10_000}
+        }})
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        cache.clear()
+
+    def test_memoria_sobre_o_banco(self):
+        cache.set('payload', {'casos': [1, 2, 3]}, 60)
+
+        # Servido da memória, sem consulta
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get('payload'), {'casos': [1, 2, 3]})
+
+        # Processo novo (memória vazia): lê do banco uma vez e guarda na memória
+        cache._memoria.limpar()
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get('payload'), {'casos': [1, 2, 3]})
+        with self.assertNumQueries(0):
+            cache.get('payload')
+
+    def test_memoria_limitada_em_bytes(self):
+        cache.set('grande', b'x' * 20_000, 60)
+        cache.set('pequena', b'x' * 100, 60)
+
+        self.assertNotIn(cache.make_key('grande'), cache._memoria.entradas)
+        self.assertIn(cache.make_key('pequena'), cache._memoria.entradas)
+        self.assertEqual(cache.get('grande'), b'x' * 20_000)
+
+    def test_add_atomico(self):
+        self.assertTrue(cache.add('trava', 1, 60))
+        self.assertFalse(cache.add('trava', 2, 60))
+        self.assertEqual(cache.get('trava'), 1)
+
+        cache.set('expirada', 1, -1)
+        self.assertIsNone(cache.get('expirada'))
+        self.assertTrue(cache.add('expirada', 2, 60))
+        self.assertEqual(cache.get('expirada'), 2)
+
+    def test_varredura_e_limite_de_entradas(self):
+        cache.set('expirada', 0, 60)
+        DashboardCache.objects.filter(cache_key=cache.make_key('expirada')).update(
+            expires_at=datetime(2020, 1, 1, tzinfo=timezone.utc)
+        )
+        for i in range(6):
+            cache.set(f'chave{i}', i, 60)
+        cache.get('chave0')
+        cache.get('chave1')
+
+        # Remove a expirada e as menos acessadas até MAX_ENTRIES - 1 (folga de 1/CULL_FREQUENCY)
+        self.assertEqual(cache.varrer(), 4)
+        self.assertEqual(
+            set(DashboardCache.objects.values_list('cache_key', flat=True)),
+            {cache.make_key(f'chave{i}') for i in (0, 1, 5)}
+        )
+
+    def test_contadores_e_admin(self):
+        self.assertIsNone(cache.get('payload'))
+        cache.set('payload', [1], 60)
+        cache.get('payload')
+        cache.get('payload')
+        cache.gravar_contadores()
+        cache._memoria.limpar()
+        cache.get('payload')
+        cache.gravar_contadores()
+
+        linha = DashboardCache.objects.get(cache_key=cache.make_key('payload'))
+        self.assertEqual((linha.acertos_memoria, linha.acertos_banco, linha.faltas), (2, 1, 1))
+        self.assertIsNotNone(linha.acessado_em)
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'senha'))
+        response = self.client.get('/admin/api/dashboardcache/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['totais_cache']['taxa_acertos'], 75.0)
+        self.assertContains(response, 'taxa de acertos: 75,0%')
+
+
+class AquecimentoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar()
+        descartar_respostas()
+        self.client = APIClient()
+        salvar_estatisticas('dengue_statistics', {'por_ano': {'anos': [2025], 'casos': [10]}})
+        contagens = [0] * 64
+        contagens[1] = 10
+        salvar_estatisticas('dengue_advanced_statistics', {
+            'padroes_sintomas': {'sintomas': ['febre', 'mialgia'], 'contagens': contagens, 'total_casos': 10}
+        })
+
+    def test_aquece_os_endpoints_de_views_e_views_advanced(self):
+        resultado = aquecer_tudo()
+        self.assertIn('estatisticas_por_ano', resultado['dengue_statistics'])
+        self.assertIn('faixas_etarias', resultado['dengue_advanced_statistics'])
+        self.assertIn('padroes_sintomas', resultado['dengue_advanced_statistics'])
+
+        # Depois do aquecimento, as views só consultam a versão
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/anos/').json()['casos'], [10])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/avancado/padroes-sintomas/').json()['total_casos'], 10)
+
+    def test_comando(self):
+        saida = StringIO()
+        call_command('aquecer_cache', '--forcar', stdout=saida)
+        self.assertIn('estatisticas_por_ano', saida.getvalue())
+        self.assertIn('payloads aquecidos', saida.getvalue())
+
+    def test_so_nos_processos_do_servidor(self):
+        casos = [
+            (['manage.py', 'migrate'], {}, False),
+            (['manage.py', 'test', 'api'], {}, False),
+            (['manage.py', 'runserver'], {}, False),
+            (['manage.py', 'runserver'], {'RUN_MAIN': 'true'}, True),
+            (['manage.py', 'runserver', '--noreload'], {}, True),
+            (['/usr/bin/pytest', 'tests'], {}, False),
+            (['-c'], {}, False),
+            (['scripts/qualquer.py'], {}, False),
+        ]
+        for argv, ambiente, esperado in casos:
+            with mock.patch.object(sys, 'argv', argv), mock.patch.dict(os.environ, ambiente):
+                if 'RUN_MAIN' not in ambiente:
+                    os.environ.pop('RUN_MAIN', None)
+                self.assertEqual(_processo_servidor(), esperado, argv)
+
+        # gunicorn e uwsgi são reconhecidos pelos módulos que carregam
+        with mock.patch.object(sys, 'argv', ['/usr/bin/gunicorn', 'denguedashboard.wsgi']):
+            self.assertFalse(_processo_servidor())
+            with mock.patch.dict(sys.modules, {'gunicorn.arbiter': mock.Mock()}):
+                self.assertTrue(_processo_servidor())
+        with mock.patch.object(sys, 'builtin_module_names', sys.builtin_module_names + ('uwsgi',)):
+            self.assertTrue(_processo_servidor())
+
+    def test_variavel_de_ambiente_decide(self):
+        from .apps import ApiConfig
+        from django.apps import apps
+
+        config = apps.get_app_config('api')
+        with mock.patch('api.aquecimento.aquecer_na_inicializacao') as aquecer:
+            for valor, esperado in ((True, 1), (False, 0), (None, 0)):
+                aquecer.reset_mock()
+                with override_settings(DENGUE_AQUECER_AO_INICIAR=valor):
+                    ApiConfig.ready(config)
+                self.assertEqual(aquecer.call_count, esperado, valor)
+
+
+class CuboCasosTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, 'dengue_cubo.npz')
+
+        # Células: (uf, municipio, ano, semana, sexo, faixa, evolucao, padrao) -> casos
+        celulas = [
+            (42, 420460, 2025, 1, 0, 2, 1, 0b011, 10),
+            (42, 420460, 2025, 2, 1, 2, 2, 0b001, 5),
+            (42, 420540, 2025, 2, 0, 5, 1, 0b111, 7),
+            (35, 355030, 2025, 1, 1, -1, -1, -1, 20),
+        ]
+        colunas = list(zip(*celulas))
+        dimensoes = ['uf', 'municipio', 'ano', 'semana', 'sexo', 'faixa_etaria', 'evolucao', 'padrao_sintomas']
+        arrays = {dimensao: np.array(colunas[i]) for i, dimensao in enumerate(dimensoes)}
+        arrays['casos'] = np.array(colunas[-1], dtype=np.int32)
+        arrays['dimensoes'] = np.array(dimensoes)
+        arrays['rotulos_sexo'] = np.array(['F', 'M', 'I'])
+        arrays['rotulos_faixa_etaria'] = np.array(['0-4', '5-14', '15-29', '30-44', '45-59', '60+'])
+        np.savez_compressed(self.caminho, **arrays)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _get(self, **params):
+        with self.settings(DENGUE_CUBO_PATH=self.caminho):
+            return self.client.get('/api/avancado/cubo/', params)
+
+    def test_total_e_agrupamento(self):
+        dados = self._get(agrupar='uf').json()
+        self.assertEqual(dados['total_casos'], 42)
+        self.assertEqual(dados['linhas'], [{'uf': 42, 'casos': 22}, {'uf': 35, 'casos': 20}])
+
+    def test_filtros_e_rotulos(self):
+        dados = self._get(uf='42', agrupar='sexo,faixa_etaria').json()
+        self.assertEqual(dados['linhas'], [
+            {'sexo': 'F', 'faixa_etaria': '15-29', 'casos': 10},
+            {'sexo': 'F', 'faixa_etaria': '60+', 'casos': 7},
+            {'sexo': 'M', 'faixa_etaria': '15-29', 'casos': 5},
+        ])
+
+        dados = self._get(faixa_etaria='ignorado', agrupar='municipio').json()
+        self.assertEqual(dados['linhas'], [{'municipio': 355030, 'casos': 20}])
+
+    def test_sintomas(self):
+        # febre e mialgia: padrões 0b011 e 0b111
+        dados = self._get(sintomas='febre,mialgia').json()
+        self.assertEqual(dados['total_casos'], 17)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self._get(agrupar='bairro').status_code, 400)
+        self.assertEqual(self._get(sexo='X').status_code, 400)
+        self.assertEqual(self._get(limite='muitos').status_code, 400)
+
+    def test_sem_cubo(self):
+        with self.settings(DENGUE_CUBO_PATH=os.path.join(self.diretorio.name, 'nao_existe.npz')):
+            response = self.client.get('/api/avancado/cubo/')
+        self.assertEqual(response.status_code, 404)
+
+
+class SecoesEstatisticaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar()
+        self.client = APIClient()
+        salvar_estatisticas('dengue_statistics', {
+            'por_ano': {'anos': [2024, 2025], 'casos': [10, 20]},
+            'santa_catarina': {'total_casos': 5}
+        })
+        descartar()
+
+    def test_uma_linha_por_secao(self):
+        stat = DengueStatistic.objects.get(name='dengue_statistics')
+        self.assertEqual(stat.data, {'secoes': ['por_ano', 'santa_catarina']})
+        self.assertEqual(
+            dict(stat.secoes.values_list('secao', 'data'))['santa_catarina'], {'total_casos': 5}
+        )
+
+    def test_le_so_a_secao_pedida_uma_vez_por_versao(self):
+        # Versão + a seção pedida
+        with self.assertNumQueries(2):
+            dados = obter_secao('dengue_statistics', 'por_ano')
+
+        # Só a consulta da versão
+        with self.assertNumQueries(1):
+            self.assertIs(obter_secao('dengue_statistics', 'por_ano'), dados)
+
+        # Seções inexistentes também não são consultadas de novo
+        self.assertEqual(obter_secoes('dengue_statistics', ['inexistente']), {'inexistente': None})
+        with self.assertNumQueries(1):
+            self.assertEqual(obter_secao('dengue_statistics', 'inexistente', {}), {})
+
+    def test_recarrega_quando_a_versao_muda(self):
+        obter_secao('dengue_statistics', 'por_ano')
+
+        salvar_estatisticas('dengue_statistics', {'por_ano': {'anos': [2025], 'casos': [30]}})
+        descartar()
+
+        self.assertEqual(obter_secao('dengue_statistics', 'por_ano')['casos'], [30])
+        self.assertIsNone(obter_secoes('dengue_statistics', ['santa_catarina'])['santa_catarina'])
+        response = self.client.get('/api/anos/')
+        self.assertEqual(response.json()['casos'], [30])
+
+    def test_estatistica_ausente(self):
+        with self.assertRaises(DengueStatistic.DoesNotExist):
+            obter_secao('dengue_advanced_statistics', 'faixa_etaria')
+        response = self.client.get('/api/avancado/faixas-etarias/')
+        self.assertEqual(response.status_code, 404)
+
+
+class GetCondicionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar()
+        self.client = APIClient()
+        salvar_estatisticas('dengue_statistics', {'por_ano': {'anos': [2025], 'casos': [10]}})
+
+    def test_etag_e_304_sem_executar_a_view(self):
+        response = self.client.get('/api/anos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=0', response['Cache-Control'])
+        self.assertIn('stale-while-revalidate=3600', response['Cache-Control'])
+        self.assertTrue(response.has_header('Last-Modified'))
+        etag = response['ETag']
+
+        # Só a consulta da versão: nem seção nem cache
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/anos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_muda_ao_recarregar(self):
+        etag = self.client.get('/api/anos/')['ETag']
+
+        salvar_estatisticas('dengue_statistics', {'por_ano': {'anos': [2025], 'casos': [30]}})
+        cache.clear()
+
+        response = self.client.get('/api/anos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['casos'], [30])
+
+    def test_sem_estatisticas_nao_ha_etag(self):
+        response = self.client.get('/api/avancado/faixas-etarias/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+
+class RespostasProntasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar()
+        descartar_respostas()
+        self.client = APIClient()
+        salvar_estatisticas('dengue_statistics', {'por_ano': {'anos': [2024, 2025], 'casos': [10, 20]}})
+
+    def test_servida_sem_montar_o_payload(self):
+        self.assertIn('estatisticas_por_ano', pre_renderizar('dengue_statistics'))
+
+        # Só a consulta da versão, sem ler a seção
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/anos/')
+        self.assertEqual(response.json(), {'anos': [2024, 2025], 'casos': [10, 20], 'total_anos': 2})
+
+    def test_codificacao_negociada(self):
+        response = self.client.get('/api/anos/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['casos'], [10, 20])
+
+        response = self.client.get('/api/anos/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json()['total_anos'], 2)
+
+
+class LoteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar()
+        descartar_respostas()
+        self.client = APIClient()
+        salvar_estatisticas('dengue_statistics', {
+            'por_ano': {'anos': [2025], 'casos': [10]},
+            'santa_catarina': {'total_casos': 5}
+        })
+
+    def test_varias_secoes_numa_resposta(self):
+        response = self.client.get('/api/lote/', {'secoes': 'estatisticas_por_ano,santa_catarina_detalhes,faixas_etarias'})
+        self.assertEqual(response.status_code, 200)
+
+        secoes = response.json()['secoes']
+        self.assertEqual(secoes['estatisticas_por_ano']['dados'], self.client.get('/api/anos/').json())
+        self.assertEqual(secoes['santa_catarina_detalhes']['dados']['total_casos'], 5)
+        self.assertEqual(secoes['faixas_etarias']['status'], 404)
+
+    def test_secoes_conhecidas_e_304(self):
+        response = self.client.get('/api/lote/', {'secoes': 'estatisticas_por_ano'})
+        etag_secao = response.json()['secoes']['estatisticas_por_ano']['etag']
+
+        response = self.client.get('/api/lote/', {'secoes': 'estatisticas_por_ano', 'conhecidas': etag_secao})
+        self.assertEqual(response.json()['secoes']['estatisticas_por_ano'], {'etag': etag_secao, 'nao_modificado': True})
+
+        etag = self.client.get('/api/lote/', {'secoes': 'estatisticas_por_ano'})['ETag']
+        response = self.client.get('/api/lote/', {'secoes': 'estatisticas_por_ano'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_secao_desconhecida(self):
+        response = self.client.get('/api/lote/', {'secoes': 'inexistente'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('faixas_etarias', response.json()['disponiveis'])
+
+
+class CasosTests(TestCase):
+    """
+    Consulta de casos sobre uma tabela grande (DENGUE_CASOS_TESTE linhas)
+
+    O orçamento de queries e de tempo é verificado por padrão com 1 milhão
+    de casos (~20 s de carga no SQLite). Em CI, DENGUE_CASOS_TESTE=200000
+    reduz a tabela; o orçamento de tempo continua o de 1 milhão, então só o
+    número de queries é de fato verificado nesse tamanho.
+    """
+    N_CASOS = int(os.environ.get('DENGUE_CASOS_TESTE', 1_000_000))
+    # Por milhão de casos
+    ORCAMENTO_SEGUNDOS = 5.0
+
+    @classmethod
+    def setUpTestData(cls):
+        sc = Estado.objects.create(codigo_uf='42', nome='Santa Catarina')
+        sp = Estado.objects.create(codigo_uf='35', nome='São Paulo')
+        municipios = [
+            Municipio.objects.create(codigo_ibge='4205407', nome='Florianópolis', estado=sc),
+            Municipio.objects.create(codigo_ibge='4209102', nome='Joinville', estado=sc),
+            Municipio.objects.create(codigo_ibge='3550308', nome='São Paulo', estado=sp),
+        ]
+
+        rng = np.random.default_rng(0)
+        n = cls.N_CASOS
+        mes = rng.integers(1, 13, n)
+        dia = rng.integers(1, 29, n)
+        municipio = rng.integers(0, len(municipios), n)
+        idade = rng.integers(0, 90, n)
+        febre = rng.random(n) < 0.8
+        classificacao = rng.choice([10, 8, 11], n)
+        agora = datetime.now(timezone.utc).isoformat()
+
+        linhas = (
+            (
+                date(2025, int(mes[i]), int(dia[i])).isoformat(), 2025, int(mes[i]),
+                municipios[municipio[i]].estado_id, municipios[municipio[i]].pk,
+                'F' if i % 2 else 'M', int(idade[i]), bool(febre[i]),
+                int(classificacao[i]), 1, agora
+            )
+            for i in range(n)
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {CasoDengue._meta.db_table} "
+                "(data_notificacao, ano, mes, estado_id, municipio_id, sexo, idade, febre, "
+                "mialgia, cefaleia, exantema, vomito, nausea, classificacao_final, evolucao, created_at) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0, 0, 0, 0, 0, %s, %s, %s)",
+                linhas
+            )
+
+        cls.esperado_sc_marco = int(((municipio < 2) & (mes == 3)).sum())
+        cls.esperado_febre_confirmados = int((febre & (classificacao == 10)).sum())
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_filtros_e_contagens(self):
+        response = self.client.get('/api/avancado/casos/', {
+            'estado': '42', 'ano': '2025', 'mes': '3', 'agrupar': 'municipio'
+        })
+        self.assertEqual(response.status_code, 200)
+        dados = response.json()
+        self.assertEqual(dados['total_casos'], self.esperado_sc_marco)
+        self.assertEqual({linha['municipio_nome'] for linha in dados['linhas']}, {'Florianópolis', 'Joinville'})
+        self.assertEqual(sum(linha['casos'] for linha in dados['linhas']), self.esperado_sc_marco)
+
+        total, _ = contar_casos(filtrar_casos({'classificacao_final': ['10']}, ['febre']))
+        self.assertEqual(total, self.esperado_febre_confirmados)
+
+    def test_orcamento_de_queries_e_tempo(self):
+        inicio = time.perf_counter()
+        with self.assertNumQueries(4):
+            total, linhas = contar_casos(
+                filtrar_casos({'estado': ['42', '35']}, data_inicio='2025-02-01', data_fim='2025-06-30'),
+                ['estado', 'municipio', 'mes']
+            )
+        decorrido = time.perf_counter() - inicio
+
+        self.assertEqual(sum(linha['casos'] for linha in linhas), total)
+        self.assertLess(decorrido, self.ORCAMENTO_SEGUNDOS * max(1, self.N_CASOS / 1_000_000))
+
+    def test_indices_compostos_usados(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plano de execução verificado apenas no SQLite')
+
+        consultas = {
+            'caso_estado_ano_mes': filtrar_casos({'estado': ['42'], 'ano': ['2025'], 'mes': ['3']}),
+            'caso_municipio_data': filtrar_casos({'municipio': ['4205407']}, data_inicio='2025-03-01'),
+            'caso_classificacao_evolucao': filtrar_casos({'classificacao_final': ['10'], 'evolucao': ['1']}),
+        }
+        for indice, casos in consultas.items():
+            sql, parametros = casos.values('id').query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', parametros)
+                plano = ' '.join(str(linha[-1]) for linha in cursor.fetchall())
+            self.assertIn(indice, plano)
+
+    def test_sintomas_sao_campos_do_modelo(self):
+        booleanos = [campo.name for campo in CasoDengue._meta.fields if campo.get_internal_type() == 'BooleanField']
+        self.assertEqual(SINTOMAS, booleanos)
+
+    def test_parametros_invalidos(self):
+        for parametros in ({'mes': 'marco'}, {'agrupar': 'cor'}, {'sintomas': 'tosse'},
+                           {'data_inicio': '01/03/2025'}, {'limite': 'x'}):
+            response = self.client.get('/api/avancado/casos/', parametros)
+            self.assertEqual(response.status_code, 400, parametros)
+
+
+class CarregarCasosTests(TestCase):
+    CSV = (
+        "DT_NOTIFIC,NU_ANO,SG_UF_NOT,ID_MUNICIP,CS_SEXO,ANO_NASC,NU_IDADE_N,FEBRE,MIALGIA,CLASSI_FIN,EVOLUCAO\n"
+        "2025-03-10,2025,42,420460,F,1990,,1,2,10,1\n"
+        "2025-03-11,2025,42,420460,M,,4035,2,1,,\n"
+        "2025-04-01,2025,35,355030,X,,3006,,,5,9\n"
+        ",2025,42,420460,F,1990,,1,1,10,1\n"
+    )
+
+    def setUp(self):
+        Estado.objects.create(codigo_uf='42', nome='Santa Catarina')
+        descritor, self.csv_path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(descritor, 'w') as f:
+            f.write(self.CSV)
+
+    def tearDown(self):
+        os.remove(self.csv_path)
+
+    def test_carga(self):
+        saida = StringIO()
+        call_command('carregar_casos', self.csv_path, '--lote', '2', stdout=saida)
+        self.assertIn('3 casos carregados', saida.getvalue())
+        self.assertIn('1 linhas descartadas', saida.getvalue())
+
+        # Idade pela regra das estatísticas (data_idade.idade_em_anos): com as
+        # colunas NU_ANO e ANO_NASC no arquivo, ANO_NASC em branco fica sem idade
+        casos = list(CasoDengue.objects.order_by('data_notificacao'))
+        self.assertEqual([(c.ano, c.mes, c.sexo, c.idade) for c in casos],
+                         [(2025, 3, 'F', 35), (2025, 3, 'M', None), (2025, 4, 'I', None)])
+        self.assertEqual([(c.febre, c.mialgia) for c in casos], [(True, False), (False, True), (False, False)])
+        self.assertEqual([c.classificacao_final for c in casos], [10, None, 5])
+
+        # Município e estado ainda não cadastrados são criados pelo código
+        self.assertEqual(casos[2].estado.nome, 'São Paulo')
+        self.assertEqual(casos[2].municipio.codigo_ibge, '355030')
+        self.assertEqual(Estado.objects.get(codigo_uf='42').total_casos, 2)
+        self.assertEqual(Municipio.objects.get(codigo_ibge='420460').total_casos, 2)
+
+        with connection.cursor() as cursor:
+            restricoes = connection.introspection.get_constraints(cursor, CasoDengue._meta.db_table)
+        for indice in CasoDengue._meta.indexes:
+            self.assertIn(indice.name, restricoes)
+
+    def test_idade_codificada_sem_ano_nasc(self):
+        with open(self.csv_path, 'w') as f:
+            f.write("DT_NOTIFIC,SG_UF_NOT,NU_IDADE_N\n2025-03-10,42,4035\n2025-03-11,42,3006\n2025-03-12,42,4200\n")
+        call_command('carregar_casos', self.csv_path, stdout=StringIO())
+        self.assertEqual(list(CasoDengue.objects.order_by('data_notificacao').values_list('idade', flat=True)),
+                         [35, 0, None])
+
+    def test_criados_por_outro_processo_nao_contam(self):
+        carregador = CarregadorCasos()
+        Estado.objects.create(codigo_uf='35', nome='São Paulo')
+        Municipio.objects.create(codigo_ibge='355030', nome='São Paulo', estado=Estado.objects.get(codigo_uf='35'))
+
+        carregador._ids_municipios(['355030', '420460'])
+        self.assertEqual((carregador.resultado.estados_criados, carregador.resultado.municipios_criados), (0, 1))
+        self.assertEqual(set(carregador.municipios), {'355030', '420460'})
+
+    def test_substituir(self):
+        call_command('carregar_casos', self.csv_path, stdout=StringIO())
+        call_command('carregar_casos', self.csv_path, '--substituir', stdout=StringIO())
+        self.assertEqual(CasoDengue.objects.count(), 3)
+        self.assertEqual(Municipio.objects.count(), 2)
+
+
+class ExportarCasosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sc = Estado.objects.create(codigo_uf='42', nome='Santa Catarina')
+        sp = Estado.objects.create(codigo_uf='35', nome='São Paulo')
+        criciuma = Municipio.objects.create(codigo_ibge='420460', nome='Criciúma', estado=sc)
+        CasoDengue.objects.bulk_create([
+            CasoDengue(
+                data_notificacao=date(2025, 1 + i % 3, 1 + i % 5), ano=2025, mes=1 + i % 3,
+                estado=sc if i % 2 else sp, municipio=criciuma if i % 2 else None,
+                sexo='F', idade=i % 80, febre=bool(i % 3), classificacao_final=10
+            )
+            for i in range(250)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _ndjson(self, response):
+        return [json.loads(linha) for linha in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_ndjson_em_ordem_de_chave(self):
+        response = self.client.get('/api/avancado/casos/exportar/', {'estado': '42'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        linhas = self._ndjson(response)
+
+        esperados = CasoDengue.objects.filter(estado__codigo_uf='42').order_by('data_notificacao', 'id')
+        self.assertEqual(linhas, json.loads(json.dumps(CasoDengueSerializer(esperados, many=True).data)))
+        self.assertEqual(linhas[0]['municipio_nome'], 'Criciúma')
+
+    def test_paginas_por_chave(self):
+        ordenados = list(CasoDengue.objects.order_by('data_notificacao', 'id').values_list('id', flat=True))
+
+        # Uma query por página; sem JOIN por linha
+        with self.assertNumQueries(6):
+            paginas = list(paginar_casos(filtrar_casos(), tamanho_pagina=50))
+        self.assertEqual([linha[0] for pagina in paginas for linha in pagina], ordenados)
+
+        # Retomar a partir da última linha recebida
+        ultima = CasoDengue.objects.get(pk=ordenados[99])
+        response = self.client.get('/api/avancado/casos/exportar/', {
+            'apos': f'{ultima.data_notificacao.isoformat()},{ultima.pk}', 'limite': '30'
+        })
+        self.assertEqual([linha['id'] for linha in self._ndjson(response)], ordenados[100:130])
+
+    def test_csv(self):
+        response = self.client.get('/api/avancado/casos/exportar/', {'formato': 'csv', 'mes': '2'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        linhas = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+        self.assertEqual(linhas[0], list(CAMPOS_EXPORTACAO))
+        self.assertEqual(len(linhas) - 1, CasoDengue.objects.filter(mes=2).count())
+        self.assertIn(linhas[1][CasoDengueSerializer.Meta.fields.index('febre')], ('true', 'false'))
+
+    def test_parametros_invalidos(self):
+        for parametros in ({'formato': 'xml'}, {'apos': 'ontem'}, {'mes': 'marco'}):
+            response = self.client.get('/api/avancado/casos/exportar/', parametros)
+            self.assertEqual(response.status_code, 400, parametros)
+
+
+class TarefasCargaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar()
+        descartar_respostas()
+        self.client = APIClient()
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.diretorio.cleanup)
+        configuracao = override_settings(DENGUE_DADOS_DIR=self.diretorio.name, DENGUE_TAREFAS_EM_THREAD=False)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def _gravar(self, nome, dados):
+        with open(os.path.join(self.diretorio.name, f'{nome}.json'), 'w', encoding='utf-8') as f:
+            json.dump(dados, f)
+
+    def test_carga_em_segundo_plano(self):
+        self._gravar('dengue_statistics', {'geral': {'total_casos': 7}, 'por_ano': {'anos': [2025], 'casos': [7]}})
+
+        response = self.client.post('/api/carregar-estatisticas/')
+        self.assertEqual(response.status_code, 202)
+        tarefa = response.json()['tarefa']
+        self.assertEqual(tarefa['status'], 'pendente')
+        self.assertNotEqual(self.client.get('/api/anos/').status_code, 200)
+
+        # Uma carga por vez
+        response = self.client.post('/api/carregar-estatisticas/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['tarefa']['id'], tarefa['id'])
+
+        self.assertEqual(executar_pendentes(), 1)
+        detalhe = self.client.get(f"/api/tarefas/{tarefa['id']}/").json()
+        self.assertEqual((detalhe['status'], detalhe['progresso']), ('concluida', 100))
+        self.assertEqual(detalhe['resultado'], {'total_registros': 7, 'created': True})
+        self.assertEqual(self.client.get('/api/anos/').json()['anos'], [2025])
+
+        # Concluída, libera a próxima
+        self.assertEqual(self.client.post('/api/carregar-estatisticas/').status_code, 202)
+
+    def test_falha_registrada(self):
+        self._gravar('dengue_advanced_statistics', {})
+        response = self.client.post('/api/tarefas/', {'tipo': 'estatisticas_avancadas'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        os.remove(os.path.join(self.diretorio.name, 'dengue_advanced_statistics.json'))
+
+        executar_pendentes()
+        tarefa = TarefaCarga.objects.get(pk=response.json()['tarefa']['id'])
+        self.assertEqual(tarefa.status, 'falhou')
+        self.assertIn('não encontrado', tarefa.erro)
+        self.assertIsNone(tarefa.ativa)
+
+    def test_tarefa_abandonada_liberada(self):
+        self._gravar('dengue_statistics', {})
+        self.client.post('/api/carregar-estatisticas/')
+        TarefaCarga.objects.update(status='executando', updated_at=datetime.now(timezone.utc) - TEMPO_SEM_PROGRESSO * 2)
+
+        self.assertEqual(self.client.post('/api/carregar-estatisticas/').status_code, 202)
+        self.assertEqual(TarefaCarga.objects.filter(status='falhou').count(), 1)
+
+    def test_tarefa_abandonada_falha_ao_consultar(self):
+        self._gravar('dengue_statistics', {})
+        pk = self.client.post('/api/carregar-estatisticas/').json()['tarefa']['id']
+        TarefaCarga.objects.update(status='executando', updated_at=datetime.now(timezone.utc) - TEMPO_SEM_PROGRESSO * 2)
+
+        detalhe = self.client.get(f'/api/tarefas/{pk}/').json()
+        self.assertEqual(detalhe['status'], 'falhou')
+        self.assertIn('abandonada', detalhe['erro'])
+        self.assertEqual(TarefaCarga.objects.filter(ativa=True).count(), 0)
+
+        # Com progresso recente continua executando, também na listagem
+        TarefaCarga.objects.update(status='executando', ativa=True, updated_at=datetime.now(timezone.utc))
+        self.assertEqual(self.client.get('/api/tarefas/').json()[0]['status'], 'executando')
+        TarefaCarga.objects.update(updated_at=datetime.now(timezone.utc) - TEMPO_SEM_PROGRESSO * 2)
+        self.assertEqual(self.client.get('/api/tarefas/').json()[0]['status'], 'falhou')
+
+    def test_sinal_de_vida_com_processador_em_silencio(self):
+        atual = TarefaCarga.objects.create(tipo='processador', status='executando')
+        codigo = "import json, time; time.sleep(0.5); json.dump({}, open('silencioso.json', 'w'))"
+        with mock.patch.object(tarefas, 'INTERVALO_SINAL', 0.1), \
+                mock.patch.object(tarefas, 'progresso', wraps=tarefas.progresso) as gravar_progresso:
+            tarefas._rodar_processador(atual, ['-c', codigo], 'silencioso')
+
+        # Além do início e do fim, sinais de vida enquanto o processador não imprimia nada
+        self.assertGreaterEqual(gravar_progresso.call_count, 4)
+        self.assertEqual(TarefaCarga.objects.get(pk=atual.pk).etapa, 'Processamento concluído')
+
+    def test_arquivo_ausente_e_tipo_invalido(self):
+        self.assertEqual(self.client.post('/api/carregar-estatisticas/').status_code, 404)
+        response = self.client.post('/api/tarefas/', {'tipo': 'outro'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('processador_avancado', response.json()['disponiveis'])
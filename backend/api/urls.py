@@ -12,9 +12,12 @@ urlpatterns = [
     path('anos/', views.estatisticas_por_ano, name='estatisticas_por_ano'),
     path('sintomas/', views.sintomas_mais_comuns, name='sintomas_mais_comuns'),
     path('santa-catarina/', views.santa_catarina_detalhes, name='santa_catarina_detalhes'),
+    path('lote/', views_advanced.dashboard_lote, name='dashboard_lote'),
     
     # Gerenciamento
     path('carregar-estatisticas/', views.carregar_estatisticas, name='carregar_estatisticas'),
+    path('tarefas/', views.tarefas, name='tarefas'),
+    path('tarefas/<int:pk>/', views.tarefa_detalhe, name='tarefa_detalhe'),
     
     # Utilitários
     path('health/', views.health_check, name='health_check'),
@@ -25,5 +28,9 @@ urlpatterns = [
     path('avancado/genero/', views_advanced.genero_detalhado, name='genero_detalhado'),
     path('avancado/santa-catarina/', views_advanced.santa_catarina_avancado, name='santa_catarina_avancado'),
     path('avancado/sintomas-por-perfil/', views_advanced.sintomas_por_perfil, name='sintomas_por_perfil'),
+    path('avancado/padroes-sintomas/', views_advanced.padroes_sintomas, name='padroes_sintomas'),
+    path('avancado/cubo/', views_advanced.cubo_casos, name='cubo_casos'),
+    path('avancado/casos/', views_advanced.consultar_casos, name='consultar_casos'),
+    path('avancado/casos/exportar/', views_advanced.exportar_casos, name='exportar_casos'),
     path('avancado/carregar-estatisticas/', views_advanced.carregar_estatisticas_avancadas, name='carregar_estatisticas_avancadas'),
 ]
\ No newline at end of file
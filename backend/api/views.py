@@ -2,9 +2,12 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from django.http import JsonResponse
-from django.core.cache import cache
-from .models import DengueStatistic, Estado, Municipio, CasoDengue
-import json
+from .models import DengueStatistic, Estado, Municipio, CasoDengue, TarefaCarga
+from .estatisticas import obter_secao, obter_secoes
+from .condicional import estatisticas_condicionais
+from .respostas import payload, resposta_pronta
+from .serializers import TarefaCargaSerializer
+from .tarefas import TAREFAS, TarefaEmAndamento, arquivo_estatisticas, enfileirar, liberar_abandonadas
 import os
 from datetime import datetime, timedelta
 
@@ -19,38 +22,22 @@ UF_CODES = {
     '52': 'Goiás', '53': 'Distrito Federal'
 }
 
+@payload('dashboard_overview', 'dengue_statistics')
+def _dados_dashboard_overview():
+    secoes = ['geral', 'por_estado', 'demografico', 'sintomas', 'santa_catarina', 'metadata']
+    data = obter_secoes('dengue_statistics', secoes)
+    
+    return {secao: data[secao] or {} for secao in secoes}
+
+@estatisticas_condicionais('dengue_statistics')
 @api_view(['GET'])
 def dashboard_overview(request):
     """
     Endpoint principal do dashboard com visão geral
     """
     try:
-        # Tentar buscar do cache primeiro
-        cache_key = 'dashboard_overview'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
-        # Se não estiver em cache, buscar das estatísticas
         try:
-            stat = DengueStatistic.objects.get(name='dengue_statistics')
-            data = stat.data
-            
-            # Preparar resposta
-            response_data = {
-                'geral': data.get('geral', {}),
-                'por_estado': data.get('por_estado', {}),
-                'demografico': data.get('demografico', {}),
-                'sintomas': data.get('sintomas', {}),
-                'santa_catarina': data.get('santa_catarina', {}),
-                'metadata': data.get('metadata', {})
-            }
-            
-            # Cache por 1 hora
-            cache.set(cache_key, response_data, 3600)
-            
-            return Response(response_data)
+            return resposta_pronta(request, 'dashboard_overview')
             
         except DengueStatistic.DoesNotExist:
             return Response({
@@ -62,190 +49,203 @@ def dashboard_overview(request):
             'error': f'Erro interno: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@payload('estatisticas_por_estado', 'dengue_statistics')
+def _dados_estatisticas_por_estado():
+    data = obter_secao('dengue_statistics', 'por_estado', {})
+    
+    # Adicionar nomes dos estados
+    estados_com_nomes = []
+    for i, uf in enumerate(data.get('uf', [])):
+        estados_com_nomes.append({
+            'codigo': uf,
+            'nome': UF_CODES.get(uf, f'UF {uf}'),
+            'casos': data.get('casos', [])[i] if i < len(data.get('casos', [])) else 0,
+            'percentual': data.get('percentual', [])[i] if i < len(data.get('percentual', [])) else 0
+        })
+    
+    return {
+        'estados': estados_com_nomes,
+        'total_estados': len(estados_com_nomes)
+    }
+
+@estatisticas_condicionais('dengue_statistics')
 @api_view(['GET'])
 def estatisticas_por_estado(request):
     """
     Estatísticas detalhadas por estado
     """
     try:
-        cache_key = 'estatisticas_por_estado'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
-        stat = DengueStatistic.objects.get(name='dengue_statistics')
-        data = stat.data.get('por_estado', {})
-        
-        # Adicionar nomes dos estados
-        estados_com_nomes = []
-        for i, uf in enumerate(data.get('uf', [])):
-            estados_com_nomes.append({
-                'codigo': uf,
-                'nome': UF_CODES.get(uf, f'UF {uf}'),
-                'casos': data.get('casos', [])[i] if i < len(data.get('casos', [])) else 0,
-                'percentual': data.get('percentual', [])[i] if i < len(data.get('percentual', [])) else 0
-            })
-        
-        response_data = {
-            'estados': estados_com_nomes,
-            'total_estados': len(estados_com_nomes)
-        }
-        
-        cache.set(cache_key, response_data, 3600)
-        return Response(response_data)
+        return resposta_pronta(request, 'estatisticas_por_estado')
         
     except Exception as e:
         return Response({
             'error': f'Erro ao buscar dados por estado: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@payload('estatisticas_por_ano', 'dengue_statistics')
+def _dados_estatisticas_por_ano():
+    data = obter_secao('dengue_statistics', 'por_ano', {})
+    
+    return {
+        'anos': data.get('anos', []),
+        'casos': data.get('casos', []),
+        'total_anos': len(data.get('anos', []))
+    }
+
+@estatisticas_condicionais('dengue_statistics')
 @api_view(['GET'])
 def estatisticas_por_ano(request):
     """
     Estatísticas por ano
     """
     try:
-        cache_key = 'estatisticas_por_ano'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
-        stat = DengueStatistic.objects.get(name='dengue_statistics')
-        data = stat.data.get('por_ano', {})
-        
-        response_data = {
-            'anos': data.get('anos', []),
-            'casos': data.get('casos', []),
-            'total_anos': len(data.get('anos', []))
-        }
-        
-        cache.set(cache_key, response_data, 3600)
-        return Response(response_data)
+        return resposta_pronta(request, 'estatisticas_por_ano')
         
     except Exception as e:
         return Response({
             'error': f'Erro ao buscar dados por ano: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@payload('sintomas_mais_comuns', 'dengue_statistics')
+def _dados_sintomas_mais_comuns():
+    sintomas_data = obter_secao('dengue_statistics', 'sintomas', {})
+    
+    # Converter para lista ordenada
+    sintomas_lista = []
+    for sintoma, dados in sintomas_data.items():
+        sintomas_lista.append({
+            'nome': sintoma.upper(),
+            'casos': dados.get('casos', 0),
+            'percentual': dados.get('percentual', 0)
+        })
+    
+    # Ordenar por número de casos
+    sintomas_lista.sort(key=lambda x: x['casos'], reverse=True)
+    
+    return {
+        'sintomas': sintomas_lista,
+        'total_sintomas': len(sintomas_lista)
+    }
+
+@estatisticas_condicionais('dengue_statistics')
 @api_view(['GET'])
 def sintomas_mais_comuns(request):
     """
     Lista dos sintomas mais comuns
     """
     try:
-        cache_key = 'sintomas_mais_comuns'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
-        stat = DengueStatistic.objects.get(name='dengue_statistics')
-        sintomas_data = stat.data.get('sintomas', {})
-        
-        # Converter para lista ordenada
-        sintomas_lista = []
-        for sintoma, dados in sintomas_data.items():
-            sintomas_lista.append({
-                'nome': sintoma.upper(),
-                'casos': dados.get('casos', 0),
-                'percentual': dados.get('percentual', 0)
-            })
-        
-        # Ordenar por número de casos
-        sintomas_lista.sort(key=lambda x: x['casos'], reverse=True)
-        
-        response_data = {
-            'sintomas': sintomas_lista,
-            'total_sintomas': len(sintomas_lista)
-        }
-        
-        cache.set(cache_key, response_data, 3600)
-        return Response(response_data)
+        return resposta_pronta(request, 'sintomas_mais_comuns')
         
     except Exception as e:
         return Response({
             'error': f'Erro ao buscar sintomas: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@payload('santa_catarina_detalhes', 'dengue_statistics')
+def _dados_santa_catarina_detalhes():
+    sc_data = obter_secao('dengue_statistics', 'santa_catarina', {})
+    
+    return {
+        'total_casos': sc_data.get('total_casos', 0),
+        'municipios_afetados': sc_data.get('municipios_afetados', 0),
+        'municipios': sc_data.get('municipios', {}),
+        'criciuma': sc_data.get('criciuma', {}),
+        'analise': {
+            'tem_dados': sc_data.get('total_casos', 0) > 0,
+            'criciuma_identificada': sc_data.get('criciuma', {}).get('casos', 0) > 0,
+            'recomendacao': 'Dados disponíveis para análise detalhada' if sc_data.get('total_casos', 0) > 0 else 'Necessário obter mais dados históricos'
+        }
+    }
+
+@estatisticas_condicionais('dengue_statistics')
 @api_view(['GET'])
 def santa_catarina_detalhes(request):
     """
     Detalhes específicos de Santa Catarina
     """
     try:
-        cache_key = 'santa_catarina_detalhes'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
-        stat = DengueStatistic.objects.get(name='dengue_statistics')
-        sc_data = stat.data.get('santa_catarina', {})
-        
-        response_data = {
-            'total_casos': sc_data.get('total_casos', 0),
-            'municipios_afetados': sc_data.get('municipios_afetados', 0),
-            'municipios': sc_data.get('municipios', {}),
-            'criciuma': sc_data.get('criciuma', {}),
-            'analise': {
-                'tem_dados': sc_data.get('total_casos', 0) > 0,
-                'criciuma_identificada': sc_data.get('criciuma', {}).get('casos', 0) > 0,
-                'recomendacao': 'Dados disponíveis para análise detalhada' if sc_data.get('total_casos', 0) > 0 else 'Necessário obter mais dados históricos'
-            }
-        }
-        
-        cache.set(cache_key, response_data, 3600)
-        return Response(response_data)
+        return resposta_pronta(request, 'santa_catarina_detalhes')
         
     except Exception as e:
         return Response({
             'error': f'Erro ao buscar dados de SC: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def iniciar_tarefa(tipo, mensagem):
+    """
+    Enfileira uma tarefa de carga: 202 com a tarefa, ou 409 se já houver uma ativa
+    """
+    try:
+        tarefa = enfileirar(tipo)
+    except TarefaEmAndamento as e:
+        return Response({
+            'error': 'Já existe uma carga em andamento. Acompanhe a tarefa atual.',
+            'tarefa': TarefaCargaSerializer(e.tarefa).data if e.tarefa else None
+        }, status=status.HTTP_409_CONFLICT)
+    
+    return Response({
+        'message': mensagem,
+        'tarefa': TarefaCargaSerializer(tarefa).data,
+        'acompanhar': f'/api/tarefas/{tarefa.pk}/'
+    }, status=status.HTTP_202_ACCEPTED)
+
 @api_view(['POST'])
 def carregar_estatisticas(request):
     """
-    Endpoint para carregar estatísticas do arquivo JSON
+    Carrega as estatísticas do arquivo JSON em segundo plano (ver tarefas.py)
     """
     try:
-        # Caminho para o arquivo de estatísticas
-        stats_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'dengue_statistics.json')
-        
-        if not os.path.exists(stats_file):
+        if not os.path.exists(arquivo_estatisticas('dengue_statistics')):
             return Response({
                 'error': 'Arquivo dengue_statistics.json não encontrado. Execute o processamento primeiro.'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Ler arquivo JSON
-        with open(stats_file, 'r', encoding='utf-8') as f:
-            stats_data = json.load(f)
-        
-        # Salvar ou atualizar no banco
-        stat, created = DengueStatistic.objects.get_or_create(
-            name='dengue_statistics',
-            defaults={'data': stats_data}
-        )
-        
-        if not created:
-            stat.data = stats_data
-            stat.save()
-        
-        # Limpar cache
-        cache.clear()
+        return iniciar_tarefa('estatisticas', 'Carga das estatísticas iniciada.')
         
+    except Exception as e:
         return Response({
-            'message': 'Estatísticas carregadas com sucesso!',
-            'total_registros': stats_data.get('geral', {}).get('total_casos', 0),
-            'created': created
-        })
+            'error': f'Erro ao carregar estatísticas: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET', 'POST'])
+def tarefas(request):
+    """
+    GET: últimas tarefas de carga. POST {"tipo": ...}: enfileira uma tarefa
+    (estatisticas, estatisticas_avancadas, processador, processador_avancado)
+    """
+    try:
+        if request.method == 'POST':
+            tipo = request.data.get('tipo')
+            if tipo not in TAREFAS:
+                return Response({
+                    'error': f'Tipo de tarefa desconhecido: {tipo}',
+                    'disponiveis': list(TAREFAS)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return iniciar_tarefa(tipo, 'Tarefa iniciada.')
+        
+        liberar_abandonadas()
+        recentes = TarefaCarga.objects.all()[:20]
+        return Response(TarefaCargaSerializer(recentes, many=True).data)
         
     except Exception as e:
         return Response({
-            'error': f'Erro ao carregar estatísticas: {str(e)}'
+            'error': f'Erro nas tarefas de carga: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+def tarefa_detalhe(request, pk):
+    """
+    Status e progresso de uma tarefa de carga
+    """
+    # Uma tarefa de um processo encerrado no meio não fica "executando" para sempre
+    liberar_abandonadas()
+    try:
+        return Response(TarefaCargaSerializer(TarefaCarga.objects.get(pk=pk)).data)
+    except TarefaCarga.DoesNotExist:
+        return Response({
+            'error': f'Tarefa {pk} não encontrada.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
 @api_view(['GET'])
 def health_check(request):
     """
@@ -272,7 +272,9 @@ def api_info(request):
             'estatisticas_por_ano': '/api/anos/',
             'sintomas_mais_comuns': '/api/sintomas/',
             'santa_catarina_detalhes': '/api/santa-catarina/',
+            'dashboard_lote': '/api/lote/?secoes=dashboard_overview,estatisticas_por_ano',
             'carregar_estatisticas': '/api/carregar-estatisticas/',
+            'tarefas': '/api/tarefas/',
             'health_check': '/api/health/'
         }
     })
\ No newline at end of file
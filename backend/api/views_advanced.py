@@ -1,61 +1,67 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.cache import cache
+from django.http import StreamingHttpResponse
 from .models import DengueStatistic
-import json
+from .casos import (FILTROS as FILTROS_CASOS, FORMATOS_EXPORTACAO, contar_casos, cursor_exportacao,
+                    filtrar_casos, paginar_casos)
+from .cache_versionado import em_cache, obter as obter_cache
+from .cubo import obter_cubo
+from .estatisticas import obter_secao
+from .condicional import cubo_condicional, estatisticas_condicionais
+from .respostas import PAYLOADS, payload, resposta_lote, resposta_pronta
+from .tarefas import arquivo_estatisticas
+from .views import iniciar_tarefa
+from data_aggregates import casos_com_todos
+from itertools import combinations
+import numpy as np
 import os
 
+@payload('faixas_etarias', 'dengue_advanced_statistics')
+def _dados_faixas_etarias():
+    data = obter_secao('dengue_advanced_statistics', 'faixa_etaria', {})
+    
+    # Preparar dados para visualização
+    faixas = []
+    casos = []
+    obitos = []
+    letalidade = []
+    percentuais = []
+    
+    # Ordenar as faixas etárias corretamente
+    ordem_faixas = ['0-4', '5-14', '15-29', '30-44', '45-59', '60+']
+    
+    for faixa in ordem_faixas:
+        if faixa in data:
+            faixas.append(faixa)
+            casos.append(data[faixa]['casos'])
+            obitos.append(data[faixa]['obitos'])
+            letalidade.append(data[faixa]['letalidade'])
+            percentuais.append(data[faixa]['percentual_do_total'])
+    
+    return {
+        'faixas': faixas,
+        'casos': casos,
+        'obitos': obitos,
+        'letalidade': letalidade,
+        'percentuais': percentuais,
+        'destaques': {
+            'faixa_mais_afetada': max(zip(faixas, casos), key=lambda x: x[1])[0] if casos else None,
+            'faixa_maior_letalidade': max(zip(faixas, letalidade), key=lambda x: x[1])[0] if letalidade else None,
+            'total_casos_criancas': sum([data.get('0-4', {}).get('casos', 0)]) if data else 0,
+            'total_casos_idosos': sum([data.get('60+', {}).get('casos', 0)]) if data else 0
+        }
+    }
+
+@estatisticas_condicionais('dengue_advanced_statistics')
 @api_view(['GET'])
 def faixas_etarias(request):
     """
     Estatísticas por faixa etária
     """
     try:
-        cache_key = 'faixas_etarias'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
         try:
-            stat = DengueStatistic.objects.get(name='dengue_advanced_statistics')
-            data = stat.data.get('faixa_etaria', {})
-            
-            # Preparar dados para visualização
-            faixas = []
-            casos = []
-            obitos = []
-            letalidade = []
-            percentuais = []
-            
-            # Ordenar as faixas etárias corretamente
-            ordem_faixas = ['0-4', '5-14', '15-29', '30-44', '45-59', '60+']
-            
-            for faixa in ordem_faixas:
-                if faixa in data:
-                    faixas.append(faixa)
-                    casos.append(data[faixa]['casos'])
-                    obitos.append(data[faixa]['obitos'])
-                    letalidade.append(data[faixa]['letalidade'])
-                    percentuais.append(data[faixa]['percentual_do_total'])
-            
-            response_data = {
-                'faixas': faixas,
-                'casos': casos,
-                'obitos': obitos,
-                'letalidade': letalidade,
-                'percentuais': percentuais,
-                'destaques': {
-                    'faixa_mais_afetada': max(zip(faixas, casos), key=lambda x: x[1])[0] if casos else None,
-                    'faixa_maior_letalidade': max(zip(faixas, letalidade), key=lambda x: x[1])[0] if letalidade else None,
-                    'total_casos_criancas': sum([data.get('0-4', {}).get('casos', 0)]) if data else 0,
-                    'total_casos_idosos': sum([data.get('60+', {}).get('casos', 0)]) if data else 0
-                }
-            }
-            
-            cache.set(cache_key, response_data, 3600)
-            return Response(response_data)
+            return resposta_pronta(request, 'faixas_etarias')
             
         except DengueStatistic.DoesNotExist:
             return Response({
@@ -67,83 +73,78 @@ def faixas_etarias(request):
             'error': f'Erro ao buscar dados por faixa etária: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@payload('genero_detalhado', 'dengue_advanced_statistics')
+def _dados_genero_detalhado():
+    data = obter_secao('dengue_advanced_statistics', 'genero_detalhado', {})
+    
+    # Preparar dados para visualização
+    distribuicao_por_faixa = data.get('distribuicao_por_faixa', {})
+    sintomas_por_genero = data.get('sintomas_por_genero', {})
+    evolucao_por_genero = data.get('evolucao_por_genero', {})
+    
+    # Calcular alguns destaques
+    destaques = {}
+    
+    # Faixa etária com maior diferença entre gêneros
+    maior_diferenca = 0
+    faixa_maior_diferenca = None
+    
+    for faixa, valores in distribuicao_por_faixa.items():
+        feminino = valores.get('feminino', 0)
+        masculino = valores.get('masculino', 0)
+        diferenca = abs(feminino - masculino)
+        
+        if diferenca > maior_diferenca:
+            maior_diferenca = diferenca
+            faixa_maior_diferenca = faixa
+    
+    destaques['faixa_maior_diferenca'] = faixa_maior_diferenca
+    
+    # Sintoma com maior diferença percentual entre gêneros
+    maior_dif_sintoma = 0
+    sintoma_maior_diferenca = None
+    
+    sintomas_fem = sintomas_por_genero.get('feminino', {})
+    sintomas_masc = sintomas_por_genero.get('masculino', {})
+    
+    for sintoma in sintomas_fem:
+        if sintoma in sintomas_masc:
+            perc_fem = sintomas_fem[sintoma].get('percentual', 0)
+            perc_masc = sintomas_masc[sintoma].get('percentual', 0)
+            dif_sintoma = abs(perc_fem - perc_masc)
+            
+            if dif_sintoma > maior_dif_sintoma:
+                maior_dif_sintoma = dif_sintoma
+                sintoma_maior_diferenca = sintoma
+    
+    destaques['sintoma_maior_diferenca'] = sintoma_maior_diferenca
+    
+    # Diferença na letalidade
+    letalidade_fem = evolucao_por_genero.get('feminino', {}).get('obito', {}).get('percentual', 0)
+    letalidade_masc = evolucao_por_genero.get('masculino', {}).get('obito', {}).get('percentual', 0)
+    
+    destaques['letalidade'] = {
+        'feminino': letalidade_fem,
+        'masculino': letalidade_masc,
+        'diferenca': abs(letalidade_fem - letalidade_masc)
+    }
+    
+    return {
+        'distribuicao_por_faixa': distribuicao_por_faixa,
+        'sintomas_por_genero': sintomas_por_genero,
+        'evolucao_por_genero': evolucao_por_genero,
+        'destaques': destaques
+    }
+
+@estatisticas_condicionais('dengue_advanced_statistics')
 @api_view(['GET'])
 def genero_detalhado(request):
     """
     Estatísticas detalhadas por gênero
     """
     try:
-        cache_key = 'genero_detalhado'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
         try:
-            stat = DengueStatistic.objects.get(name='dengue_advanced_statistics')
-            data = stat.data.get('genero_detalhado', {})
-            
-            # Preparar dados para visualização
-            distribuicao_por_faixa = data.get('distribuicao_por_faixa', {})
-            sintomas_por_genero = data.get('sintomas_por_genero', {})
-            evolucao_por_genero = data.get('evolucao_por_genero', {})
-            
-            # Calcular alguns destaques
-            destaques = {}
-            
-            # Faixa etária com maior diferença entre gêneros
-            maior_diferenca = 0
-            faixa_maior_diferenca = None
-            
-            for faixa, valores in distribuicao_por_faixa.items():
-                feminino = valores.get('feminino', 0)
-                masculino = valores.get('masculino', 0)
-                diferenca = abs(feminino - masculino)
-                
-                if diferenca > maior_diferenca:
-                    maior_diferenca = diferenca
-                    faixa_maior_diferenca = faixa
-            
-            destaques['faixa_maior_diferenca'] = faixa_maior_diferenca
-            
-            # Sintoma com maior diferença percentual entre gêneros
-            maior_dif_sintoma = 0
-            sintoma_maior_diferenca = None
-            
-            sintomas_fem = sintomas_por_genero.get('feminino', {})
-            sintomas_masc = sintomas_por_genero.get('masculino', {})
-            
-            for sintoma in sintomas_fem:
-                if sintoma in sintomas_masc:
-                    perc_fem = sintomas_fem[sintoma].get('percentual', 0)
-                    perc_masc = sintomas_masc[sintoma].get('percentual', 0)
-                    dif_sintoma = abs(perc_fem - perc_masc)
-                    
-                    if dif_sintoma > maior_dif_sintoma:
-                        maior_dif_sintoma = dif_sintoma
-                        sintoma_maior_diferenca = sintoma
-            
-            destaques['sintoma_maior_diferenca'] = sintoma_maior_diferenca
-            
-            # Diferença na letalidade
-            letalidade_fem = evolucao_por_genero.get('feminino', {}).get('obito', {}).get('percentual', 0)
-            letalidade_masc = evolucao_por_genero.get('masculino', {}).get('obito', {}).get('percentual', 0)
-            
-            destaques['letalidade'] = {
-                'feminino': letalidade_fem,
-                'masculino': letalidade_masc,
-                'diferenca': abs(letalidade_fem - letalidade_masc)
-            }
-            
-            response_data = {
-                'distribuicao_por_faixa': distribuicao_por_faixa,
-                'sintomas_por_genero': sintomas_por_genero,
-                'evolucao_por_genero': evolucao_por_genero,
-                'destaques': destaques
-            }
-            
-            cache.set(cache_key, response_data, 3600)
-            return Response(response_data)
+            return resposta_pronta(request, 'genero_detalhado')
             
         except DengueStatistic.DoesNotExist:
             return Response({
@@ -155,81 +156,76 @@ def genero_detalhado(request):
             'error': f'Erro ao buscar dados detalhados por gênero: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@payload('santa_catarina_avancado', 'dengue_advanced_statistics')
+def _dados_santa_catarina_avancado():
+    data = obter_secao('dengue_advanced_statistics', 'santa_catarina', {})
+    
+    # Adicionar dados de municípios com seus nomes
+    municipios_data = data.get('municipios', {})
+    codigos = municipios_data.get('codigos', [])
+    casos = municipios_data.get('casos', [])
+    
+    # Mapeamento de códigos para nomes (simplificado)
+    # Em uma implementação real, isso viria do banco de dados
+    nomes_municipios = {
+        '420540': 'Florianópolis',
+        '420820': 'Joinville',
+        '420200': 'Blumenau',
+        '420420': 'Balneário Camboriú',
+        '420910': 'Lages',
+        '420830': 'Jaraguá do Sul',
+        '421660': 'São José',
+        '421720': 'São Miguel do Oeste',
+        '420240': 'Brusque',
+        '420890': 'Itajaí',
+        '420460': 'Criciúma'
+    }
+    
+    # Adicionar nomes dos municípios
+    nomes = []
+    for codigo in codigos:
+        nome = nomes_municipios.get(codigo, f'Município {codigo}')
+        nomes.append(nome)
+    
+    municipios = {
+        'codigos': codigos,
+        'nomes': nomes,
+        'casos': casos
+    }
+    
+    # Análise temporal
+    analise_temporal = data.get('analise_temporal', {})
+    
+    # Comparação nacional
+    comparacao_nacional = data.get('comparacao_nacional', {})
+    
+    # Destaques para SC
+    destaques = {
+        'municipio_mais_casos': nomes[0] if nomes else None,
+        'percentual_do_total_nacional': comparacao_nacional.get('percentual_do_total', 0),
+        'incidencia_vs_nacional': comparacao_nacional.get('razao_incidencia', 0),
+        'maior_crescimento_mensal': max(analise_temporal.get('crescimento_percentual', [0])) if analise_temporal else 0
+    }
+    
+    return {
+        'total_casos': data.get('total_casos', 0),
+        'municipios_afetados': data.get('municipios_afetados', 0),
+        'municipios': municipios,
+        'analise_temporal': analise_temporal,
+        'comparacao_nacional': comparacao_nacional,
+        'destaques': destaques,
+        'criciuma': data.get('criciuma', {})
+    }
+
+@estatisticas_condicionais('dengue_advanced_statistics')
 @api_view(['GET'])
 def santa_catarina_avancado(request):
     """
     Estatísticas avançadas para Santa Catarina
     """
     try:
-        cache_key = 'santa_catarina_avancado'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
         try:
-            stat = DengueStatistic.objects.get(name='dengue_advanced_statistics')
-            data = stat.data.get('santa_catarina', {})
-            
-            # Adicionar dados de municípios com seus nomes
-            municipios_data = data.get('municipios', {})
-            codigos = municipios_data.get('codigos', [])
-            casos = municipios_data.get('casos', [])
-            
-            # Mapeamento de códigos para nomes (simplificado)
-            # Em uma implementação real, isso viria do banco de dados
-            nomes_municipios = {
-                '420540': 'Florianópolis',
-                '420820': 'Joinville',
-                '420200': 'Blumenau',
-                '420420': 'Balneário Camboriú',
-                '420910': 'Lages',
-                '420830': 'Jaraguá do Sul',
-                '421660': 'São José',
-                '421720': 'São Miguel do Oeste',
-                '420240': 'Brusque',
-                '420890': 'Itajaí',
-                '420460': 'Criciúma'
-            }
-            
-            # Adicionar nomes dos municípios
-            nomes = []
-            for codigo in codigos:
-                nome = nomes_municipios.get(codigo, f'Município {codigo}')
-                nomes.append(nome)
-            
-            municipios = {
-                'codigos': codigos,
-                'nomes': nomes,
-                'casos': casos
-            }
-            
-            # Análise temporal
-            analise_temporal = data.get('analise_temporal', {})
-            
-            # Comparação nacional
-            comparacao_nacional = data.get('comparacao_nacional', {})
-            
-            # Destaques para SC
-            destaques = {
-                'municipio_mais_casos': nomes[0] if nomes else None,
-                'percentual_do_total_nacional': comparacao_nacional.get('percentual_do_total', 0),
-                'incidencia_vs_nacional': comparacao_nacional.get('razao_incidencia', 0),
-                'maior_crescimento_mensal': max(analise_temporal.get('crescimento_percentual', [0])) if analise_temporal else 0
-            }
-            
-            response_data = {
-                'total_casos': data.get('total_casos', 0),
-                'municipios_afetados': data.get('municipios_afetados', 0),
-                'municipios': municipios,
-                'analise_temporal': analise_temporal,
-                'comparacao_nacional': comparacao_nacional,
-                'destaques': destaques,
-                'criciuma': data.get('criciuma', {})
-            }
-            
-            cache.set(cache_key, response_data, 3600)
-            return Response(response_data)
+            return resposta_pronta(request, 'santa_catarina_avancado')
             
         except DengueStatistic.DoesNotExist:
             return Response({
@@ -241,62 +237,57 @@ def santa_catarina_avancado(request):
             'error': f'Erro ao buscar dados avançados de Santa Catarina: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@payload('sintomas_por_perfil', 'dengue_advanced_statistics')
+def _dados_sintomas_por_perfil():
+    data = obter_secao('dengue_advanced_statistics', 'sintomas_por_perfil', {})
+    
+    # Sintomas por faixa etária
+    por_faixa_etaria = data.get('por_faixa_etaria', {})
+    
+    # Combinações mais comuns
+    combinacoes_mais_comuns = data.get('combinacoes_mais_comuns', [])
+    
+    # Encontrar sintoma mais comum por faixa etária
+    sintoma_mais_comum = {}
+    for faixa, sintomas in por_faixa_etaria.items():
+        max_percentual = 0
+        sintoma_max = None
+        
+        for sintoma, valores in sintomas.items():
+            percentual = valores.get('percentual', 0)
+            if percentual > max_percentual:
+                max_percentual = percentual
+                sintoma_max = sintoma
+        
+        if sintoma_max:
+            sintoma_mais_comum[faixa] = {
+                'sintoma': sintoma_max,
+                'percentual': max_percentual
+            }
+    
+    # Destaques
+    destaques = {
+        'sintoma_mais_comum_criancas': sintoma_mais_comum.get('0-4', {}).get('sintoma', 'N/A'),
+        'sintoma_mais_comum_idosos': sintoma_mais_comum.get('60+', {}).get('sintoma', 'N/A'),
+        'combinacao_mais_comum': combinacoes_mais_comuns[0]['sintomas'] if combinacoes_mais_comuns else []
+    }
+    
+    return {
+        'por_faixa_etaria': por_faixa_etaria,
+        'combinacoes_mais_comuns': combinacoes_mais_comuns,
+        'sintoma_mais_comum_por_faixa': sintoma_mais_comum,
+        'destaques': destaques
+    }
+
+@estatisticas_condicionais('dengue_advanced_statistics')
 @api_view(['GET'])
 def sintomas_por_perfil(request):
     """
     Estatísticas de sintomas por perfil (idade e gênero)
     """
     try:
-        cache_key = 'sintomas_por_perfil'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
         try:
-            stat = DengueStatistic.objects.get(name='dengue_advanced_statistics')
-            data = stat.data.get('sintomas_por_perfil', {})
-            
-            # Sintomas por faixa etária
-            por_faixa_etaria = data.get('por_faixa_etaria', {})
-            
-            # Combinações mais comuns
-            combinacoes_mais_comuns = data.get('combinacoes_mais_comuns', [])
-            
-            # Encontrar sintoma mais comum por faixa etária
-            sintoma_mais_comum = {}
-            for faixa, sintomas in por_faixa_etaria.items():
-                max_percentual = 0
-                sintoma_max = None
-                
-                for sintoma, valores in sintomas.items():
-                    percentual = valores.get('percentual', 0)
-                    if percentual > max_percentual:
-                        max_percentual = percentual
-                        sintoma_max = sintoma
-                
-                if sintoma_max:
-                    sintoma_mais_comum[faixa] = {
-                        'sintoma': sintoma_max,
-                        'percentual': max_percentual
-                    }
-            
-            # Destaques
-            destaques = {
-                'sintoma_mais_comum_criancas': sintoma_mais_comum.get('0-4', {}).get('sintoma', 'N/A'),
-                'sintoma_mais_comum_idosos': sintoma_mais_comum.get('60+', {}).get('sintoma', 'N/A'),
-                'combinacao_mais_comum': combinacoes_mais_comuns[0]['sintomas'] if combinacoes_mais_comuns else []
-            }
-            
-            response_data = {
-                'por_faixa_etaria': por_faixa_etaria,
-                'combinacoes_mais_comuns': combinacoes_mais_comuns,
-                'sintoma_mais_comum_por_faixa': sintoma_mais_comum,
-                'destaques': destaques
-            }
-            
-            cache.set(cache_key, response_data, 3600)
-            return Response(response_data)
+            return resposta_pronta(request, 'sintomas_por_perfil')
             
         except DengueStatistic.DoesNotExist:
             return Response({
@@ -308,39 +299,305 @@ def sintomas_por_perfil(request):
             'error': f'Erro ao buscar dados de sintomas por perfil: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@api_view(['POST'])
-def carregar_estatisticas_avancadas(request):
+def _sintomas_do_padrao(padrao, sintomas):
     """
-    Carrega estatísticas avançadas do arquivo JSON
+    Nomes dos sintomas cujos bits estão ligados no padrão
+    """
+    return [sintoma for bit, sintoma in enumerate(sintomas) if padrao & (1 << bit)]
+
+@em_cache('padroes_sintomas', 'dengue_advanced_statistics')
+def _dados_padroes_sintomas():
+    data = obter_secao('dengue_advanced_statistics', 'padroes_sintomas')
+    if not data:
+        return None
+    
+    return {
+        'sintomas': data.get('sintomas', []),
+        'contagens': data.get('contagens', []),
+        'total_casos': data.get('total_casos', 0)
+    }
+
+@estatisticas_condicionais('dengue_advanced_statistics')
+@api_view(['GET'])
+def padroes_sintomas(request):
+    """
+    Conjuntos exatos de sintomas (UpSet) e combinações k a k
+
+    Parâmetros: k (tamanho das combinações, padrão 2) e limite (padrão 10).
     """
     try:
-        json_file = 'dengue_advanced_statistics.json'
+        try:
+            k = int(request.GET.get('k', 2))
+            limite = int(request.GET.get('limite', 10))
+        except ValueError:
+            return Response({
+                'error': 'Parâmetros k e limite devem ser inteiros.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        versao = request.versao_dados[0] if request.versao_dados else None
+        try:
+            cached_data = obter_cache('padroes_sintomas', versao)
+        except DengueStatistic.DoesNotExist:
+            return Response({
+                'error': 'Estatísticas avançadas não encontradas. Execute o processador avançado primeiro.'
+            }, status=status.HTTP_404_NOT_FOUND)
         
-        if not os.path.exists(json_file):
+        if not cached_data:
             return Response({
-                'error': f'Arquivo {json_file} não encontrado. Execute o processador avançado primeiro.'
+                'error': 'Padrões de sintomas não encontrados. Execute novamente o processador avançado.'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        sintomas = cached_data['sintomas']
+        contagens = cached_data['contagens']
+        total = cached_data['total_casos']
         
-        # Salvar no banco de dados
-        stat, created = DengueStatistic.objects.update_or_create(
-            name='dengue_advanced_statistics',
-            defaults={'data': data}
-        )
+        if not 1 <= k <= len(sintomas) or limite < 0:
+            return Response({
+                'error': f'k deve estar entre 1 e {len(sintomas)} e limite não pode ser negativo.'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Limpar cache
-        cache.delete('faixas_etarias')
-        cache.delete('genero_detalhado')
-        cache.delete('santa_catarina_avancado')
-        cache.delete('sintomas_por_perfil')
+        # Interseções exclusivas (cada caso aparece em um único conjunto)
+        conjuntos = []
+        for padrao, casos in enumerate(contagens):
+            if casos > 0:
+                nomes = _sintomas_do_padrao(padrao, sintomas)
+                conjuntos.append({
+                    'sintomas': nomes,
+                    'grau': len(nomes),
+                    'casos': casos,
+                    'percentual': (casos / total * 100) if total > 0 else 0
+                })
+        conjuntos.sort(key=lambda x: x['casos'], reverse=True)
+        
+        # Combinações k a k (casos com pelo menos esses sintomas)
+        combinacoes_k = []
+        por_padrao = np.asarray(contagens, dtype=np.int64)
+        for indices in combinations(range(len(sintomas)), k):
+            mascara = sum(1 << i for i in indices)
+            casos = casos_com_todos(por_padrao, mascara)
+            if casos > 0:
+                combinacoes_k.append({
+                    'sintomas': [sintomas[i] for i in indices],
+                    'casos': casos,
+                    'percentual': (casos / total * 100) if total > 0 else 0
+                })
+        combinacoes_k.sort(key=lambda x: x['casos'], reverse=True)
         
         return Response({
-            'message': 'Estatísticas avançadas carregadas com sucesso!',
-            'created': created
+            'sintomas': sintomas,
+            'total_casos': total,
+            'conjuntos': conjuntos,
+            'k': k,
+            'combinacoes': combinacoes_k[:limite]
         })
         
+    except Exception as e:
+        return Response({
+            'error': f'Erro ao buscar padrões de sintomas: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _lista_parametro(request, nome):
+    """
+    Valores de um parâmetro aceitando repetição (?uf=42&uf=35) ou vírgulas (?uf=42,35)
+    """
+    valores = []
+    for valor in request.GET.getlist(nome):
+        valores.extend(v.strip() for v in valor.split(',') if v.strip())
+    return valores
+
+def _casos_da_requisicao(request):
+    """
+    (filtros, sintomas, QuerySet) dos filtros da requisição; ValueError se inválidos
+    """
+    filtros = {
+        parametro: _lista_parametro(request, parametro)
+        for parametro in FILTROS_CASOS if request.GET.get(parametro)
+    }
+    sintomas = _lista_parametro(request, 'sintomas')
+    casos = filtrar_casos(
+        filtros, sintomas,
+        data_inicio=request.GET.get('data_inicio'),
+        data_fim=request.GET.get('data_fim'),
+        idade_min=request.GET.get('idade_min'),
+        idade_max=request.GET.get('idade_max')
+    )
+    return filtros, sintomas, casos
+
+def _limite(request):
+    """
+    Parâmetro limite como inteiro (None se ausente); ValueError se inválido
+    """
+    if 'limite' not in request.GET:
+        return None
+    try:
+        return int(request.GET['limite'])
+    except ValueError:
+        raise ValueError('Parâmetro limite deve ser inteiro.')
+
+@api_view(['GET'])
+def consultar_casos(request):
+    """
+    Consulta aos casos individuais (CasoDengue) com filtros e contagens
+
+    Filtros: estado (código UF), municipio (código IBGE), ano, mes, sexo,
+    classificacao_final e evolucao (aceitam vários valores), sintomas (casos
+    com todos esses sintomas), data_inicio/data_fim (AAAA-MM-DD) e
+    idade_min/idade_max. agrupar conta os casos por dimensões (estado,
+    municipio, ano, mes, sexo, idade, classificacao_final, evolucao,
+    data_notificacao); limite restringe o número de grupos.
+    """
+    try:
+        agrupar = _lista_parametro(request, 'agrupar')
+        
+        try:
+            filtros, sintomas, casos = _casos_da_requisicao(request)
+            total, linhas = contar_casos(casos, agrupar, _limite(request))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'filtros': filtros,
+            'sintomas': sintomas,
+            'agrupar': agrupar,
+            'total_casos': total,
+            'linhas': linhas
+        })
+        
+    except Exception as e:
+        return Response({
+            'error': f'Erro ao consultar casos: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def exportar_casos(request):
+    """
+    Exportação dos casos filtrados, transmitida em NDJSON ou CSV
+
+    Aceita os mesmos filtros de consultar_casos, formato (ndjson ou csv),
+    limite (número de linhas) e apos=AAAA-MM-DD,id para retomar depois da
+    última linha recebida. As linhas saem em ordem de (data_notificacao, id),
+    com os campos do CasoDengueSerializer.
+    """
+    try:
+        formato = request.GET.get('formato', 'ndjson')
+        if formato not in FORMATOS_EXPORTACAO:
+            return Response({
+                'error': f'Formato desconhecido: {formato}',
+                'disponiveis': list(FORMATOS_EXPORTACAO)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            _, _, casos = _casos_da_requisicao(request)
+            limite = _limite(request)
+            apos = cursor_exportacao(request.GET['apos']) if request.GET.get('apos') else None
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        tipo, gerar = FORMATOS_EXPORTACAO[formato]
+        response = StreamingHttpResponse(gerar(paginar_casos(casos, apos, limite)), content_type=tipo)
+        response['Content-Disposition'] = f'attachment; filename="casos.{formato}"'
+        return response
+        
+    except Exception as e:
+        return Response({
+            'error': f'Erro ao exportar casos: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@cubo_condicional
+@api_view(['GET'])
+def cubo_casos(request):
+    """
+    Consulta livre ao cubo de casos (soma, filtro e agrupamento)
+
+    Parâmetros: agrupar (dimensões separadas por vírgula), um filtro por
+    dimensão (uf, municipio, ano, semana, sexo, faixa_etaria, evolucao,
+    padrao_sintomas; 'ignorado' seleciona valores ausentes), sintomas (casos
+    com pelo menos esses sintomas) e limite (número de linhas).
+    """
+    try:
+        cubo = obter_cubo()
+        if cubo is None:
+            return Response({
+                'error': 'Cubo de casos não encontrado. Execute o processador avançado primeiro.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        agrupar = _lista_parametro(request, 'agrupar')
+        sintomas = _lista_parametro(request, 'sintomas')
+        filtros = {
+            dimensao: _lista_parametro(request, dimensao)
+            for dimensao in cubo.dimensoes if request.GET.get(dimensao)
+        }
+        
+        try:
+            limite = int(request.GET['limite']) if 'limite' in request.GET else None
+        except ValueError:
+            return Response({
+                'error': 'Parâmetro limite deve ser inteiro.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            total, linhas = cubo.consultar(filtros, agrupar, sintomas, limite)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'dimensoes': cubo.dimensoes,
+            'agrupar': agrupar,
+            'filtros': filtros,
+            'sintomas': sintomas,
+            'total_casos': total,
+            'linhas': linhas
+        })
+        
+    except Exception as e:
+        return Response({
+            'error': f'Erro ao consultar o cubo de casos: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def dashboard_lote(request):
+    """
+    Várias seções fixas do dashboard numa única resposta
+
+    Parâmetros: secoes (nomes dos endpoints, ex.: faixas_etarias,genero_detalhado)
+    e conhecidas (ETags que o cliente já tem; essas seções voltam sem dados).
+    """
+    try:
+        secoes = list(dict.fromkeys(_lista_parametro(request, 'secoes')))
+        if not secoes:
+            return Response({
+                'error': 'Informe as seções no parâmetro secoes.',
+                'disponiveis': sorted(PAYLOADS)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        desconhecidas = [secao for secao in secoes if secao not in PAYLOADS]
+        if desconhecidas:
+            return Response({
+                'error': f'Seções desconhecidas: {", ".join(desconhecidas)}',
+                'disponiveis': sorted(PAYLOADS)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        conhecidas = set(_lista_parametro(request, 'conhecidas'))
+        return resposta_lote(request, secoes, conhecidas)
+        
+    except Exception as e:
+        return Response({
+            'error': f'Erro ao buscar seções do dashboard: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+def carregar_estatisticas_avancadas(request):
+    """
+    Carrega as estatísticas avançadas do arquivo JSON em segundo plano (ver tarefas.py)
+    """
+    try:
+        if not os.path.exists(arquivo_estatisticas('dengue_advanced_statistics')):
+            return Response({
+                'error': 'Arquivo dengue_advanced_statistics.json não encontrado. Execute o processador avançado primeiro.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return iniciar_tarefa('estatisticas_avancadas', 'Carga das estatísticas avançadas iniciada.')
+        
     except Exception as e:
         return Response({
             'error': f'Erro ao carregar estatísticas avançadas: {str(e)}'
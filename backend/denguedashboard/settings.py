@@ -10,11 +10,17 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Módulos de processamento da raiz do repositório (data_aggregates...) usados pela API
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -136,6 +142,61 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Cache compartilhado entre os workers do servidor, sem serviço externo: por
+# padrão, memória do processo sobre a tabela DashboardCache, que sobrevive a
+# reinícios (api/cache_dashboard.py). Com DENGUE_CACHE_DIR, arquivos em disco
+# (add() atômico entre processos); com DENGUE_REDIS_URL, um Redis ou servidor
+# compatível (Valkey, KeyDB...), inclusive local.
+if os.environ.get('DENGUE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DENGUE_REDIS_URL'],
+            'KEY_PREFIX': 'dengue',
+        }
+    }
+elif os.environ.get('DENGUE_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'api.cache_arquivos.CacheEmArquivos',
+            'LOCATION': os.environ['DENGUE_CACHE_DIR'],
+            'TIMEOUT': 3600,
+            'OPTIONS': {'MAX_ENTRIES': 2000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'api.cache_dashboard.CacheDashboard',
+            'TIMEOUT': 3600,
+            'OPTIONS': {
+                'MAX_ENTRIES': 2000,
+                'MEMORIA_MAXIMA': 64 * 1024 * 1024,
+            },
+        }
+    }
+
+# Aquecimento do cache ao iniciar cada processo do servidor, antes de atender
+# requisições (ver api/aquecimento.py). DENGUE_AQUECER_AO_INICIAR=1 no ambiente
+# (definida por quem inicia o servidor) liga e =0 desliga; sem a variável (None),
+# só aquece o runserver, o gunicorn e o uwsgi, nunca scripts e demais comandos
+_aquecer = os.environ.get('DENGUE_AQUECER_AO_INICIAR', '').strip().lower()
+DENGUE_AQUECER_AO_INICIAR = _aquecer in ('1', 'true', 'sim') if _aquecer else None
+
+# Cubo de casos gerado pelo processador avançado (data_cube.py)
+DENGUE_CUBO_PATH = BASE_DIR.parent / 'dengue_cubo.npz'
+
+# Exportação do SINAN usada pela carga dos casos (manage.py carregar_casos)
+DENGUE_CSV_PATH = BASE_DIR.parent / 'Documentos' / 'DENGBR25.csv'
+
+# Diretório dos JSONs gerados pelos processadores (dengue_statistics.json...)
+DENGUE_DADOS_DIR = BASE_DIR.parent
+
+# Tarefas de carga ficam pendentes para `manage.py executar_tarefas --continuo`
+# (ver api/tarefas.py); DENGUE_TAREFAS_EM_THREAD=1 no ambiente as roda numa
+# thread do processo web, só para desenvolvimento com um único processo
+DENGUE_TAREFAS_EM_THREAD = os.environ.get('DENGUE_TAREFAS_EM_THREAD', '').strip().lower() in ('1', 'true', 'sim')
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -152,4 +213,6 @@ CORS_ALLOW_METHODS = [
     'PATCH',
     'POST',
     'PUT',
-]
\ No newline at end of file
+]
+# Validadores do GET condicional visíveis para o frontend
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
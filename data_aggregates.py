@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregados parciais e combináveis das estatísticas de dengue
+
+Cada bloco do CSV vira um DengueAggregates com contagens pequenas (por UF,
+ano, faixa etária x sexo, municípios de SC...). Os blocos são combinados com
+merge() e as seções finais do JSON são montadas a partir das contagens, sem
+nunca manter o arquivo inteiro em memória.
+"""
+
+import pandas as pd
+import numpy as np
+from data_schema import SINTOMAS, FAIXAS_ETARIAS
+from data_cube import contar_cubo
+
+UF_SANTA_CATARINA = 42
+MUNICIPIO_CRICIUMA = 420460
+
+# Padrão de sintomas: bit i ligado quando SINTOMAS[i] == 1 (64 conjuntos possíveis)
+NUM_PADROES = 1 << len(SINTOMAS)
+
+# População aproximada usada no cálculo de incidência
+POPULACAO_SC = 7000000
+POPULACAO_BR = 212000000
+
+
+def padrao_sintomas(df):
+    """
+    Codifica os seis sintomas de cada registro num único inteiro de 6 bits
+    """
+    padrao = np.zeros(len(df), dtype=np.uint8)
+    for bit, sintoma in enumerate(SINTOMAS):
+        presente = (df[sintoma] == 1).to_numpy(dtype=bool, na_value=False)
+        padrao |= presente.astype(np.uint8) << bit
+    return padrao
+
+
+def mascara_sintomas(sintomas):
+    """
+    Máscara de bits de uma lista de sintomas (nomes em maiúsculas ou minúsculas)
+    """
+    mascara = 0
+    for sintoma in sintomas:
+        mascara |= 1 << SINTOMAS.index(sintoma.upper())
+    return mascara
+
+
+def casos_com_todos(contagens, mascara):
+    """
+    Casos que têm pelo menos todos os sintomas da máscara
+
+    contagens[p] é o número de casos com exatamente o conjunto p; a contagem
+    de qualquer par, trio ou combinação k a k é a soma dos superconjuntos.
+    """
+    padroes = np.arange(len(contagens))
+    return int(contagens[(padroes & mascara) == mascara].sum())
+
+
+def _posicoes(inicio, n):
+    """
+    Posição global de cada linha: inicio pode ser a posição da primeira linha
+    (linhas contíguas) ou um array com a posição de cada linha
+    """
+    if np.ndim(inicio) == 0:
+        return np.arange(inicio, inicio + n, dtype=np.int64)
+    return np.asarray(inicio, dtype=np.int64)
+
+
+def _contar(chaves, inicio, dropna=False):
+    """
+    Conta ocorrências por chave guardando a primeira linha em que cada chave apareceu
+
+    A primeira linha permite reproduzir a ordem de desempate do value_counts()
+    depois de combinar vários blocos.
+    """
+    tabela = pd.DataFrame({
+        'chave': chaves,
+        'primeira': _posicoes(inicio, len(chaves))
+    })
+    return tabela.groupby('chave', dropna=dropna, sort=False)['primeira'].agg(['size', 'min']).rename(
+        columns={'size': 'casos', 'min': 'primeira'}
+    )
+
+
+def _combinar_contagens(a, b):
+    """
+    Soma duas tabelas de contagem (casos somados, primeira linha mínima)
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+
+    niveis = list(range(a.index.nlevels))
+    agregacoes = {coluna: ('min' if coluna == 'primeira' else 'sum') for coluna in a.columns}
+    return pd.concat([a, b]).groupby(level=niveis, dropna=False, sort=False).agg(agregacoes)
+
+
+def _subtrair_contagens(a, b):
+    """
+    Remove de a as contagens de b, descartando chaves que ficam sem casos
+
+    b deve conter apenas registros já contados em a. A primeira linha de a é
+    mantida: depois de remoções ela só serve como critério de desempate.
+    """
+    if a is None or b is None:
+        return a
+
+    negativo = b.copy()
+    for coluna in negativo.columns:
+        if coluna != 'primeira':
+            negativo[coluna] = -negativo[coluna]
+
+    resultado = _combinar_contagens(a, negativo)
+    return resultado[resultado['casos'] != 0]
+
+
+def _ordenar_como_value_counts(tabela):
+    """
+    Série de casos ordenada como Series.value_counts() faria sobre os dados originais
+    """
+    por_aparicao = tabela.sort_values('primeira', kind='stable')['casos']
+    por_aparicao = por_aparicao.rename_axis(None)
+    return por_aparicao.sort_values(ascending=False)
+
+
+class DengueAggregates:
+    """
+    Contagens combináveis que reproduzem as seções do processador avançado
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.colunas = set()
+
+        self.datas = None
+        self.anos = None
+        self.uf = None
+        self.perfil = None
+        self.padroes = None
+        self.sc_municipios = None
+        self.sc_meses = None
+        self.cubo = None
+
+    @classmethod
+    def from_frame(cls, df, inicio=0):
+        """
+        Calcula os agregados de um bloco já convertido (com IDADE_ANOS e FAIXA_ETARIA)
+
+        inicio é a posição global da primeira linha do bloco no arquivo, ou
+        um array com a posição de cada linha (ver data_incremental).
+        """
+        agregados = cls()
+        agregados.total = len(df)
+        agregados.colunas = set(df.columns)
+
+        datas = df['DT_NOTIFIC'].value_counts(sort=False)
+        agregados.datas = datas.rename('casos').rename_axis('chave').to_frame()
+
+        posicoes = _posicoes(inicio, len(df))
+        agregados.anos = _contar(df['NU_ANO'].values, posicoes)
+        agregados.uf = _contar(df['SG_UF_NOT'].values, posicoes)
+
+        agregados._contar_perfil(df, posicoes)
+
+        # Santa Catarina
+        em_sc = (df['SG_UF_NOT'] == UF_SANTA_CATARINA).to_numpy(dtype=bool, na_value=False)
+        sc_data = df[em_sc]
+        agregados.sc_municipios = _contar(sc_data['ID_MUNICIP'].values, posicoes[em_sc])
+        if 'MES' in sc_data.columns:
+            meses = sc_data['MES'].value_counts(sort=False)
+            agregados.sc_meses = meses.rename('casos').rename_axis('chave').to_frame()
+
+        agregados.cubo = contar_cubo(df)
+
+        return agregados
+
+    @classmethod
+    def profile_from_frame(cls, df):
+        """
+        Agregados apenas da tabela de perfil (faixa etária x sexo) e da co-ocorrência
+
+        Suficiente para faixa_etaria, genero_detalhado e sintomas_por_perfil no
+        processamento em memória.
+        """
+        agregados = cls()
+        agregados.total = len(df)
+        agregados.colunas = set(df.columns)
+        agregados._contar_perfil(df, 0)
+        return agregados
+
+    def _contar_perfil(self, df, inicio):
+        """
+        Uma única passada agrupada por (faixa etária, sexo)
+
+        Para cada grupo conta casos, curas (EVOLUCAO 1), óbitos (EVOLUCAO 2),
+        casos com cada sintoma e a primeira linha do grupo. Todas as seções por
+        faixa e por sexo saem desta tabela, sem filtrar o DataFrame.
+        """
+        n = len(df)
+        ausente = pd.Categorical(np.full(n, np.nan))
+
+        faixa = (pd.Categorical(df['FAIXA_ETARIA'], categories=FAIXAS_ETARIAS)
+                 if 'FAIXA_ETARIA' in df.columns else ausente)
+        sexo = pd.Categorical(df['CS_SEXO']) if 'CS_SEXO' in df.columns else ausente
+
+        indicadores = {}
+        if 'EVOLUCAO' in df.columns:
+            indicadores['curas'] = (df['EVOLUCAO'] == 1).to_numpy(dtype=bool, na_value=False)
+            indicadores['obitos'] = (df['EVOLUCAO'] == 2).to_numpy(dtype=bool, na_value=False)
+        else:
+            indicadores['curas'] = np.zeros(n, dtype=bool)
+            indicadores['obitos'] = np.zeros(n, dtype=bool)
+        for sintoma in SINTOMAS:
+            if sintoma in df.columns:
+                indicadores[sintoma] = (df[sintoma] == 1).to_numpy(dtype=bool, na_value=False)
+        indicadores['primeira'] = _posicoes(inicio, n)
+
+        grupos = pd.DataFrame(indicadores).groupby(
+            [pd.Series(faixa, name='FAIXA_ETARIA'), pd.Series(sexo, name='CS_SEXO')],
+            dropna=False, sort=False, observed=True
+        )
+        agregacoes = {coluna: ('min' if coluna == 'primeira' else 'sum') for coluna in indicadores}
+        perfil = grupos.agg(agregacoes)
+        perfil.insert(0, 'casos', grupos.size())
+        perfil = perfil.astype({coluna: np.int64 for coluna in perfil.columns})
+
+        # Níveis como object para combinar blocos com categorias diferentes
+        perfil.index = pd.MultiIndex.from_arrays(
+            [perfil.index.get_level_values(nivel).astype(object) for nivel in range(2)],
+            names=['FAIXA_ETARIA', 'CS_SEXO']
+        )
+        self.perfil = perfil
+
+        # Casos por conjunto exato de sintomas (um bincount sobre o padrão)
+        if 'PADRAO_SINTOMAS' in df.columns:
+            padrao = df['PADRAO_SINTOMAS'].to_numpy()
+        elif all(sintoma in df.columns for sintoma in SINTOMAS):
+            padrao = padrao_sintomas(df)
+        else:
+            padrao = None
+
+        if padrao is not None:
+            self.padroes = np.bincount(padrao, minlength=NUM_PADROES).astype(np.int64)
+
+    def merge(self, outro):
+        """
+        Combina outro DengueAggregates neste (in-place)
+        """
+        if outro.total == 0 and not outro.colunas:
+            return self
+
+        self.total += outro.total
+        self.colunas |= outro.colunas
+
+        self.datas = _combinar_contagens(self.datas, outro.datas)
+        self.anos = _combinar_contagens(self.anos, outro.anos)
+        self.uf = _combinar_contagens(self.uf, outro.uf)
+        self.perfil = _combinar_contagens(self.perfil, outro.perfil)
+        self.sc_municipios = _combinar_contagens(self.sc_municipios, outro.sc_municipios)
+        self.sc_meses = _combinar_contagens(self.sc_meses, outro.sc_meses)
+        self.cubo = _combinar_contagens(self.cubo, outro.cubo)
+
+        if outro.padroes is not None:
+            self.padroes = outro.padroes.copy() if self.padroes is None else self.padroes + outro.padroes
+
+        return self
+
+    def subtract(self, outro):
+        """
+        Remove outro DengueAggregates deste (in-place)
+
+        outro deve ter sido calculado sobre registros já incluídos aqui; usado
+        pela ingestão incremental para retirar registros alterados ou removidos.
+        """
+        if outro.total == 0:
+            return self
+
+        self.total -= outro.total
+
+        self.datas = _subtrair_contagens(self.datas, outro.datas)
+        self.anos = _subtrair_contagens(self.anos, outro.anos)
+        self.uf = _subtrair_contagens(self.uf, outro.uf)
+        self.perfil = _subtrair_contagens(self.perfil, outro.perfil)
+        self.sc_municipios = _subtrair_contagens(self.sc_municipios, outro.sc_municipios)
+        self.sc_meses = _subtrair_contagens(self.sc_meses, outro.sc_meses)
+        self.cubo = _subtrair_contagens(self.cubo, outro.cubo)
+
+        if outro.padroes is not None and self.padroes is not None:
+            self.padroes = self.padroes - outro.padroes
+
+        return self
+
+    def shift_rows(self, deslocamento):
+        """
+        Soma `deslocamento` à primeira linha de cada chave (in-place)
+
+        Usado quando o bloco foi agregado com numeração local, por exemplo
+        num worker que não sabe quantas linhas vêm antes do seu trecho.
+        """
+        for tabela in (self.anos, self.uf, self.perfil, self.sc_municipios):
+            if tabela is not None:
+                tabela['primeira'] += deslocamento
+        return self
+
+    def _perfil_por(self, nivel, linhas=None):
+        """
+        Soma a tabela de perfil por um dos níveis (FAIXA_ETARIA ou CS_SEXO)
+        """
+        perfil = self.perfil if linhas is None else self.perfil[linhas]
+        return perfil.drop(columns='primeira').groupby(level=nivel, dropna=False, sort=False).sum()
+
+    def generate_basic_statistics(self):
+        """
+        Seções geral, por_estado, por_ano, demografico e sintomas
+        """
+        stats = {}
+
+        datas = self.datas.index[self.datas['casos'] > 0] if self.datas is not None else []
+        anos = self.anos.sort_values('primeira', kind='stable').index
+
+        stats['geral'] = {
+            'total_casos': self.total,
+            'periodo_inicio': str(datas.min() if len(datas) else pd.NaT),
+            'periodo_fim': str(datas.max() if len(datas) else pd.NaT),
+            'anos_disponiveis': sorted(anos[anos.notna()].tolist()),
+            'estados_unicos': len(self.uf)
+        }
+
+        # value_counts() descarta a UF em branco (NA), que só conta em estados_unicos
+        casos_por_uf = _ordenar_como_value_counts(self.uf[self.uf.index.notna()]).head(20)
+        stats['por_estado'] = {
+            'uf': casos_por_uf.index.astype(str).tolist(),
+            'casos': casos_por_uf.values.tolist()
+        }
+
+        casos_por_ano = self.anos.loc[self.anos.index.notna(), 'casos'].sort_index()
+        stats['por_ano'] = {
+            'anos': casos_por_ano.index.tolist(),
+            'casos': casos_por_ano.values.tolist()
+        }
+
+        por_sexo = self._perfil_por('CS_SEXO')['casos']
+        if 'CS_SEXO' in self.colunas:
+            stats['demografico'] = {
+                'sexo': {
+                    'feminino': int(por_sexo.get('F', 0)),
+                    'masculino': int(por_sexo.get('M', 0))
+                }
+            }
+
+        sintomas_stats = {}
+        for sintoma in SINTOMAS:
+            if sintoma in self.colunas:
+                casos_com_sintoma = int(self.perfil[sintoma].sum())
+                sintomas_stats[sintoma.lower()] = {
+                    'casos': casos_com_sintoma,
+                    'percentual': float((casos_com_sintoma / self.total) * 100)
+                }
+        stats['sintomas'] = sintomas_stats
+
+        return stats
+
+    def analyze_age_groups(self):
+        """
+        Seção faixa_etaria
+        """
+        por_faixa = self._perfil_por('FAIXA_ETARIA')
+
+        letalidade_por_faixa = {}
+        for faixa in FAIXAS_ETARIAS:
+            total_casos = int(por_faixa['casos'].get(faixa, 0))
+
+            if 'EVOLUCAO' in self.colunas and total_casos > 0:
+                obitos = int(por_faixa['obitos'].get(faixa, 0))
+                taxa_letalidade = (obitos / total_casos * 100) if total_casos > 0 else 0
+            else:
+                obitos = 0
+                taxa_letalidade = 0
+
+            letalidade_por_faixa[faixa] = {
+                'casos': int(total_casos),
+                'obitos': int(obitos),
+                'letalidade': float(taxa_letalidade),
+                'percentual_do_total': float(total_casos / self.total * 100) if self.total > 0 else 0
+            }
+
+        return letalidade_por_faixa
+
+    def analyze_gender_details(self):
+        """
+        Seção genero_detalhado (None se não houver CS_SEXO)
+        """
+        if 'CS_SEXO' not in self.colunas:
+            return None
+
+        sexo = self.perfil.index.get_level_values('CS_SEXO')
+        faixa = self.perfil.index.get_level_values('FAIXA_ETARIA')
+        genero = self.perfil[sexo.isin(['M', 'F']) & faixa.notna()]
+
+        # Mesma ordem de unique(): primeira aparição da faixa entre registros M/F
+        ordem = genero.groupby(level='FAIXA_ETARIA', sort=False)['primeira'].min().sort_values(kind='stable')
+
+        genero_por_faixa = {}
+        for faixa_atual in ordem.index:
+            contagens = genero.xs(faixa_atual, level='FAIXA_ETARIA')['casos']
+            genero_por_faixa[faixa_atual] = {
+                'feminino': int(contagens.get('F', 0)),
+                'masculino': int(contagens.get('M', 0))
+            }
+
+        por_sexo = self._perfil_por('CS_SEXO')
+        totais = {
+            'feminino': por_sexo.loc['F'] if 'F' in por_sexo.index else None,
+            'masculino': por_sexo.loc['M'] if 'M' in por_sexo.index else None
+        }
+
+        def _contagem(genero_nome, coluna):
+            linha = totais[genero_nome]
+            return int(linha[coluna]) if linha is not None else 0
+
+        sintomas_por_genero = {'feminino': {}, 'masculino': {}}
+        for sintoma in SINTOMAS:
+            if sintoma not in self.colunas:
+                continue
+
+            for genero_nome in ('feminino', 'masculino'):
+                total_genero = _contagem(genero_nome, 'casos')
+                casos_sintoma = _contagem(genero_nome, sintoma)
+                percentual = (casos_sintoma / total_genero * 100) if total_genero > 0 else 0
+
+                sintomas_por_genero[genero_nome][sintoma.lower()] = {
+                    'casos': int(casos_sintoma),
+                    'percentual': float(percentual)
+                }
+
+        evolucao_por_genero = {'feminino': {}, 'masculino': {}}
+        if 'EVOLUCAO' in self.colunas:
+            for genero_nome in ('feminino', 'masculino'):
+                total_genero = _contagem(genero_nome, 'casos')
+                cura = _contagem(genero_nome, 'curas')
+                obito = _contagem(genero_nome, 'obitos')
+
+                evolucao_por_genero[genero_nome] = {
+                    'cura': {
+                        'casos': int(cura),
+                        'percentual': float((cura / total_genero * 100) if total_genero > 0 else 0)
+                    },
+                    'obito': {
+                        'casos': int(obito),
+                        'percentual': float((obito / total_genero * 100) if total_genero > 0 else 0)
+                    }
+                }
+
+        return {
+            'distribuicao_por_faixa': genero_por_faixa,
+            'sintomas_por_genero': sintomas_por_genero,
+            'evolucao_por_genero': evolucao_por_genero
+        }
+
+    def analyze_santa_catarina_details(self):
+        """
+        Seção santa_catarina
+        """
+        casos_sc = int(self.sc_municipios['casos'].sum()) if self.sc_municipios is not None else 0
+
+        santa_catarina = {
+            'total_casos': casos_sc,
+            'municipios_afetados': len(self.sc_municipios) if casos_sc > 0 else 0
+        }
+
+        if casos_sc > 0:
+            municipios_sc = _ordenar_como_value_counts(self.sc_municipios).head(10)
+            santa_catarina['municipios'] = {
+                'codigos': municipios_sc.index.astype(str).tolist(),
+                'casos': municipios_sc.values.tolist()
+            }
+
+            santa_catarina['criciuma'] = {
+                'casos': int(self.sc_municipios['casos'].get(MUNICIPIO_CRICIUMA, 0))
+            }
+
+            if 'MES' in self.colunas and self.sc_meses is not None:
+                casos_por_mes = self.sc_meses['casos'].sort_index()
+
+                crescimento_mensal = []
+                meses = casos_por_mes.index.tolist()
+                casos = casos_por_mes.values.tolist()
+
+                for i in range(1, len(meses)):
+                    mes_anterior = casos[i-1]
+                    mes_atual = casos[i]
+
+                    if mes_anterior > 0:
+                        crescimento = ((mes_atual - mes_anterior) / mes_anterior) * 100
+                    else:
+                        crescimento = 0
+
+                    crescimento_mensal.append(float(crescimento))
+
+                santa_catarina['analise_temporal'] = {
+                    'meses': meses,
+                    'casos': casos,
+                    'crescimento_percentual': [0] + crescimento_mensal
+                }
+
+            total_nacional = self.total
+            percentual_sc = (casos_sc / total_nacional * 100) if total_nacional > 0 else 0
+
+            incidencia_sc = (casos_sc / POPULACAO_SC) * 100000
+            incidencia_br = (total_nacional / POPULACAO_BR) * 100000
+
+            santa_catarina['comparacao_nacional'] = {
+                'percentual_do_total': float(percentual_sc),
+                'incidencia_por_100k': float(incidencia_sc),
+                'incidencia_nacional_por_100k': float(incidencia_br),
+                'razao_incidencia': float(incidencia_sc / incidencia_br) if incidencia_br > 0 else 0
+            }
+
+        return santa_catarina
+
+    def analyze_symptoms_by_profile(self):
+        """
+        Seção sintomas_por_perfil (None se faltar algum sintoma)
+        """
+        if not all(sintoma in self.colunas for sintoma in SINTOMAS):
+            return None
+
+        por_faixa = self._perfil_por('FAIXA_ETARIA')
+
+        sintomas_por_faixa = {}
+        for faixa in FAIXAS_ETARIAS:
+            total_faixa = int(por_faixa['casos'].get(faixa, 0))
+            sintomas_faixa = {}
+
+            for sintoma in SINTOMAS:
+                casos_sintoma = int(por_faixa[sintoma].get(faixa, 0)) if total_faixa > 0 else 0
+                perc_sintoma = (casos_sintoma / total_faixa * 100) if total_faixa > 0 else 0
+
+                sintomas_faixa[sintoma.lower()] = {
+                    'casos': int(casos_sintoma),
+                    'percentual': float(perc_sintoma)
+                }
+
+            sintomas_por_faixa[faixa] = sintomas_faixa
+
+        combinacoes = []
+        for i in range(len(SINTOMAS)):
+            for j in range(i+1, len(SINTOMAS)):
+                mascara = (1 << i) | (1 << j)
+                casos_combinados = casos_com_todos(self.padroes, mascara) if self.padroes is not None else 0
+
+                if casos_combinados > 0:
+                    combinacoes.append({
+                        'sintomas': [SINTOMAS[i].lower(), SINTOMAS[j].lower()],
+                        'casos': casos_combinados,
+                        'percentual': float((casos_combinados / self.total) * 100)
+                    })
+
+        combinacoes.sort(key=lambda x: x['casos'], reverse=True)
+
+        return {
+            'por_faixa_etaria': sintomas_por_faixa,
+            'combinacoes_mais_comuns': combinacoes[:5]
+        }
+
+    def analyze_symptom_patterns(self):
+        """
+        Seção padroes_sintomas: casos por conjunto exato de sintomas (None se faltar algum)
+
+        contagens[p] traz os casos cujo conjunto de sintomas é exatamente o
+        padrão p (bit i = sintomas[i]); serve para gráficos UpSet e para derivar
+        qualquer combinação com casos_com_todos().
+        """
+        if self.padroes is None:
+            return None
+
+        return {
+            'sintomas': [sintoma.lower() for sintoma in SINTOMAS],
+            'contagens': self.padroes.tolist(),
+            'total_casos': self.total
+        }
+
+    def to_stats(self):
+        """
+        Monta o dicionário de estatísticas na mesma ordem do processamento em memória
+        """
+        stats = self.generate_basic_statistics()
+        stats['faixa_etaria'] = self.analyze_age_groups()
+
+        genero = self.analyze_gender_details()
+        if genero is not None:
+            stats['genero_detalhado'] = genero
+
+        stats['santa_catarina'] = self.analyze_santa_catarina_details()
+
+        perfil = self.analyze_symptoms_by_profile()
+        if perfil is not None:
+            stats['sintomas_por_perfil'] = perfil
+
+        padroes = self.analyze_symptom_patterns()
+        if padroes is not None:
+            stats['padroes_sintomas'] = padroes
+
+        return stats
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache colunar (Feather/Arrow) do DataFrame já convertido
+
+A chave do cache é a impressão digital do conteúdo do CSV somada à versão do
+esquema e à identificação do processador (colunas lidas e conversões feitas).
+Quando o CSV não muda, o arquivo Feather é aberto via memory-map e a leitura
+do CSV e a conversão de tipos são puladas por completo.
+
+Requer pyarrow; sem ele o cache fica desativado e os processadores leem o CSV
+normalmente.
+"""
+
+import hashlib
+import json
+import os
+import glob
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - depende do ambiente
+    pa = None
+    feather = None
+
+from data_schema import SCHEMA_VERSION
+
+TAMANHO_BLOCO_HASH = 8 * 1024 * 1024
+
+
+def cache_disponivel():
+    """
+    Indica se o pyarrow está instalado
+    """
+    return pa is not None
+
+
+def impressao_digital(csv_path, memo_dir):
+    """
+    Hash BLAKE2b do conteúdo do CSV
+
+    O resultado é memorizado em memo_dir, indexado por tamanho e mtime, para
+    não reler arquivos grandes que não mudaram.
+    """
+    info = os.stat(csv_path)
+    assinatura = {'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    nome_csv = os.path.basename(csv_path)
+    memo_path = os.path.join(memo_dir, f"{nome_csv}.fingerprint.json")
+
+    try:
+        with open(memo_path, 'r', encoding='utf-8') as f:
+            memo = json.load(f)
+        if memo.get('assinatura') == assinatura:
+            return memo['hash']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    h = hashlib.blake2b(digest_size=20)
+    with open(csv_path, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b''):
+            h.update(bloco)
+    digest = h.hexdigest()
+
+    try:
+        os.makedirs(memo_dir, exist_ok=True)
+        with open(memo_path, 'w', encoding='utf-8') as f:
+            json.dump({'assinatura': assinatura, 'hash': digest}, f)
+    except OSError:
+        pass
+
+    return digest
+
+
+class ColumnarCache:
+    """
+    Cache Feather de um CSV para um processador específico
+    """
+
+    def __init__(self, csv_path, cache_dir, processador, detalhes=None):
+        """
+        processador e detalhes (ex.: colunas lidas) descrevem o que foi feito
+        com o CSV e entram na chave junto com o conteúdo e SCHEMA_VERSION
+        """
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self.processador = processador
+        self.detalhes = detalhes
+        self._caminho = None
+
+    @property
+    def prefixo(self):
+        nome_csv = os.path.splitext(os.path.basename(self.csv_path))[0]
+        return os.path.join(self.cache_dir, f"{nome_csv}-{self.processador}")
+
+    @property
+    def caminho(self):
+        """
+        Arquivo Feather correspondente ao conteúdo atual do CSV
+        """
+        if self._caminho is None:
+            chave = hashlib.blake2b(digest_size=10)
+            chave.update(impressao_digital(self.csv_path, self.cache_dir).encode())
+            chave.update(f"schema-v{SCHEMA_VERSION}".encode())
+            chave.update(json.dumps(self.detalhes, sort_keys=True).encode())
+            self._caminho = f"{self.prefixo}-{chave.hexdigest()}.feather"
+        return self._caminho
+
+    def existe(self):
+        return cache_disponivel() and os.path.exists(self.caminho)
+
+    def _tabela(self):
+        return feather.read_table(self.caminho, memory_map=True)
+
+    def ler(self):
+        """
+        DataFrame completo a partir do cache mapeado em memória
+        """
+        return self._tabela().to_pandas()
+
+    def num_linhas(self):
+        return self._tabela().num_rows
+
+    def ler_blocos(self, chunksize, inicio=0, fim=None):
+        """
+        Itera as linhas [inicio, fim) do cache em DataFrames de até chunksize linhas
+        """
+        tabela = self._tabela()
+        fim = tabela.num_rows if fim is None else min(fim, tabela.num_rows)
+        for posicao in range(inicio, fim, chunksize):
+            yield tabela.slice(posicao, min(chunksize, fim - posicao)).to_pandas()
+
+    def salvar(self, df):
+        """
+        Grava o DataFrame (sem compressão, para permitir memory-map)
+
+        A escrita é feita num arquivo temporário e trocada atomicamente; caches
+        antigos do mesmo CSV são removidos.
+        """
+        if not cache_disponivel():
+            return False
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporario = self.caminho + '.tmp'
+
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(tabela, temporario, compression='uncompressed')
+        os.replace(temporario, self.caminho)
+
+        for antigo in glob.glob(f"{self.prefixo}-*.feather"):
+            if antigo != self.caminho:
+                try:
+                    os.remove(antigo)
+                except OSError:
+                    pass
+
+        return True
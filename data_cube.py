@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cubo de contagens de casos
+
+Conta os casos por combinação de UF, município, ano, semana epidemiológica,
+sexo, faixa etária, evolução e padrão de sintomas. Só as combinações com
+casos são guardadas (cubo esparso), cada dimensão como um array de inteiros
+compactos, o que permite ao backend responder qualquer filtro ou agrupamento
+sobre essas dimensões sem reprocessar o CSV (ver backend/api/cubo.py).
+
+Todas as dimensões são codificadas como inteiros, com -1 para ignorado:
+códigos numéricos (UF, município, ano, semana, evolução, padrão) valem o
+próprio valor; sexo e faixa etária são índices em ROTULOS.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_schema import FAIXAS_ETARIAS
+
+DIMENSOES_CUBO = ['uf', 'municipio', 'ano', 'semana', 'sexo', 'faixa_etaria', 'evolucao', 'padrao_sintomas']
+
+# Tipo de cada dimensão no arquivo
+TIPOS_CUBO = {
+    'uf': np.int8,
+    'municipio': np.int32,
+    'ano': np.int16,
+    'semana': np.int8,
+    'sexo': np.int8,
+    'faixa_etaria': np.int8,
+    'evolucao': np.int8,
+    'padrao_sintomas': np.int8,
+}
+
+SEXOS = ['F', 'M', 'I']
+
+ROTULOS = {
+    'sexo': SEXOS,
+    'faixa_etaria': FAIXAS_ETARIAS,
+}
+
+
+def semana_epidemiologica(datas):
+    """
+    Semana epidemiológica (1 a 53) de cada data, -1 para datas ausentes
+
+    Semanas de domingo a sábado; a semana 1 é a que tem a maior parte dos
+    dias no ano novo (a quarta-feira cai nele), como no calendário do SINAN.
+    """
+    datas = pd.to_datetime(pd.Series(datas, copy=False), errors='coerce')
+    domingo = datas - pd.to_timedelta((datas.dt.dayofweek + 1) % 7, unit='D')
+    quarta = domingo + pd.Timedelta(days=3)
+    semana = (quarta.dt.dayofyear - 1) // 7 + 1
+    return semana.fillna(-1).to_numpy(dtype=np.int8)
+
+
+def _inteiros(df, coluna, tipo):
+    if coluna not in df.columns:
+        return np.full(len(df), -1, dtype=tipo)
+    valores = pd.to_numeric(df[coluna], errors='coerce')
+    return valores.fillna(-1).to_numpy(dtype=tipo)
+
+
+def _rotulados(df, coluna, rotulos):
+    if coluna not in df.columns:
+        return np.full(len(df), -1, dtype=np.int8)
+    return pd.Categorical(df[coluna], categories=rotulos).codes.astype(np.int8)
+
+
+def codificar_dimensoes(df):
+    """
+    Array de códigos de cada dimensão para um bloco já convertido
+    """
+    return {
+        'uf': _inteiros(df, 'SG_UF_NOT', np.int8),
+        'municipio': _inteiros(df, 'ID_MUNICIP', np.int32),
+        'ano': _inteiros(df, 'NU_ANO', np.int16),
+        'semana': (semana_epidemiologica(df['DT_NOTIFIC']) if 'DT_NOTIFIC' in df.columns
+                   else np.full(len(df), -1, dtype=np.int8)),
+        'sexo': _rotulados(df, 'CS_SEXO', SEXOS),
+        'faixa_etaria': _rotulados(df, 'FAIXA_ETARIA', FAIXAS_ETARIAS),
+        'evolucao': _inteiros(df, 'EVOLUCAO', np.int8),
+        'padrao_sintomas': _inteiros(df, 'PADRAO_SINTOMAS', np.int8),
+    }
+
+
+def contar_cubo(df):
+    """
+    Tabela de contagem do cubo (índice = dimensões, coluna casos)
+
+    A tabela é combinável como as demais de DengueAggregates.
+    """
+    codigos = pd.DataFrame(codificar_dimensoes(df))
+    casos = codigos.groupby(DIMENSOES_CUBO, sort=False).size()
+    return casos.rename('casos').to_frame()
+
+
+def salvar_cubo(tabela, caminho):
+    """
+    Grava o cubo em .npz: um array por dimensão, casos e os rótulos
+    """
+    tabela = tabela[tabela['casos'] > 0].sort_index()
+
+    arrays = {
+        dimensao: tabela.index.get_level_values(dimensao).to_numpy(dtype=TIPOS_CUBO[dimensao])
+        for dimensao in DIMENSOES_CUBO
+    }
+    arrays['casos'] = tabela['casos'].to_numpy(dtype=np.int32)
+    arrays['dimensoes'] = np.array(DIMENSOES_CUBO)
+    for dimensao, rotulos in ROTULOS.items():
+        arrays[f'rotulos_{dimensao}'] = np.array(rotulos)
+
+    np.savez_compressed(caminho, **arrays)
+    return len(tabela)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decodificação vetorizada da idade dos registros do SINAN
+
+A idade pode vir de duas fontes:
+
+- ANO_NASC: idade aproximada = ano da notificação (NU_ANO) - ano de nascimento;
+- NU_IDADE_N: idade codificada, em que o milhar indica a unidade e o restante
+  o valor (no dicionário do SINAN: 1 = horas, 2 = dias, 3 = meses, 4 = anos;
+  ex.: 4035 = 35 anos, 3006 = 6 meses).
+
+Todas as funções operam sobre colunas inteiras com NumPy (sem apply por
+linha) e devolvem arrays float64 com NaN onde a idade é inválida.
+"""
+
+import numpy as np
+import pandas as pd
+
+IDADE_MAXIMA = 120
+
+# Divisor que converte o valor de cada unidade de NU_IDADE_N em anos
+UNIDADES_SINAN = {1: 24 * 365.25, 2: 365.25, 3: 12, 4: 1}
+
+# Leitura usada historicamente por data_processor_fixed.py (1 = dias,
+# 2 = meses, 3 = anos; valores abaixo de 1000 já em anos)
+UNIDADES_LEGADO = {1: 365, 2: 12, 3: 1}
+
+
+def _numerico(valores):
+    """
+    Coluna como array float64, com NaN para ausentes e valores não numéricos
+    """
+    serie = pd.to_numeric(pd.Series(valores, copy=False), errors='coerce')
+    return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _validar(idade, idade_maxima):
+    """
+    Troca por NaN as idades fora de [0, idade_maxima] (in-place)
+    """
+    with np.errstate(invalid='ignore'):
+        idade[~((idade >= 0) & (idade <= idade_maxima))] = np.nan
+    return idade
+
+
+def idade_por_nascimento(nu_ano, ano_nasc, idade_maxima=IDADE_MAXIMA):
+    """
+    Idade em anos a partir do ano da notificação e do ano de nascimento
+    """
+    return _validar(_numerico(nu_ano) - _numerico(ano_nasc), idade_maxima)
+
+
+def idade_por_codigo(nu_idade_n, unidades=UNIDADES_SINAN, anos_sem_unidade=False,
+                     idade_maxima=IDADE_MAXIMA):
+    """
+    Idade em anos a partir de NU_IDADE_N codificado
+
+    unidades mapeia o dígito do milhar para o divisor que leva o valor a anos;
+    códigos com outras unidades ficam NaN. Com anos_sem_unidade, valores
+    abaixo de 1000 são tomados como anos. idade_maxima=None desliga a
+    validação da faixa.
+    """
+    codigo = _numerico(nu_idade_n)
+    unidade = np.floor_divide(codigo, 1000)
+    valor = np.mod(codigo, 1000)
+
+    idade = np.full(len(codigo), np.nan)
+    if anos_sem_unidade:
+        sem_unidade = codigo < 1000
+        idade[sem_unidade] = codigo[sem_unidade]
+
+    for digito, divisor in unidades.items():
+        mascara = unidade == digito
+        idade[mascara] = valor[mascara] / divisor
+
+    if idade_maxima is not None:
+        _validar(idade, idade_maxima)
+    return idade
+
+
+def idade_em_anos(df, unidades=UNIDADES_SINAN):
+    """
+    Idade em anos de cada registro do DataFrame
+
+    Usa NU_ANO - ANO_NASC quando as duas colunas existem; caso contrário,
+    decodifica NU_IDADE_N. Sem nenhuma das fontes, todas as idades são NaN.
+    """
+    if 'NU_ANO' in df.columns and 'ANO_NASC' in df.columns:
+        return idade_por_nascimento(df['NU_ANO'], df['ANO_NASC'])
+
+    if 'NU_IDADE_N' in df.columns:
+        return idade_por_codigo(df['NU_IDADE_N'], unidades)
+
+    return np.full(len(df), np.nan)
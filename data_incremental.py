@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingestão incremental das exportações semanais do SINAN
+
+O DATASUS republica o DENGBR toda semana com notificações novas e revistas.
+Em vez de reprocessar o ano inteiro, o estado incremental guarda:
+
+- os agregados (DengueAggregates) de todos os registros já vistos;
+- uma cópia compacta de cada registro já convertido, indexada pelo hash da
+  chave da notificação (CHAVE_NOTIFICACAO) e com o hash do conteúdo.
+
+Ao receber uma nova exportação, as linhas são lidas e apenas hasheadas; só
+os registros inseridos, alterados ou removidos passam pela conversão de
+tipos e pela agregação: os antigos são subtraídos e os novos somados aos
+agregados. A leitura do CSV continua proporcional ao arquivo, mas conversão
+e análises passam a depender apenas do tamanho da diferença.
+
+Cada registro mantém a posição em que foi visto pela primeira vez, usada
+como critério de desempate (ver data_aggregates). Após remoções, empates de
+contagem podem sair em ordem diferente da de um reprocessamento completo;
+os valores são os mesmos.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from data_aggregates import DengueAggregates
+from data_schema import CHAVE_NOTIFICACAO, SCHEMA_VERSION, ler_csv_sinan
+
+NOME_ESTADO = 'estado_incremental.pkl'
+
+# Colunas internas da tabela de registros
+COLUNA_HASH = '_HASH'
+COLUNA_POSICAO = '_POSICAO'
+
+
+def _hash_linhas(df, colunas):
+    """
+    Hash de 64 bits por linha sobre as colunas indicadas
+    """
+    return pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+
+
+class EstadoIncremental:
+    """
+    Agregados e registros já processados, persistidos entre exportações
+    """
+
+    def __init__(self, estado_dir, analises):
+        self.estado_dir = estado_dir
+        self.analises = list(analises)
+        self.agregados = DengueAggregates()
+        self.registros = None
+        self.proxima_posicao = 0
+
+    @property
+    def caminho(self):
+        return os.path.join(self.estado_dir, NOME_ESTADO)
+
+    @classmethod
+    def carregar(cls, estado_dir, analises):
+        """
+        Lê o estado salvo; devolve um estado vazio se não existir ou for de outra versão
+        """
+        estado = cls(estado_dir, analises)
+
+        if not os.path.exists(estado.caminho):
+            return estado
+
+        with open(estado.caminho, 'rb') as f:
+            dados = pickle.load(f)
+
+        if dados.get('schema') != SCHEMA_VERSION or dados.get('analises') != estado.analises:
+            print("Estado incremental de outra versão do esquema: será reconstruído")
+            return estado
+
+        estado.agregados = dados['agregados']
+        estado.registros = dados['registros']
+        estado.proxima_posicao = dados['proxima_posicao']
+        return estado
+
+    def salvar(self):
+        """
+        Grava o estado num arquivo temporário e o troca atomicamente
+        """
+        os.makedirs(self.estado_dir, exist_ok=True)
+        temporario = self.caminho + '.tmp'
+
+        with open(temporario, 'wb') as f:
+            pickle.dump({
+                'schema': SCHEMA_VERSION,
+                'analises': self.analises,
+                'agregados': self.agregados,
+                'registros': self.registros,
+                'proxima_posicao': self.proxima_posicao
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporario, self.caminho)
+
+    def aplicar(self, processor, csv_path, remover_ausentes=True):
+        """
+        Aplica uma exportação do SINAN ao estado
+
+        processor converte os registros novos (mesmas conversões do modo em
+        memória). Com remover_ausentes, notificações do estado que não estão
+        na exportação são removidas (exportação completa); sem ele, o arquivo
+        é tratado como um lote parcial de inserções e alterações.
+
+        Devolve um resumo com o número de registros inseridos, alterados,
+        removidos e inalterados.
+        """
+        bruto = ler_csv_sinan(csv_path, self.analises + ['chave'])
+
+        faltando = [coluna for coluna in CHAVE_NOTIFICACAO if coluna not in bruto.columns]
+        if faltando:
+            raise ValueError(f"Colunas da chave da notificação ausentes no CSV: {', '.join(faltando)}")
+
+        chave = _hash_linhas(bruto, CHAVE_NOTIFICACAO)
+        conteudo = _hash_linhas(bruto, list(bruto.columns))
+
+        # Notificação repetida no arquivo: vale a última ocorrência
+        repetidas = pd.Index(chave).duplicated(keep='last')
+        if repetidas.any():
+            print(f"Aviso: {int(repetidas.sum()):,} notificações repetidas na exportação; mantida a última")
+            bruto = bruto[~repetidas]
+            chave = chave[~repetidas]
+            conteudo = conteudo[~repetidas]
+
+        if self.registros is None:
+            indice_antigo = np.full(len(chave), -1, dtype=np.int64)
+            hash_antigo = np.empty(0, dtype=np.uint64)
+            posicao_antiga = np.empty(0, dtype=np.int64)
+        else:
+            indice_antigo = self.registros.index.get_indexer(chave)
+            hash_antigo = self.registros[COLUNA_HASH].to_numpy()
+            posicao_antiga = self.registros[COLUNA_POSICAO].to_numpy()
+
+        existe = indice_antigo >= 0
+        alterado = np.zeros(len(chave), dtype=bool)
+        alterado[existe] = hash_antigo[indice_antigo[existe]] != conteudo[existe]
+        inserido = ~existe
+        entrando = inserido | alterado
+
+        # Registros do estado que saem: versões antigas dos alterados e os removidos
+        saindo = np.zeros(0 if self.registros is None else len(self.registros), dtype=bool)
+        saindo[indice_antigo[alterado]] = True
+        removidos = 0
+        if remover_ausentes and self.registros is not None:
+            ausente = ~self.registros.index.isin(chave)
+            removidos = int(ausente.sum())
+            saindo |= ausente
+
+        if saindo.any():
+            antigos = self.registros[saindo]
+            self.agregados.subtract(DengueAggregates.from_frame(
+                antigos.drop(columns=[COLUNA_HASH, COLUNA_POSICAO]),
+                antigos[COLUNA_POSICAO].to_numpy()
+            ))
+
+        novos = None
+        if entrando.any():
+            # Alterados mantêm a posição original; inseridos vão para o fim
+            posicoes = np.empty(len(chave), dtype=np.int64)
+            posicoes[alterado] = posicao_antiga[indice_antigo[alterado]]
+            posicoes[inserido] = np.arange(self.proxima_posicao, self.proxima_posicao + int(inserido.sum()))
+            self.proxima_posicao += int(inserido.sum())
+
+            bloco = bruto[entrando].drop(columns=['NU_NOTIFIC'])
+            self.agregados.merge(processor._aggregate_block(bloco, posicoes[entrando]))
+
+            novos = processor.df
+            processor.df = None
+            novos[COLUNA_HASH] = conteudo[entrando]
+            novos[COLUNA_POSICAO] = posicoes[entrando]
+            novos.index = pd.Index(chave[entrando])
+
+        if self.registros is None:
+            self.registros = novos
+        elif novos is not None or saindo.any():
+            partes = [self.registros[~saindo]] + ([novos] if novos is not None else [])
+            self.registros = pd.concat(partes)
+
+        return {
+            'inseridos': int(inserido.sum()),
+            'alterados': int(alterado.sum()),
+            'removidos': removidos,
+            'inalterados': int((existe & ~alterado).sum())
+        }
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Medição por etapa dos processadores (tempo, CPU, linhas e pico de memória)
+
+Cada método decorado com @medir_etapa registra, ao terminar:
+
+- tempo de parede e tempo de CPU (do processo e dos filhos já encerrados,
+  como os workers do modo paralelo);
+- linhas processadas (len(self.df) ao final da etapa, ou total_registros);
+- pico de RSS durante a etapa e, se ativado, pico de memória alocada pelo
+  Python/NumPy durante a etapa (tracemalloc, ligado só enquanto há etapas
+  em andamento).
+
+No Linux o pico de RSS é zerado no início de cada etapa (/proc/self/clear_refs),
+de modo que cada etapa reporta o seu próprio pico; nos demais sistemas é o
+pico desde o início do processo. Etapas aninhadas (ex.: _convert_data_types
+dentro de load_data) são medidas separadamente e o pico da interna também
+conta para a externa. Etapas repetidas (um _convert_data_types por bloco no
+modo streaming) são somadas no resumo.
+"""
+
+import functools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+MB = 1024 * 1024
+
+
+def _ler_status(campo):
+    """
+    Valor em bytes de um campo de /proc/self/status (ex.: VmHWM), ou None
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for linha in f:
+                if linha.startswith(campo + ':'):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _zerar_pico_rss():
+    """
+    Zera o pico de RSS do processo (Linux); devolve False se não for possível
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def pico_rss():
+    """
+    Pico de RSS do processo em bytes desde o último zeramento
+    """
+    pico = _ler_status('VmHWM')
+    if pico is not None:
+        return pico
+    if resource is None:
+        return 0
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KB nos demais
+    return maximo if sys.platform == 'darwin' else maximo * 1024
+
+
+def _tempo_cpu():
+    tempos = os.times()
+    return tempos.user + tempos.system + tempos.children_user + tempos.children_system
+
+
+class _Etapa:
+    def __init__(self, nome):
+        self.nome = nome
+        self.linhas = None
+        self.pico_rss = 0
+        self.pico_alocado = 0
+
+
+class MedidorEtapas:
+    """
+    Registro das etapas de uma execução de processador
+    """
+
+    def __init__(self, rastrear_alocacoes=False):
+        self.rastrear_alocacoes = rastrear_alocacoes
+        self.registros = []
+        self._pilha = []
+        self._inicio = time.perf_counter()
+        self._cpu_inicio = _tempo_cpu()
+        self.pico_por_etapa = _zerar_pico_rss()
+        self._iniciou_tracemalloc = False
+
+    def _fechar_picos(self, etapa):
+        etapa.pico_rss = max(etapa.pico_rss, pico_rss())
+        if self.rastrear_alocacoes:
+            etapa.pico_alocado = max(etapa.pico_alocado, tracemalloc.get_traced_memory()[1])
+
+    def _zerar_picos(self):
+        if self.pico_por_etapa:
+            _zerar_pico_rss()
+        if self.rastrear_alocacoes:
+            tracemalloc.reset_peak()
+
+    def etapa(self, nome):
+        return _ContextoEtapa(self, nome)
+
+    def _entrar(self, nome):
+        # tracemalloc deixa tudo mais lento: ligado só durante as etapas
+        if self.rastrear_alocacoes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+
+        if self._pilha:
+            self._fechar_picos(self._pilha[-1])
+        self._zerar_picos()
+
+        etapa = _Etapa(nome)
+        etapa.inicio = time.perf_counter()
+        etapa.cpu_inicio = _tempo_cpu()
+        self._pilha.append(etapa)
+        return etapa
+
+    def _sair(self, etapa):
+        self._fechar_picos(etapa)
+        self._pilha.pop()
+        if self._pilha:
+            pai = self._pilha[-1]
+            pai.pico_rss = max(pai.pico_rss, etapa.pico_rss)
+            pai.pico_alocado = max(pai.pico_alocado, etapa.pico_alocado)
+
+        registro = {
+            'etapa': etapa.nome,
+            'nivel': len(self._pilha),
+            'tempo_s': time.perf_counter() - etapa.inicio,
+            'cpu_s': _tempo_cpu() - etapa.cpu_inicio,
+            'linhas': etapa.linhas,
+            'pico_rss_mb': etapa.pico_rss / MB,
+        }
+        if self.rastrear_alocacoes:
+            registro['pico_alocado_mb'] = etapa.pico_alocado / MB
+        self.registros.append(registro)
+
+        if not self._pilha and self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+    def resumo(self):
+        """
+        Etapas agregadas por nome, na ordem da primeira execução
+        """
+        etapas = {}
+        for registro in self.registros:
+            atual = etapas.get(registro['etapa'])
+            if atual is None:
+                etapas[registro['etapa']] = dict(registro, chamadas=1)
+                continue
+            atual['chamadas'] += 1
+            atual['tempo_s'] += registro['tempo_s']
+            atual['cpu_s'] += registro['cpu_s']
+            if registro['linhas'] is not None:
+                atual['linhas'] = (atual['linhas'] or 0) + registro['linhas']
+            for campo in ('pico_rss_mb', 'pico_alocado_mb'):
+                if campo in registro:
+                    atual[campo] = max(atual[campo], registro[campo])
+
+        resultado = []
+        for etapa in etapas.values():
+            tempo = etapa['tempo_s']
+            etapa['linhas_por_s'] = (etapa['linhas'] / tempo) if etapa['linhas'] and tempo > 0 else None
+            for campo in ('tempo_s', 'cpu_s', 'pico_rss_mb', 'pico_alocado_mb', 'linhas_por_s'):
+                if etapa.get(campo) is not None:
+                    etapa[campo] = round(etapa[campo], 4)
+            resultado.append(etapa)
+
+        return {
+            'tempo_total_s': round(time.perf_counter() - self._inicio, 4),
+            'cpu_total_s': round(_tempo_cpu() - self._cpu_inicio, 4),
+            'pico_rss_mb': round(max([r['pico_rss_mb'] for r in self.registros] + [pico_rss() / MB]), 4),
+            'pico_rss_por_etapa': self.pico_por_etapa,
+            'etapas': resultado
+        }
+
+    def salvar(self, caminho, **contexto):
+        """
+        Grava o resumo num arquivo JSON, com informações do ambiente
+        """
+        dados = {
+            'gerado_em': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            **contexto,
+            **self.resumo()
+        }
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        return dados
+
+
+class _ContextoEtapa:
+    def __init__(self, medidor, nome):
+        self.medidor = medidor
+        self.nome = nome
+        self.etapa = None
+
+    def __enter__(self):
+        self.etapa = self.medidor._entrar(self.nome)
+        return self.etapa
+
+    def __exit__(self, *exc):
+        self.medidor._sair(self.etapa)
+        return False
+
+
+def _linhas(processor):
+    df = getattr(processor, 'df', None)
+    if df is not None:
+        return len(df)
+    return getattr(processor, 'total_registros', None)
+
+
+def medir_etapa(metodo):
+    """
+    Decorador de métodos de processador: mede a etapa em self.medidor (se houver)
+    """
+    @functools.wraps(metodo)
+    def medido(self, *args, **kwargs):
+        medidor = getattr(self, 'medidor', None)
+        if medidor is None:
+            return metodo(self, *args, **kwargs)
+
+        with medidor.etapa(metodo.__name__) as etapa:
+            resultado = metodo(self, *args, **kwargs)
+            etapa.linhas = _linhas(self)
+        return resultado
+
+    return medido
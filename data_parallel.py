@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Processamento paralelo do processador avançado
+
+O arquivo é dividido em faixas contíguas de linhas (trechos de bytes do CSV
+ou fatias do cache Feather). Cada worker de um ProcessPoolExecutor converte
+a sua faixa e devolve um DengueAggregates; o processo principal ajusta a
+numeração das linhas e combina os parciais na ordem do arquivo, de modo que
+o resultado é idêntico ao processamento serial.
+
+O particionamento por bytes assume um registro por linha (o layout do SINAN
+não usa quebras de linha dentro de campos).
+"""
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_aggregates import DengueAggregates
+from data_schema import compactar, parametros_leitura
+
+
+def particionar_csv(csv_path, partes):
+    """
+    Divide o CSV (sem o cabeçalho) em até `partes` trechos de bytes alinhados a linhas
+    """
+    tamanho = os.path.getsize(csv_path)
+
+    with open(csv_path, 'rb') as f:
+        f.readline()
+        inicio_dados = f.tell()
+
+        limites = [inicio_dados]
+        passo = max((tamanho - inicio_dados) // partes, 1)
+        for i in range(1, partes):
+            f.seek(max(inicio_dados + i * passo, limites[-1]))
+            if f.tell() > inicio_dados:
+                f.seek(f.tell() - 1)
+                f.readline()
+            limites.append(f.tell())
+        limites.append(tamanho)
+
+    return [(a, b) for a, b in zip(limites, limites[1:]) if b > a]
+
+
+def ler_trecho_csv_sinan(csv_path, analises, inicio, fim, chunksize=None):
+    """
+    Lê apenas as linhas entre os bytes inicio e fim do CSV (sem cabeçalho)
+
+    inicio e fim devem cair em começos de linha. Usado pelo processamento
+    paralelo, em que cada worker lê o seu trecho do arquivo. Devolve sempre
+    um iterador de blocos.
+    """
+    cabecalho = pd.read_csv(csv_path, nrows=0).columns
+    colunas, tipos = parametros_leitura(cabecalho, analises)
+
+    with open(csv_path, 'rb') as f:
+        f.seek(inicio)
+        trecho = _TrechoArquivo(f, fim - inicio)
+        opcoes = {'header': None, 'names': list(cabecalho), 'usecols': colunas, 'dtype': tipos}
+
+        if not chunksize:
+            yield compactar(pd.read_csv(trecho, **opcoes))
+            return
+
+        for bloco in pd.read_csv(trecho, chunksize=chunksize, **opcoes):
+            yield compactar(bloco)
+
+
+class _TrechoArquivo(io.RawIOBase):
+    """
+    Visão somente leitura de um trecho de um arquivo binário já posicionado
+
+    read(), readinto() e a iteração por linhas (readline) param no fim do
+    trecho; como arquivo binário, o pandas o decodifica em qualquer motor.
+    """
+
+    def __init__(self, f, tamanho):
+        super().__init__()
+        self.f = f
+        self.restante = tamanho
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        dados = self.read(len(destino))
+        destino[:len(dados)] = dados
+        return len(dados)
+
+    def read(self, n=-1):
+        if self.restante <= 0:
+            return b''
+        if n is None or n < 0 or n > self.restante:
+            n = self.restante
+        dados = self.f.read(n)
+        self.restante -= len(dados)
+        return dados
+
+    def readline(self, n=-1):
+        if self.restante <= 0:
+            return b''
+        if n is None or n < 0 or n > self.restante:
+            n = self.restante
+        linha = self.f.readline(n)
+        self.restante -= len(linha)
+        return linha
+
+
+def particionar_linhas(total, partes):
+    """
+    Divide `total` linhas em até `partes` faixas contíguas
+    """
+    passo = -(-total // partes) if total else 0
+    return [(inicio, min(inicio + passo, total)) for inicio in range(0, total, passo or 1)]
+
+
+def _agregar_trecho_csv(args):
+    """
+    Worker: converte e agrega um trecho de bytes do CSV
+    """
+    processor_cls, csv_path, inicio, fim, chunksize = args
+    processor = processor_cls(csv_path)
+
+    agregados = DengueAggregates()
+    linhas = 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for bloco in ler_trecho_csv_sinan(csv_path, processor.ANALISES, inicio, fim, chunksize):
+            agregados.merge(processor._aggregate_block(bloco, linhas))
+            linhas += len(bloco)
+
+    return agregados
+
+
+def _agregar_fatia_cache(args):
+    """
+    Worker: agrega uma faixa de linhas do cache Feather (já convertido)
+    """
+    processor_cls, csv_path, cache, inicio, fim, chunksize = args
+    processor = processor_cls(csv_path)
+
+    agregados = DengueAggregates()
+    linhas = 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for bloco in cache.ler_blocos(chunksize or (fim - inicio), inicio, fim):
+            agregados.merge(processor._aggregate_block(bloco, linhas, convertido=True))
+            linhas += len(bloco)
+
+    return agregados
+
+
+def agregar_em_paralelo(processor, workers, cache=None):
+    """
+    Agrega o CSV (ou o cache, se existir) do processador usando `workers` processos
+
+    Devolve um único DengueAggregates com o arquivo inteiro.
+    """
+    processor_cls = type(processor)
+
+    if cache is not None and cache.existe():
+        faixas = particionar_linhas(cache.num_linhas(), workers)
+        funcao = _agregar_fatia_cache
+        tarefas = [(processor_cls, processor.csv_path, cache, inicio, fim, processor.chunksize)
+                   for inicio, fim in faixas]
+    else:
+        trechos = particionar_csv(processor.csv_path, workers)
+        funcao = _agregar_trecho_csv
+        tarefas = [(processor_cls, processor.csv_path, inicio, fim, processor.chunksize)
+                   for inicio, fim in trechos]
+
+    agregados = DengueAggregates()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map preserva a ordem das faixas: cada parcial é deslocado pelo
+        # número de linhas anteriores antes de ser combinado
+        for parcial in executor.map(funcao, tarefas):
+            parcial.shift_rows(agregados.total)
+            agregados.merge(parcial)
+
+    return agregados
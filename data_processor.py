@@ -9,14 +9,23 @@ import numpy as np
 import json
 from datetime import datetime
 import warnings
+from data_schema import ler_csv_sinan
+from data_metricas import MedidorEtapas, medir_etapa
 warnings.filterwarnings('ignore')
 
 class DengueDataProcessor:
-    def __init__(self, csv_path):
+    # Análises executadas; definem as colunas lidas do CSV (ver data_schema)
+    ANALISES = ['geral', 'demografico', 'sintomas', 'idade', 'santa_catarina']
+    
+    def __init__(self, csv_path, perfil_path=None, rastrear_alocacoes=False):
         self.csv_path = csv_path
         self.df = None
         self.stats = {}
+        # Tempo, CPU e memória por etapa (ver data_metricas)
+        self.perfil_path = perfil_path
+        self.medidor = MedidorEtapas(rastrear_alocacoes)
         
+    @medir_etapa
     def load_data(self):
         """
         Carrega o arquivo CSV completo
@@ -25,7 +34,7 @@ class DengueDataProcessor:
         print("Este processo pode demorar alguns minutos...")
         
         try:
-            self.df = pd.read_csv(self.csv_path, low_memory=False)
+            self.df = ler_csv_sinan(self.csv_path, self.ANALISES)
             print(f"Dados carregados com sucesso!")
             print(f"Total de registros: {len(self.df):,}")
             print(f"Total de colunas: {len(self.df.columns)}")
@@ -37,19 +46,19 @@ class DengueDataProcessor:
             print(f"Erro ao carregar dados: {e}")
             return False
     
+    @medir_etapa
     def _convert_data_types(self):
         """
         Converte tipos de dados
         """
         print("Convertendo tipos de dados...")
         
-        self.df['SG_UF_NOT'] = self.df['SG_UF_NOT'].astype(str)
-        self.df['ID_MUNICIP'] = self.df['ID_MUNICIP'].astype(str)
         self.df['DT_NOTIFIC'] = pd.to_datetime(self.df['DT_NOTIFIC'], errors='coerce')
         self.df['NU_IDADE_N'] = pd.to_numeric(self.df['NU_IDADE_N'], errors='coerce')
         
         print("Conversao concluida!")
     
+    @medir_etapa
     def generate_statistics(self):
         """
         Gera estatísticas gerais
@@ -61,14 +70,14 @@ class DengueDataProcessor:
             'total_casos': len(self.df),
             'periodo_inicio': str(self.df['DT_NOTIFIC'].min()),
             'periodo_fim': str(self.df['DT_NOTIFIC'].max()),
-            'anos_disponiveis': sorted(self.df['NU_ANO'].unique().tolist()),
+            'anos_disponiveis': sorted(self.df['NU_ANO'].dropna().unique().tolist()),
             'estados_unicos': len(self.df['SG_UF_NOT'].unique())
         }
         
         # Por estado
         casos_por_uf = self.df['SG_UF_NOT'].value_counts().head(20)
         self.stats['por_estado'] = {
-            'uf': casos_por_uf.index.tolist(),
+            'uf': casos_por_uf.index.astype(str).tolist(),
             'casos': casos_por_uf.values.tolist()
         }
         
@@ -103,13 +112,14 @@ class DengueDataProcessor:
         
         print("Estatisticas geradas!")
     
+    @medir_etapa
     def analyze_santa_catarina(self):
         """
         Analisa Santa Catarina
         """
         print("Analisando Santa Catarina...")
         
-        sc_data = self.df[self.df['SG_UF_NOT'] == '42']
+        sc_data = self.df[self.df['SG_UF_NOT'] == 42]
         
         self.stats['santa_catarina'] = {
             'total_casos': len(sc_data),
@@ -119,12 +129,12 @@ class DengueDataProcessor:
         if len(sc_data) > 0:
             municipios_sc = sc_data['ID_MUNICIP'].value_counts().head(10)
             self.stats['santa_catarina']['municipios'] = {
-                'codigos': municipios_sc.index.tolist(),
+                'codigos': municipios_sc.index.astype(str).tolist(),
                 'casos': municipios_sc.values.tolist()
             }
             
             # Criciúma
-            criciuma_casos = sc_data[sc_data['ID_MUNICIP'] == '4204608']
+            criciuma_casos = sc_data[sc_data['ID_MUNICIP'] == 4204608]
             self.stats['santa_catarina']['criciuma'] = {
                 'casos': len(criciuma_casos)
             }
@@ -139,7 +149,8 @@ class DengueDataProcessor:
         
         self.stats['metadata'] = {
             'gerado_em': datetime.now().isoformat(),
-            'total_registros': len(self.df)
+            'total_registros': len(self.df),
+            'perfil': self.medidor.resumo()
         }
         
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -161,6 +172,11 @@ class DengueDataProcessor:
         self.analyze_santa_catarina()
         self.save_statistics()
         
+        if self.perfil_path:
+            self.medidor.salvar(self.perfil_path, processador='simples', csv=self.csv_path,
+                                total_registros=len(self.df))
+            print(f"Perfil de execucao salvo em {self.perfil_path}")
+        
         print("\nPROCESSAMENTO CONCLUIDO!")
         print("=" * 50)
         
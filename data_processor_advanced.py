@@ -9,79 +9,231 @@ import numpy as np
 import json
 from datetime import datetime
 import warnings
+from data_schema import ler_csv_sinan
+from data_aggregates import DengueAggregates, padrao_sintomas
+from data_schema import SINTOMAS
+from data_cache import ColumnarCache, cache_disponivel
+from data_parallel import agregar_em_paralelo
+from data_incremental import EstadoIncremental
+from data_idade import idade_em_anos
+from data_cube import contar_cubo, salvar_cubo
+from data_metricas import MedidorEtapas, medir_etapa
 warnings.filterwarnings('ignore')
 
 class DengueAdvancedProcessor:
-    def __init__(self, csv_path):
+    # Análises executadas; definem as colunas lidas do CSV (ver data_schema)
+    ANALISES = ['geral', 'demografico', 'sintomas', 'faixa_etaria',
+                'genero_detalhado', 'santa_catarina', 'sintomas_por_perfil']
+    
+    def __init__(self, csv_path, chunksize=None, cache_dir=None, workers=None, estado_dir=None,
+                 perfil_path=None, rastrear_alocacoes=False):
         self.csv_path = csv_path
+        self.chunksize = chunksize
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.estado_dir = estado_dir
         self.df = None
         self.stats = {}
-        
+        self.total_registros = 0
+        self.cubo = None
+        self._perfil = None
+        # Tempo, CPU e memória por etapa (ver data_metricas)
+        self.perfil_path = perfil_path
+        self.medidor = MedidorEtapas(rastrear_alocacoes)
+        
+    @medir_etapa
     def load_data(self):
         """
         Carrega o arquivo CSV completo
         """
-        print("Carregando dados completos do DENGBR25.csv...")
-        print("Este processo pode demorar alguns minutos...")
+        cache = self._cache()
         
         try:
-            self.df = pd.read_csv(self.csv_path, low_memory=False)
+            if cache is not None and cache.existe():
+                print(f"Usando cache colunar {cache.caminho}")
+                self.df = cache.ler()
+                self.total_registros = len(self.df)
+                print(f"Total de registros: {len(self.df):,}")
+                return True
+            
+            print("Carregando dados completos do DENGBR25.csv...")
+            print("Este processo pode demorar alguns minutos...")
+            
+            self.df = ler_csv_sinan(self.csv_path, self.ANALISES)
+            self.total_registros = len(self.df)
             print(f"Dados carregados com sucesso!")
             print(f"Total de registros: {len(self.df):,}")
             print(f"Total de colunas: {len(self.df.columns)}")
             
             self._convert_data_types()
+            self._categorize_age_groups()
+            
+            if cache is not None:
+                self._save_cache(cache)
             return True
             
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
             return False
     
+    @medir_etapa
+    def load_data_streaming(self):
+        """
+        Lê o CSV em blocos de self.chunksize linhas, acumulando apenas agregados
+
+        O pico de memória depende do tamanho do bloco e não do arquivo. Cada
+        bloco passa pela mesma conversão do modo em memória e é reduzido a um
+        DengueAggregates; ao final self.df fica vazio e self.stats recebe as
+        mesmas seções que process_all() geraria com o arquivo inteiro.
+        """
+        cache = self._cache()
+        
+        try:
+            agregados = DengueAggregates()
+            inicio = 0
+            
+            if cache is not None and cache.existe():
+                # Blocos do cache já estão convertidos
+                print(f"Lendo cache colunar {cache.caminho} em blocos de {self.chunksize:,} linhas...")
+                blocos = cache.ler_blocos(self.chunksize)
+                convertido = True
+            else:
+                print(f"Carregando DENGBR25.csv em blocos de {self.chunksize:,} linhas...")
+                blocos = ler_csv_sinan(self.csv_path, self.ANALISES, chunksize=self.chunksize)
+                convertido = False
+            
+            for bloco in blocos:
+                agregados.merge(self._aggregate_block(bloco, inicio, convertido))
+                inicio += len(bloco)
+                print(f"Registros processados: {inicio:,}")
+            
+            self.df = None
+            self.total_registros = agregados.total
+            self.stats.update(agregados.to_stats())
+            self.cubo = agregados.cubo
+            
+            print(f"Total de registros: {self.total_registros:,}")
+            return True
+            
+        except Exception as e:
+            print(f"Erro ao carregar dados: {e}")
+            return False
+    
+    @medir_etapa
+    def load_data_parallel(self):
+        """
+        Agrega o arquivo em self.workers processos (ver data_parallel)
+
+        Cada worker lê e converte uma faixa contígua de linhas; os agregados
+        parciais são combinados na ordem do arquivo e o resultado é idêntico
+        ao do processamento serial.
+        """
+        print(f"Processando DENGBR25.csv em paralelo com {self.workers} workers...")
+        
+        try:
+            agregados = agregar_em_paralelo(self, self.workers, self._cache())
+            
+            self.df = None
+            self.total_registros = agregados.total
+            self.stats.update(agregados.to_stats())
+            self.cubo = agregados.cubo
+            
+            print(f"Total de registros: {self.total_registros:,}")
+            return True
+            
+        except Exception as e:
+            print(f"Erro ao carregar dados: {e}")
+            return False
+    
+    @medir_etapa
+    def load_data_incremental(self, remover_ausentes=True):
+        """
+        Aplica o CSV como nova exportação ao estado salvo em self.estado_dir
+
+        Só os registros inseridos, alterados ou removidos desde a exportação
+        anterior são convertidos e agregados (ver data_incremental). Na
+        primeira execução o estado é criado com o arquivo inteiro.
+        """
+        print(f"Aplicando {self.csv_path} ao estado incremental em {self.estado_dir}...")
+        
+        try:
+            estado = EstadoIncremental.carregar(self.estado_dir, self.ANALISES)
+            resumo = estado.aplicar(self, self.csv_path, remover_ausentes)
+            estado.salvar()
+            
+            print(f"Inseridos: {resumo['inseridos']:,} | Alterados: {resumo['alterados']:,} | "
+                  f"Removidos: {resumo['removidos']:,} | Inalterados: {resumo['inalterados']:,}")
+            
+            self.df = None
+            self.total_registros = estado.agregados.total
+            self.stats.update(estado.agregados.to_stats())
+            self.cubo = estado.agregados.cubo
+            
+            print(f"Total de registros: {self.total_registros:,}")
+            return True
+            
+        except Exception as e:
+            print(f"Erro ao carregar dados: {e}")
+            return False
+    
+    def _aggregate_block(self, bloco, inicio, convertido=False):
+        """
+        Converte um bloco (se ainda não convertido) e devolve os seus agregados
+        """
+        self.df = bloco
+        if not convertido:
+            self._convert_data_types()
+            self._categorize_age_groups()
+        
+        return DengueAggregates.from_frame(self.df, inicio)
+    
+    def _cache(self):
+        """
+        Cache colunar do DataFrame convertido (None se desativado ou sem pyarrow)
+        """
+        if not self.cache_dir:
+            return None
+        
+        if not cache_disponivel():
+            print("pyarrow não instalado: cache colunar desativado")
+            return None
+        
+        return ColumnarCache(self.csv_path, self.cache_dir, 'avancado', {'analises': self.ANALISES})
+    
+    def _save_cache(self, cache):
+        """
+        Grava o DataFrame convertido no cache; falhas não interrompem o processamento
+        """
+        try:
+            cache.salvar(self.df)
+            print(f"Cache colunar salvo em {cache.caminho}")
+        except Exception as e:
+            print(f"Aviso: não foi possível salvar o cache colunar: {e}")
+    
+    @medir_etapa
     def _convert_data_types(self):
         """
         Converte tipos de dados
         """
         print("Convertendo tipos de dados...")
         
-        self.df['SG_UF_NOT'] = self.df['SG_UF_NOT'].astype(str)
-        self.df['ID_MUNICIP'] = self.df['ID_MUNICIP'].astype(str)
         self.df['DT_NOTIFIC'] = pd.to_datetime(self.df['DT_NOTIFIC'], errors='coerce')
         
-        # Converter ANO_NASC para numérico
-        self.df['ANO_NASC'] = pd.to_numeric(self.df['ANO_NASC'], errors='coerce')
-        
-        # Calcular idade em anos a partir do ANO_NASC e ano da notificação
-        if 'ANO_NASC' in self.df.columns and 'NU_ANO' in self.df.columns:
-            # Calcular idade aproximada: ano da notificação - ano de nascimento
-            self.df['IDADE_ANOS'] = self.df['NU_ANO'] - self.df['ANO_NASC']
-            # Filtrar idades inválidas (negativas, muito altas)
-            self.df['IDADE_ANOS'] = self.df['IDADE_ANOS'].apply(
-                lambda x: x if pd.notna(x) and 0 <= x <= 120 else pd.NA
-            )
-            print(f"Idade calculada para {self.df['IDADE_ANOS'].notna().sum():,} registros")
-        else:
-            # Fallback: tentar usar NU_IDADE_N se disponível (pode estar em dias, converter para anos)
-            self.df['NU_IDADE_N'] = pd.to_numeric(self.df['NU_IDADE_N'], errors='coerce')
-            # Se os valores são muito grandes (> 1000), pode estar em dias
-            if self.df['NU_IDADE_N'].notna().any():
-                max_val = self.df['NU_IDADE_N'].max()
-                if max_val > 1000:
-                    # Provavelmente está em dias, converter para anos aproximados
-                    self.df['IDADE_ANOS'] = (self.df['NU_IDADE_N'] / 365.25).round().astype('Int64')
-                    self.df['IDADE_ANOS'] = self.df['IDADE_ANOS'].apply(
-                        lambda x: x if pd.notna(x) and 0 <= x <= 120 else pd.NA
-                    )
-                else:
-                    # Usar diretamente se parece estar em anos
-                    self.df['IDADE_ANOS'] = self.df['NU_IDADE_N'].apply(
-                        lambda x: x if pd.notna(x) and 0 <= x <= 120 else pd.NA
-                    )
+        # Idade em anos: NU_ANO - ANO_NASC ou, sem essas colunas, NU_IDADE_N
+        # decodificado (ver data_idade); fora de 0-120 anos fica NaN
+        self.df['IDADE_ANOS'] = idade_em_anos(self.df)
+        print(f"Idade calculada para {self.df['IDADE_ANOS'].notna().sum():,} registros")
         
         # Adicionar coluna de mês para análises temporais
-        self.df['MES'] = self.df['DT_NOTIFIC'].dt.month
+        self.df['MES'] = self.df['DT_NOTIFIC'].dt.month.astype('Int8')
+        
+        # Seis sintomas codificados num inteiro de 6 bits (ver data_aggregates)
+        if all(sintoma in self.df.columns for sintoma in SINTOMAS):
+            self.df['PADRAO_SINTOMAS'] = padrao_sintomas(self.df)
         
         print("Conversão concluída!")
     
+    @medir_etapa
     def _categorize_age_groups(self):
         """
         Categoriza faixas etárias
@@ -94,22 +246,17 @@ class DengueAdvancedProcessor:
             print("ERRO: Coluna IDADE_ANOS nao encontrada!")
             return None
         
-        # Inicializar com NaN
-        self.df['FAIXA_ETARIA'] = pd.NA
-        
-        # Filtrar apenas registros com idade válida
-        mask_idade_valida = self.df['IDADE_ANOS'].notna()
-        
-        if mask_idade_valida.any():
-            self.df.loc[mask_idade_valida, 'FAIXA_ETARIA'] = pd.cut(
-                self.df.loc[mask_idade_valida, 'IDADE_ANOS'], 
-                bins=bins, 
-                labels=labels, 
-                right=False
-            )
+        # Categórica; registros sem idade válida ficam como NaN
+        self.df['FAIXA_ETARIA'] = pd.cut(
+            self.df['IDADE_ANOS'],
+            bins=bins,
+            labels=labels,
+            right=False
+        )
         
         return self.df['FAIXA_ETARIA']
     
+    @medir_etapa
     def generate_basic_statistics(self):
         """
         Gera estatísticas básicas (similar ao data_processor_simple.py)
@@ -121,14 +268,14 @@ class DengueAdvancedProcessor:
             'total_casos': len(self.df),
             'periodo_inicio': str(self.df['DT_NOTIFIC'].min()),
             'periodo_fim': str(self.df['DT_NOTIFIC'].max()),
-            'anos_disponiveis': sorted(self.df['NU_ANO'].unique().tolist()),
+            'anos_disponiveis': sorted(self.df['NU_ANO'].dropna().unique().tolist()),
             'estados_unicos': len(self.df['SG_UF_NOT'].unique())
         }
         
         # Por estado
         casos_por_uf = self.df['SG_UF_NOT'].value_counts().head(20)
         self.stats['por_estado'] = {
-            'uf': casos_por_uf.index.tolist(),
+            'uf': casos_por_uf.index.astype(str).tolist(),
             'casos': casos_por_uf.values.tolist()
         }
         
@@ -163,54 +310,41 @@ class DengueAdvancedProcessor:
         
         print("Estatísticas básicas geradas!")
     
+    def _profile_aggregates(self):
+        """
+        Tabela de perfil (faixa etária x sexo) calculada numa única passada
+
+        Reutilizada por analyze_age_groups, analyze_gender_details e
+        analyze_symptoms_by_profile; é descartada quando self.df muda.
+        """
+        if self._perfil is None or self._perfil[0] is not self.df:
+            if 'FAIXA_ETARIA' not in self.df.columns:
+                self._categorize_age_groups()
+            self._perfil = (self.df, DengueAggregates.profile_from_frame(self.df))
+        return self._perfil[1]
+    
+    @medir_etapa
     def analyze_age_groups(self):
         """
         Análise detalhada por faixa etária
         """
         print("Analisando faixas etárias...")
         
-        # Categorizar faixas etárias
-        self._categorize_age_groups()
-        
-        # Garantir que todas as faixas etárias estejam presentes, mesmo com 0 casos
-        todas_faixas = ['0-4', '5-14', '15-29', '30-44', '45-59', '60+']
-        
-        # Contagem por faixa etária (incluindo NaN)
-        age_counts = self.df['FAIXA_ETARIA'].value_counts().sort_index()
-        
-        # Calcular letalidade por faixa etária (evolução = 2 é óbito por dengue)
-        letalidade_por_faixa = {}
+        agregados = self._profile_aggregates()
         
-        # Processar todas as faixas, garantindo que todas estejam no resultado
-        for faixa in todas_faixas:
-            casos_faixa = self.df[self.df['FAIXA_ETARIA'] == faixa]
-            total_casos = len(casos_faixa)
-            
-            # Verificar se EVOLUCAO está presente
-            if 'EVOLUCAO' in self.df.columns and total_casos > 0:
-                obitos = len(casos_faixa[casos_faixa['EVOLUCAO'] == 2])
-                taxa_letalidade = (obitos / total_casos * 100) if total_casos > 0 else 0
-            else:
-                obitos = 0
-                taxa_letalidade = 0
-            
-            letalidade_por_faixa[faixa] = {
-                'casos': int(total_casos),
-                'obitos': int(obitos),
-                'letalidade': float(taxa_letalidade),
-                'percentual_do_total': float(total_casos / len(self.df) * 100) if len(self.df) > 0 else 0
-            }
+        # Todas as faixas etárias aparecem no resultado, mesmo com 0 casos
+        self.stats['faixa_etaria'] = agregados.analyze_age_groups()
         
         # Adicionar informações sobre dados faltantes
-        dados_com_idade = self.df['FAIXA_ETARIA'].notna().sum()
+        dados_com_idade = sum(faixa['casos'] for faixa in self.stats['faixa_etaria'].values())
         dados_sem_idade = len(self.df) - dados_com_idade
         
         if dados_sem_idade > 0:
             print(f"ATENCAO: {dados_sem_idade:,} registros ({dados_sem_idade/len(self.df)*100:.2f}%) nao tem idade valida!")
         
-        self.stats['faixa_etaria'] = letalidade_por_faixa
         print("Análise de faixas etárias concluída!")
     
+    @medir_etapa
     def analyze_gender_details(self):
         """
         Análise detalhada por gênero
@@ -221,112 +355,11 @@ class DengueAdvancedProcessor:
             print("Dados de gênero não disponíveis!")
             return
         
-        # Filtrar apenas M e F, ignorando valores inválidos
-        df_genero = self.df[self.df['CS_SEXO'].isin(['M', 'F'])]
-        
-        # Distribuição por faixa etária e gênero
-        self._categorize_age_groups()  # Garantir que as faixas etárias estão categorizadas
-        
-        genero_por_faixa = {}
-        for faixa in df_genero['FAIXA_ETARIA'].unique():
-            if pd.isna(faixa):
-                continue
-                
-            casos_faixa = df_genero[df_genero['FAIXA_ETARIA'] == faixa]
-            genero_counts = casos_faixa['CS_SEXO'].value_counts()
-            
-            genero_por_faixa[faixa] = {
-                'feminino': int(genero_counts.get('F', 0)),
-                'masculino': int(genero_counts.get('M', 0))
-            }
-        
-        # Sintomas mais comuns por gênero
-        sintomas = ['FEBRE', 'MIALGIA', 'CEFALEIA', 'EXANTEMA', 'VOMITO', 'NAUSEA']
-        sintomas_por_genero = {'feminino': {}, 'masculino': {}}
-        
-        for sintoma in sintomas:
-            if sintoma not in self.df.columns:
-                continue
-                
-            # Feminino
-            df_fem = df_genero[df_genero['CS_SEXO'] == 'F']
-            casos_sintoma_fem = (df_fem[sintoma] == 1).sum()
-            perc_fem = (casos_sintoma_fem / len(df_fem) * 100) if len(df_fem) > 0 else 0
-            
-            sintomas_por_genero['feminino'][sintoma.lower()] = {
-                'casos': int(casos_sintoma_fem),
-                'percentual': float(perc_fem)
-            }
-            
-            # Masculino
-            df_masc = df_genero[df_genero['CS_SEXO'] == 'M']
-            casos_sintoma_masc = (df_masc[sintoma] == 1).sum()
-            perc_masc = (casos_sintoma_masc / len(df_masc) * 100) if len(df_masc) > 0 else 0
-            
-            sintomas_por_genero['masculino'][sintoma.lower()] = {
-                'casos': int(casos_sintoma_masc),
-                'percentual': float(perc_masc)
-            }
-        
-        # Evolução clínica por gênero
-        evolucao_por_genero = {'feminino': {}, 'masculino': {}}
-        
-        if 'EVOLUCAO' in self.df.columns:
-            # Feminino
-            df_fem = df_genero[df_genero['CS_SEXO'] == 'F']
-            evolucao_fem = df_fem['EVOLUCAO'].value_counts()
-            
-            # Cura (1)
-            cura_fem = evolucao_fem.get(1, 0)
-            perc_cura_fem = (cura_fem / len(df_fem) * 100) if len(df_fem) > 0 else 0
-            
-            # Óbito por dengue (2)
-            obito_fem = evolucao_fem.get(2, 0)
-            perc_obito_fem = (obito_fem / len(df_fem) * 100) if len(df_fem) > 0 else 0
-            
-            evolucao_por_genero['feminino'] = {
-                'cura': {
-                    'casos': int(cura_fem),
-                    'percentual': float(perc_cura_fem)
-                },
-                'obito': {
-                    'casos': int(obito_fem),
-                    'percentual': float(perc_obito_fem)
-                }
-            }
-            
-            # Masculino
-            df_masc = df_genero[df_genero['CS_SEXO'] == 'M']
-            evolucao_masc = df_masc['EVOLUCAO'].value_counts()
-            
-            # Cura (1)
-            cura_masc = evolucao_masc.get(1, 0)
-            perc_cura_masc = (cura_masc / len(df_masc) * 100) if len(df_masc) > 0 else 0
-            
-            # Óbito por dengue (2)
-            obito_masc = evolucao_masc.get(2, 0)
-            perc_obito_masc = (obito_masc / len(df_masc) * 100) if len(df_masc) > 0 else 0
-            
-            evolucao_por_genero['masculino'] = {
-                'cura': {
-                    'casos': int(cura_masc),
-                    'percentual': float(perc_cura_masc)
-                },
-                'obito': {
-                    'casos': int(obito_masc),
-                    'percentual': float(perc_obito_masc)
-                }
-            }
-        
-        # Consolidar estatísticas de gênero
-        self.stats['genero_detalhado'] = {
-            'distribuicao_por_faixa': genero_por_faixa,
-            'sintomas_por_genero': sintomas_por_genero,
-            'evolucao_por_genero': evolucao_por_genero
-        }
+        self.stats['genero_detalhado'] = self._profile_aggregates().analyze_gender_details()
         
         print("Análise detalhada por gênero concluída!")
     
+    @medir_etapa
     def analyze_santa_catarina_details(self):
         """
         Análise detalhada para Santa Catarina
@@ -334,7 +367,7 @@ class DengueAdvancedProcessor:
         print("Analisando Santa Catarina detalhadamente...")
         
         # Filtrar dados de SC
-        sc_data = self.df[self.df['SG_UF_NOT'] == '42']
+        sc_data = self.df[self.df['SG_UF_NOT'] == 42]
         
         # Estatísticas básicas
         self.stats['santa_catarina'] = {
@@ -346,12 +379,12 @@ class DengueAdvancedProcessor:
             # Top 10 municípios
             municipios_sc = sc_data['ID_MUNICIP'].value_counts().head(10)
             self.stats['santa_catarina']['municipios'] = {
-                'codigos': municipios_sc.index.tolist(),
+                'codigos': municipios_sc.index.astype(str).tolist(),
                 'casos': municipios_sc.values.tolist()
             }
             
             # Criciúma
-            criciuma_casos = sc_data[sc_data['ID_MUNICIP'] == '420460']
+            criciuma_casos = sc_data[sc_data['ID_MUNICIP'] == 420460]
             self.stats['santa_catarina']['criciuma'] = {
                 'casos': len(criciuma_casos)
             }
@@ -407,78 +440,36 @@ class DengueAdvancedProcessor:
         
         print("Análise detalhada de Santa Catarina concluída!")
     
+    @medir_etapa
     def analyze_symptoms_by_profile(self):
         """
         Análise de sintomas por perfil (idade e gênero)
         """
         print("Analisando sintomas por perfil...")
         
-        sintomas = ['FEBRE', 'MIALGIA', 'CEFALEIA', 'EXANTEMA', 'VOMITO', 'NAUSEA']
+        perfil = self._profile_aggregates().analyze_symptoms_by_profile()
         
         # Verificar se temos os dados necessários
-        if not all(sintoma in self.df.columns for sintoma in sintomas):
+        if perfil is None:
             print("Dados de sintomas incompletos!")
             return
         
-        # Categorizar faixas etárias se ainda não foi feito
-        if 'FAIXA_ETARIA' not in self.df.columns:
-            self._categorize_age_groups()
-        
-        # Garantir que todas as faixas etárias estejam presentes
-        todas_faixas = ['0-4', '5-14', '15-29', '30-44', '45-59', '60+']
-        
-        # Sintomas por faixa etária
-        sintomas_por_faixa = {}
-        
-        # Processar todas as faixas, mesmo as sem dados
-        for faixa in todas_faixas:
-            df_faixa = self.df[self.df['FAIXA_ETARIA'] == faixa]
-            sintomas_faixa = {}
-            
-            for sintoma in sintomas:
-                casos_sintoma = (df_faixa[sintoma] == 1).sum() if len(df_faixa) > 0 else 0
-                perc_sintoma = (casos_sintoma / len(df_faixa) * 100) if len(df_faixa) > 0 else 0
-                
-                sintomas_faixa[sintoma.lower()] = {
-                    'casos': int(casos_sintoma),
-                    'percentual': float(perc_sintoma)
-                }
-            
-            sintomas_por_faixa[faixa] = sintomas_faixa
-        
-        # Combinações de sintomas mais frequentes
-        # Vamos analisar as combinações de 2 sintomas mais comuns
-        combinacoes = []
+        self.stats['sintomas_por_perfil'] = perfil
+        self.stats['padroes_sintomas'] = self._profile_aggregates().analyze_symptom_patterns()
         
-        for i in range(len(sintomas)):
-            for j in range(i+1, len(sintomas)):
-                sintoma1 = sintomas[i]
-                sintoma2 = sintomas[j]
-                
-                # Casos com ambos os sintomas
-                casos_combinados = ((self.df[sintoma1] == 1) & (self.df[sintoma2] == 1)).sum()
-                
-                if casos_combinados > 0:
-                    perc_combinados = (casos_combinados / len(self.df)) * 100
-                    
-                    combinacoes.append({
-                        'sintomas': [sintoma1.lower(), sintoma2.lower()],
-                        'casos': int(casos_combinados),
-                        'percentual': float(perc_combinados)
-                    })
-        
-        # Ordenar combinações por número de casos (decrescente)
-        combinacoes.sort(key=lambda x: x['casos'], reverse=True)
-        
-        # Pegar as 5 combinações mais comuns
-        top_combinacoes = combinacoes[:5]
+        print("Análise de sintomas por perfil concluída!")
+    
+    @medir_etapa
+    def analyze_case_cube(self):
+        """
+        Cubo de contagens por UF, município, ano, semana, sexo, faixa etária,
+        evolução e padrão de sintomas (ver data_cube)
+        """
+        print("Montando cubo de casos...")
         
-        self.stats['sintomas_por_perfil'] = {
-            'por_faixa_etaria': sintomas_por_faixa,
-            'combinacoes_mais_comuns': top_combinacoes
-        }
+        self.cubo = contar_cubo(self.df)
         
-        print("Análise de sintomas por perfil concluída!")
+        print(f"Cubo de casos montado com {len(self.cubo):,} células!")
     
     def save_statistics(self, output_file='dengue_advanced_statistics.json'):
         """
@@ -488,7 +479,8 @@ class DengueAdvancedProcessor:
         
         self.stats['metadata'] = {
             'gerado_em': datetime.now().isoformat(),
-            'total_registros': len(self.df)
+            'total_registros': self.total_registros,
+            'perfil': self.medidor.resumo()
         }
         
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -496,6 +488,17 @@ class DengueAdvancedProcessor:
         
         print(f"Salvo em {output_file}")
     
+    def save_cube(self, output_file='dengue_cubo.npz'):
+        """
+        Salva o cubo de casos (arrays compactos em .npz)
+        """
+        if self.cubo is None:
+            return
+        
+        print(f"Salvando cubo em {output_file}...")
+        celulas = salvar_cubo(self.cubo, output_file)
+        print(f"Cubo salvo em {output_file} ({celulas:,} células)")
+    
     def process_all(self):
         """
         Processa tudo
@@ -503,19 +506,48 @@ class DengueAdvancedProcessor:
         print("INICIANDO PROCESSAMENTO AVANÇADO DOS DADOS DE DENGUE")
         print("=" * 50)
         
-        if not self.load_data():
-            return False
-        
-        # Gerar estatísticas básicas (compatíveis com o processador simples)
-        self.generate_basic_statistics()
-        
-        # Gerar estatísticas avançadas
-        self.analyze_age_groups()
-        self.analyze_gender_details()
-        self.analyze_santa_catarina_details()
-        self.analyze_symptoms_by_profile()
+        if self.estado_dir:
+            modo = 'incremental'
+        elif self.workers and self.workers > 1:
+            modo = 'paralelo'
+        elif self.chunksize:
+            modo = 'streaming'
+        else:
+            modo = 'memoria'
+        
+        if modo == 'incremental':
+            # Modo incremental: só a diferença para a exportação anterior
+            if not self.load_data_incremental():
+                return False
+        elif modo == 'paralelo':
+            # Modo paralelo: agregados parciais por faixa de linhas
+            if not self.load_data_parallel():
+                return False
+        elif modo == 'streaming':
+            # Modo streaming: as seções já saem prontas dos agregados
+            if not self.load_data_streaming():
+                return False
+        else:
+            if not self.load_data():
+                return False
+            
+            # Gerar estatísticas básicas (compatíveis com o processador simples)
+            self.generate_basic_statistics()
+            
+            # Gerar estatísticas avançadas
+            self.analyze_age_groups()
+            self.analyze_gender_details()
+            self.analyze_santa_catarina_details()
+            self.analyze_symptoms_by_profile()
+            self.analyze_case_cube()
         
         self.save_statistics()
+        self.save_cube()
+        
+        if self.perfil_path:
+            self.medidor.salvar(self.perfil_path, processador='avancado', modo=modo, csv=self.csv_path,
+                                total_registros=self.total_registros)
+            print(f"Perfil de execução salvo em {self.perfil_path}")
         
         print("\nPROCESSAMENTO AVANÇADO CONCLUÍDO!")
         print("=" * 50)
@@ -9,14 +9,25 @@ import numpy as np
 import json
 from datetime import datetime
 import warnings
+from data_schema import ler_csv_sinan
+from data_idade import idade_por_codigo, UNIDADES_LEGADO
+from data_metricas import MedidorEtapas, medir_etapa
 warnings.filterwarnings('ignore')
 
 class DengueAdvancedProcessor:
-    def __init__(self, csv_path):
+    # Análises executadas; definem as colunas lidas do CSV (ver data_schema)
+    ANALISES = ['geral', 'demografico', 'sintomas', 'faixa_etaria',
+                'genero_detalhado', 'santa_catarina', 'sintomas_por_perfil']
+    
+    def __init__(self, csv_path, perfil_path=None, rastrear_alocacoes=False):
         self.csv_path = csv_path
         self.df = None
         self.stats = {}
+        # Tempo, CPU e memória por etapa (ver data_metricas)
+        self.perfil_path = perfil_path
+        self.medidor = MedidorEtapas(rastrear_alocacoes)
         
+    @medir_etapa
     def load_data(self):
         """
         Carrega o arquivo CSV completo
@@ -25,7 +36,7 @@ class DengueAdvancedProcessor:
         print("Este processo pode demorar alguns minutos...")
         
         try:
-            self.df = pd.read_csv(self.csv_path, low_memory=False)
+            self.df = ler_csv_sinan(self.csv_path, self.ANALISES)
             print(f"Dados carregados com sucesso!")
             print(f"Total de registros: {len(self.df):,}")
             print(f"Total de colunas: {len(self.df.columns)}")
@@ -37,14 +48,13 @@ class DengueAdvancedProcessor:
             print(f"Erro ao carregar dados: {e}")
             return False
     
+    @medir_etapa
     def _convert_data_types(self):
         """
         Converte tipos de dados
         """
         print("Convertendo tipos de dados...")
         
-        self.df['SG_UF_NOT'] = self.df['SG_UF_NOT'].astype(str)
-        self.df['ID_MUNICIP'] = self.df['ID_MUNICIP'].astype(str)
         self.df['DT_NOTIFIC'] = pd.to_datetime(self.df['DT_NOTIFIC'], errors='coerce')
         self.df['NU_IDADE_N'] = pd.to_numeric(self.df['NU_IDADE_N'], errors='coerce')
         
@@ -55,51 +65,28 @@ class DengueAdvancedProcessor:
         self._convert_age()
         
         # Adicionar coluna de mês para análises temporais
-        self.df['MES'] = self.df['DT_NOTIFIC'].dt.month
+        self.df['MES'] = self.df['DT_NOTIFIC'].dt.month.astype('Int8')
         
         print("Conversão concluída!")
     
+    @medir_etapa
     def _convert_age(self):
         """
         Converte a idade do formato codificado para idade em anos
         """
         print("Convertendo idades...")
         
-        # Criar uma nova coluna para idade em anos
-        self.df['IDADE_ANOS'] = np.nan
-        
-        # Valores < 1000 são idades em anos
-        mask_anos = self.df['NU_IDADE_N'] < 1000
-        self.df.loc[mask_anos, 'IDADE_ANOS'] = self.df.loc[mask_anos, 'NU_IDADE_N']
-        
-        # Valores >= 1000 são codificados
-        # Primeira posição (milhar): 1=dia, 2=mês, 3=ano
-        # Restante: valor
-        mask_codificados = self.df['NU_IDADE_N'] >= 1000
-        
-        # Extrair o tipo de unidade (1=dia, 2=mês, 3=ano)
-        unidade = (self.df.loc[mask_codificados, 'NU_IDADE_N'] // 1000).astype(int)
-        
-        # Extrair o valor
-        valor = self.df.loc[mask_codificados, 'NU_IDADE_N'] % 1000
-        
-        # Converter para anos
-        # Dias -> Anos (dividir por 365)
-        mask_dias = mask_codificados & (unidade == 1)
-        self.df.loc[mask_dias, 'IDADE_ANOS'] = valor[mask_dias] / 365
-        
-        # Meses -> Anos (dividir por 12)
-        mask_meses = mask_codificados & (unidade == 2)
-        self.df.loc[mask_meses, 'IDADE_ANOS'] = valor[mask_meses] / 12
-        
-        # Anos -> Anos (já está em anos)
-        mask_anos_cod = mask_codificados & (unidade == 3)
-        self.df.loc[mask_anos_cod, 'IDADE_ANOS'] = valor[mask_anos_cod]
+        # Valores < 1000 são idades em anos; nos codificados o milhar é a
+        # unidade (1=dia, 2=mês, 3=ano) e o restante o valor
+        self.df['IDADE_ANOS'] = idade_por_codigo(
+            self.df['NU_IDADE_N'], UNIDADES_LEGADO, anos_sem_unidade=True, idade_maxima=None
+        )
         
         # Verificar resultados
         total_convertidos = self.df['IDADE_ANOS'].notna().sum()
         print(f"Idades convertidas: {total_convertidos:,} de {len(self.df):,} ({total_convertidos/len(self.df)*100:.2f}%)")
         
+    @medir_etapa
     def _categorize_age_groups(self):
         """
         Categoriza faixas etárias
@@ -117,6 +104,7 @@ class DengueAdvancedProcessor:
         
         return self.df['FAIXA_ETARIA']
     
+    @medir_etapa
     def generate_basic_statistics(self):
         """
         Gera estatísticas básicas (similar ao data_processor_simple.py)
@@ -128,14 +116,14 @@ class DengueAdvancedProcessor:
             'total_casos': len(self.df),
             'periodo_inicio': str(self.df['DT_NOTIFIC'].min()),
             'periodo_fim': str(self.df['DT_NOTIFIC'].max()),
-            'anos_disponiveis': sorted(self.df['NU_ANO'].unique().tolist()),
+            'anos_disponiveis': sorted(self.df['NU_ANO'].dropna().unique().tolist()),
             'estados_unicos': len(self.df['SG_UF_NOT'].unique())
         }
         
         # Por estado
         casos_por_uf = self.df['SG_UF_NOT'].value_counts().head(20)
         self.stats['por_estado'] = {
-            'uf': casos_por_uf.index.tolist(),
+            'uf': casos_por_uf.index.astype(str).tolist(),
             'casos': casos_por_uf.values.tolist()
         }
         
@@ -170,6 +158,7 @@ class DengueAdvancedProcessor:
         
         print("Estatísticas básicas geradas!")
     
+    @medir_etapa
     def analyze_age_groups(self):
         """
         Análise detalhada por faixa etária
@@ -206,6 +195,7 @@ class DengueAdvancedProcessor:
         self.stats['faixa_etaria'] = letalidade_por_faixa
         print("Análise de faixas etárias concluída!")
     
+    @medir_etapa
     def analyze_gender_details(self):
         """
         Análise detalhada por gênero
@@ -322,6 +312,7 @@ class DengueAdvancedProcessor:
         
         print("Análise detalhada por gênero concluída!")
     
+    @medir_etapa
     def analyze_santa_catarina_details(self):
         """
         Análise detalhada para Santa Catarina
@@ -329,7 +320,7 @@ class DengueAdvancedProcessor:
         print("Analisando Santa Catarina detalhadamente...")
         
         # Filtrar dados de SC
-        sc_data = self.df[self.df['SG_UF_NOT'] == '42']
+        sc_data = self.df[self.df['SG_UF_NOT'] == 42]
         
         # Estatísticas básicas
         self.stats['santa_catarina'] = {
@@ -341,12 +332,12 @@ class DengueAdvancedProcessor:
             # Top 10 municípios
             municipios_sc = sc_data['ID_MUNICIP'].value_counts().head(10)
             self.stats['santa_catarina']['municipios'] = {
-                'codigos': municipios_sc.index.tolist(),
+                'codigos': municipios_sc.index.astype(str).tolist(),
                 'casos': municipios_sc.values.tolist()
             }
             
             # Criciúma
-            criciuma_casos = sc_data[sc_data['ID_MUNICIP'] == '420460']
+            criciuma_casos = sc_data[sc_data['ID_MUNICIP'] == 420460]
             self.stats['santa_catarina']['criciuma'] = {
                 'casos': len(criciuma_casos)
             }
@@ -402,6 +393,7 @@ class DengueAdvancedProcessor:
         
         print("Análise detalhada de Santa Catarina concluída!")
     
+    @medir_etapa
     def analyze_symptoms_by_profile(self):
         """
         Análise de sintomas por perfil (idade e gênero)
@@ -482,7 +474,8 @@ class DengueAdvancedProcessor:
         
         self.stats['metadata'] = {
             'gerado_em': datetime.now().isoformat(),
-            'total_registros': len(self.df)
+            'total_registros': len(self.df),
+            'perfil': self.medidor.resumo()
         }
         
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -511,6 +504,11 @@ class DengueAdvancedProcessor:
         
         self.save_statistics()
         
+        if self.perfil_path:
+            self.medidor.salvar(self.perfil_path, processador='fixed', csv=self.csv_path,
+                                total_registros=len(self.df))
+            print(f"Perfil de execução salvo em {self.perfil_path}")
+        
         print("\nPROCESSAMENTO AVANÇADO CONCLUÍDO!")
         print("=" * 50)
         
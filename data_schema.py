@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Esquema de colunas do CSV de dengue do SINAN (layout DENGBR)
+
+Declara quais colunas cada análise usa e o tipo compacto de cada uma, para
+que os processadores leiam apenas essas colunas (usecols) já com os tipos
+corretos (dtype) em vez de inferir tipos para as 100+ colunas do arquivo.
+"""
+
+import pandas as pd
+
+# Incrementar sempre que tipos ou colunas derivadas mudarem
+SCHEMA_VERSION = 5
+
+SINTOMAS = ['FEBRE', 'MIALGIA', 'CEFALEIA', 'EXANTEMA', 'VOMITO', 'NAUSEA']
+
+# Categorias da coluna derivada FAIXA_ETARIA
+FAIXAS_ETARIAS = ['0-4', '5-14', '15-29', '30-44', '45-59', '60+']
+
+# Identificação de uma notificação no SINAN (número + município + data)
+CHAVE_NOTIFICACAO = ['NU_NOTIFIC', 'ID_MUNICIP', 'DT_NOTIFIC']
+
+# Tipos compactos por coluna. Códigos de UF e município ficam numéricos e só
+# viram texto nas chaves do JSON de saída.
+TIPOS_COLUNAS = {
+    'NU_NOTIFIC': 'str',
+    'DT_NOTIFIC': 'str',  # convertida com pd.to_datetime após a leitura
+    'NU_ANO': 'Int16',
+    'SG_UF_NOT': 'Int8',
+    'ID_MUNICIP': 'Int32',
+    'CS_SEXO': 'category',
+    'ANO_NASC': 'Int16',
+    'NU_IDADE_N': 'Int16',
+    'CLASSI_FIN': 'Int8',
+    'EVOLUCAO': 'Int8',
+    **{sintoma: 'Int8' for sintoma in SINTOMAS}
+}
+
+# Sintomas ausentes são gravados como 0 (só o valor 1 = "sim" é contado),
+# o que permite guardá-los como int8 simples
+COLUNAS_FLAG = SINTOMAS
+
+COLUNAS_POR_ANALISE = {
+    'geral': ['DT_NOTIFIC', 'NU_ANO', 'SG_UF_NOT'],
+    'demografico': ['CS_SEXO'],
+    'sintomas': SINTOMAS,
+    'idade': ['NU_ANO', 'ANO_NASC', 'NU_IDADE_N'],
+    'faixa_etaria': ['NU_ANO', 'ANO_NASC', 'NU_IDADE_N', 'EVOLUCAO'],
+    'genero_detalhado': ['CS_SEXO', 'EVOLUCAO'] + SINTOMAS,
+    'santa_catarina': ['DT_NOTIFIC', 'SG_UF_NOT', 'ID_MUNICIP'],
+    'sintomas_por_perfil': SINTOMAS,
+    'chave': CHAVE_NOTIFICACAO,
+}
+
+
+def colunas_necessarias(analises):
+    """
+    Lista ordenada e sem repetição das colunas usadas pelas análises
+    """
+    colunas = []
+    for analise in analises:
+        for coluna in COLUNAS_POR_ANALISE[analise]:
+            if coluna not in colunas:
+                colunas.append(coluna)
+    return colunas
+
+
+def compactar(df):
+    """
+    Ajustes pós-leitura que o read_csv não faz sozinho
+    """
+    for coluna in COLUNAS_FLAG:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].fillna(0).astype('int8')
+    return df
+
+
+def parametros_leitura(cabecalho, analises):
+    """
+    usecols e dtype para o read_csv, considerando só as colunas presentes no cabeçalho
+    """
+    colunas = [coluna for coluna in colunas_necessarias(analises) if coluna in cabecalho]
+    tipos = {coluna: TIPOS_COLUNAS[coluna] for coluna in colunas}
+    return colunas, tipos
+
+
+def ler_csv_sinan(csv_path, analises, chunksize=None):
+    """
+    Lê do CSV apenas as colunas das análises, já com os tipos do esquema
+
+    Colunas do esquema ausentes no arquivo são ignoradas (as análises já
+    verificam a presença das colunas opcionais). Com chunksize devolve um
+    iterador de blocos, como pd.read_csv.
+    """
+    cabecalho = pd.read_csv(csv_path, nrows=0).columns
+    colunas, tipos = parametros_leitura(cabecalho, analises)
+
+    if chunksize:
+        leitor = pd.read_csv(csv_path, usecols=colunas, dtype=tipos, chunksize=chunksize)
+        return (compactar(bloco) for bloco in leitor)
+
+    return compactar(pd.read_csv(csv_path, usecols=colunas, dtype=tipos))
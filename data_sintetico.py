@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gerador determinístico de exportações sintéticas do SINAN (DENGBR)
+
+Produz CSVs com as colunas lidas pelos processadores e distribuições
+marginais próximas às da base real: participação das UFs nas notificações,
+municípios com concentração nas capitais, sazonalidade das notificações,
+pirâmide etária com NU_IDADE_N codificado (horas, dias, meses, anos),
+prevalência de cada sintoma e códigos de EVOLUCAO, incluindo campos em
+branco. Serve para medir desempenho sem depender do DENGBR25.csv.
+
+Os dados são gerados em blocos de BLOCO_GERACAO linhas, cada um com a sua
+semente derivada de (semente, índice do bloco): a mesma semente gera sempre
+o mesmo arquivo, e o arquivo de n linhas é o início do arquivo de m > n
+linhas, o que permite comparar tamanhos diferentes sobre os mesmos dados.
+"""
+
+import numpy as np
+import pandas as pd
+
+BLOCO_GERACAO = 100_000
+
+# Participação aproximada de cada UF nas notificações de dengue
+PARTICIPACAO_UF = {
+    35: 0.330, 31: 0.250, 41: 0.105, 52: 0.060, 42: 0.050, 53: 0.040,
+    33: 0.030, 43: 0.030, 29: 0.020, 32: 0.015, 51: 0.010, 50: 0.010,
+    17: 0.005, 26: 0.005, 23: 0.005, 21: 0.004, 15: 0.004, 25: 0.004,
+    24: 0.003, 22: 0.003, 28: 0.003, 27: 0.003, 11: 0.003, 13: 0.003,
+    12: 0.002, 16: 0.002, 14: 0.001,
+}
+
+# Número de municípios de cada UF
+MUNICIPIOS_POR_UF = {
+    11: 52, 12: 22, 13: 62, 14: 15, 15: 144, 16: 16, 17: 139, 21: 217,
+    22: 224, 23: 184, 24: 167, 25: 223, 26: 185, 27: 102, 28: 75, 29: 417,
+    31: 853, 32: 78, 33: 92, 35: 645, 41: 399, 42: 295, 43: 497, 50: 79,
+    51: 141, 52: 246, 53: 1,
+}
+
+# Municípios reais (código de 6 dígitos) colocados à frente da sua UF
+MUNICIPIOS_PRINCIPAIS = {
+    35: [355030, 350950, 354980, 354870],
+    31: [310620, 317020, 316720],
+    41: [410690, 411370, 411520],
+    52: [520870, 520140],
+    42: [420910, 420540, 420820, 420460, 420240],
+    53: [530010],
+    33: [330455, 330490],
+    43: [431490],
+    29: [292740],
+}
+
+# Faixas de idade (anos, fim exclusivo) e a sua participação nos casos
+FAIXAS_IDADE = [
+    (0, 1, 0.015), (1, 5, 0.030), (5, 10, 0.050), (10, 15, 0.070),
+    (15, 20, 0.080), (20, 30, 0.170), (30, 40, 0.170), (40, 50, 0.150),
+    (50, 60, 0.120), (60, 70, 0.085), (70, 80, 0.042), (80, 100, 0.018),
+]
+
+# Probabilidade de "sim" (1) em cada sintoma; os demais são "não" (2) ou em branco
+PREVALENCIA_SINTOMAS = {
+    'FEBRE': 0.88, 'MIALGIA': 0.78, 'CEFALEIA': 0.80,
+    'EXANTEMA': 0.15, 'VOMITO': 0.22, 'NAUSEA': 0.40,
+}
+SINTOMA_EM_BRANCO = 0.08
+
+# EVOLUCAO: 1 cura, 2 óbito pelo agravo, 3 óbito por outras causas,
+# 4 óbito em investigação, 9 ignorado; o restante fica em branco
+PROBABILIDADE_EVOLUCAO = {1: 0.82, 2: 0.0007, 3: 0.0005, 4: 0.0008, 9: 0.05}
+
+PROBABILIDADE_SEXO = {'F': 0.54, 'M': 0.455, 'I': 0.005}
+
+# CLASSI_FIN: 10 dengue, 11 com sinais de alarme, 12 grave, 5 descartado, 8 inconclusivo
+PROBABILIDADE_CLASSIFICACAO = {10: 0.62, 11: 0.015, 12: 0.001, 5: 0.30, 8: 0.064}
+
+
+def _tabela_municipios():
+    """
+    Códigos de município, UF e probabilidade conjunta de cada um
+
+    Dentro da UF, o peso decai com a posição (lei de Zipf), com os
+    municípios principais nas primeiras posições.
+    """
+    codigos, ufs, probabilidades = [], [], []
+    total_uf = sum(PARTICIPACAO_UF.values())
+
+    for uf, quantidade in MUNICIPIOS_POR_UF.items():
+        principais = MUNICIPIOS_PRINCIPAIS.get(uf, [])
+        demais = [uf * 10000 + 10 * k for k in range(1, 1000)
+                  if uf * 10000 + 10 * k not in principais]
+        municipios = (principais + demais)[:quantidade]
+
+        pesos = 1.0 / np.arange(1, len(municipios) + 1) ** 1.1
+        pesos = pesos / pesos.sum() * PARTICIPACAO_UF[uf] / total_uf
+
+        codigos.extend(municipios)
+        ufs.extend([uf] * len(municipios))
+        probabilidades.extend(pesos)
+
+    probabilidades = np.array(probabilidades)
+    return np.array(codigos, dtype=np.int32), np.array(ufs, dtype=np.int8), probabilidades / probabilidades.sum()
+
+
+# Dias entre o início dos sintomas e a notificação: de 0 a ATRASO_MAXIMO
+ATRASO_MAXIMO = 7
+
+
+def _sazonalidade(ano):
+    """
+    Datas (texto) e probabilidade de notificação de cada dia do ano
+
+    As datas começam ATRASO_MAXIMO dias antes do ano, para os inícios de
+    sintomas de notificações do começo de janeiro; a probabilidade desses
+    dias é zero. O pico das notificações fica no fim de março.
+    """
+    dias = pd.date_range(pd.Timestamp(f'{ano}-01-01') - pd.Timedelta(days=ATRASO_MAXIMO),
+                         f'{ano}-12-31', freq='D')
+    posicao = np.arange(len(dias)) - ATRASO_MAXIMO
+    pesos = np.where(posicao >= 0, 0.15 + np.exp(-0.5 * ((posicao - 85) / 35.0) ** 2), 0.0)
+    return np.array(dias.strftime('%Y-%m-%d'), dtype=object), pesos / pesos.sum()
+
+
+def _escolher(rng, probabilidades, n):
+    valores = list(probabilidades.keys())
+    pesos = np.array(list(probabilidades.values()), dtype=np.float64)
+    # A sobra da probabilidade fica para o código em branco (NaN)
+    if pesos.sum() < 1 - 1e-9:
+        valores.append(None)
+        pesos = np.append(pesos, 1 - pesos.sum())
+    indices = rng.choice(len(valores), size=n, p=pesos / pesos.sum())
+    return np.array(valores, dtype=object)[indices]
+
+
+def _idades(rng, n):
+    """
+    Idade em anos (float) e NU_IDADE_N codificado como no SINAN
+    """
+    faixas = np.array([(inicio, fim) for inicio, fim, _ in FAIXAS_IDADE], dtype=np.float64)
+    pesos = np.array([peso for _, _, peso in FAIXAS_IDADE])
+    escolhidas = faixas[rng.choice(len(faixas), size=n, p=pesos / pesos.sum())]
+    idade = escolhidas[:, 0] + rng.random(n) * (escolhidas[:, 1] - escolhidas[:, 0])
+
+    codigo = 4000 + np.floor(idade)
+    # Menores de 1 ano: meses, ou dias/horas para os recém-nascidos
+    bebe = idade < 1
+    meses = np.floor(idade * 12)
+    dias = np.floor(idade * 365.25)
+    codigo = np.where(bebe, 3000 + meses, codigo)
+    codigo = np.where(bebe & (meses == 0), 2000 + dias, codigo)
+    codigo = np.where(bebe & (dias == 0), 1000 + rng.integers(1, 24, n), codigo)
+
+    return idade, codigo
+
+
+def _gerar_bloco(indice, semente, ano, municipios, datas):
+    rng = np.random.default_rng([semente, indice])
+    n = BLOCO_GERACAO
+    codigos_municipio, ufs, probabilidade_municipio = municipios
+    dias, probabilidade_dia = datas
+
+    municipio = rng.choice(len(codigos_municipio), size=n, p=probabilidade_municipio)
+    notificacao = rng.choice(len(dias), size=n, p=probabilidade_dia)
+    sintomas_iniciais = notificacao - rng.integers(0, ATRASO_MAXIMO + 1, n)
+
+    idade, nu_idade_n = _idades(rng, n)
+    ano_nasc = ano - np.floor(idade) - (rng.random(n) < 0.5)
+    ano_nasc = np.where(rng.random(n) < 0.08, np.nan, ano_nasc)
+    nu_idade_n = np.where(rng.random(n) < 0.01, np.nan, nu_idade_n)
+
+    bloco = pd.DataFrame({
+        'TP_NOT': 2,
+        'ID_AGRAVO': 'A90',
+        'DT_NOTIFIC': dias[notificacao],
+        'NU_NOTIFIC': np.char.zfill(np.arange(indice * n + 1, (indice + 1) * n + 1).astype(str), 7),
+        'NU_ANO': ano,
+        'SG_UF_NOT': ufs[municipio],
+        'ID_MUNICIP': codigos_municipio[municipio],
+        'DT_SIN_PRI': dias[sintomas_iniciais],
+        'ANO_NASC': pd.array(ano_nasc, dtype='Int16'),
+        'NU_IDADE_N': pd.array(nu_idade_n, dtype='Int16'),
+        'CS_SEXO': _escolher(rng, PROBABILIDADE_SEXO, n),
+        'ID_MN_RESI': codigos_municipio[municipio],
+    })
+
+    for sintoma, prevalencia in PREVALENCIA_SINTOMAS.items():
+        sorteio = rng.random(n)
+        valores = np.where(sorteio < prevalencia, 1.0, 2.0)
+        valores[rng.random(n) < SINTOMA_EM_BRANCO] = np.nan
+        bloco[sintoma] = pd.array(valores, dtype='Int8')
+
+    bloco['CLASSI_FIN'] = pd.array(_escolher(rng, PROBABILIDADE_CLASSIFICACAO, n), dtype='Int8')
+    bloco['CRITERIO'] = rng.choice([1, 2, 3], size=n, p=[0.35, 0.60, 0.05])
+    bloco['EVOLUCAO'] = pd.array(_escolher(rng, PROBABILIDADE_EVOLUCAO, n), dtype='Int8')
+    return bloco
+
+
+def gerar_dengbr(n_linhas, semente=0, ano=2025):
+    """
+    Gera a exportação sintética em blocos (iterador de DataFrames)
+
+    Os blocos têm BLOCO_GERACAO linhas, exceto o último.
+    """
+    municipios = _tabela_municipios()
+    datas = _sazonalidade(ano)
+
+    blocos = -(-n_linhas // BLOCO_GERACAO)
+    for indice in range(blocos):
+        bloco = _gerar_bloco(indice, semente, ano, municipios, datas)
+        restantes = n_linhas - indice * BLOCO_GERACAO
+        if restantes < BLOCO_GERACAO:
+            bloco = bloco.iloc[:restantes]
+        yield bloco
+
+
+def gerar_csv(caminho, n_linhas, semente=0, ano=2025):
+    """
+    Grava a exportação sintética em CSV, bloco a bloco (memória constante)
+    """
+    for indice, bloco in enumerate(gerar_dengbr(n_linhas, semente, ano)):
+        bloco.to_csv(caminho, mode='w' if indice == 0 else 'a', header=indice == 0, index=False)
+    return caminho
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera uma exportação sintética do SINAN (dengue)")
+    parser.add_argument('linhas', type=int, help="Número de notificações")
+    parser.add_argument('saida', help="Arquivo CSV de saída")
+    parser.add_argument('--semente', type=int, default=0, help="Semente do gerador (padrão: 0)")
+    parser.add_argument('--ano', type=int, default=2025, help="Ano das notificações (padrão: 2025)")
+    args = parser.parse_args()
+
+    gerar_csv(args.saida, args.linhas, args.semente, args.ano)
+    print(f"{args.linhas:,} notificações gravadas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,33 @@ const api = axios.create({
     }
 });
 
+// As cargas de estatísticas rodam em segundo plano no backend: acompanha a
+// tarefa até terminar (uma carga já em andamento, 409, também é aguardada)
+const aguardarTarefa = async (response, intervalo = 1000) => {
+    let tarefa = response.data.tarefa;
+
+    while (tarefa.status === 'pendente' || tarefa.status === 'executando') {
+        await new Promise((resolve) => setTimeout(resolve, intervalo));
+        tarefa = (await api.get(`/tarefas/${tarefa.id}/`)).data;
+    }
+
+    if (tarefa.status === 'falhou') {
+        throw new Error(tarefa.erro);
+    }
+    return { ...response, data: tarefa };
+};
+
+const iniciarCarga = (url) => {
+    return api.post(url)
+        .catch((err) => {
+            if (err.response?.status === 409 && err.response.data.tarefa) {
+                return err.response;
+            }
+            throw err;
+        })
+        .then(aguardarTarefa);
+};
+
 // Serviço de API com métodos específicos
 export const apiService = {
     // Verificação de saúde da API
@@ -51,9 +78,14 @@ export const apiService = {
         return api.get('/santa-catarina');
     },
 
-    // Carregar estatísticas do arquivo JSON
+    // Carregar estatísticas do arquivo JSON (aguarda a tarefa terminar)
     loadStatistics: () => {
-        return api.post('/carregar-estatisticas');
+        return iniciarCarga('/carregar-estatisticas/');
+    },
+
+    // Status e progresso de uma tarefa de carga
+    getTarefa: (id) => {
+        return api.get(`/tarefas/${id}/`);
     },
 
     // API Avançada
@@ -78,9 +110,9 @@ export const apiService = {
         return api.get('/avancado/sintomas-por-perfil');
     },
 
-    // Carregar estatísticas avançadas do arquivo JSON
+    // Carregar estatísticas avançadas do arquivo JSON (aguarda a tarefa terminar)
     loadAdvancedStatistics: () => {
-        return api.post('/avancado/carregar-estatisticas');
+        return iniciarCarga('/avancado/carregar-estatisticas/');
     }
 };
 
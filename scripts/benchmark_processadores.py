@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos processadores sobre exportações sintéticas do SINAN
+
+Gera (uma vez, em --dados-dir) CSVs sintéticos de cada tamanho pedido com
+data_sintetico.py e roda cada processador sobre eles num processo separado,
+coletando o perfil por etapa de data_metricas.py: tempo, CPU, linhas/s e
+pico de memória. O resultado é um JSON com o commit atual, que pode ser
+comparado com o de outro commit via --comparar.
+
+Exemplos:
+    python scripts/benchmark_processadores.py --linhas 10000 1000000
+    python scripts/benchmark_processadores.py --processadores avancado --chunksize 500000 --workers 4
+    python scripts/benchmark_processadores.py --saida novo.json --comparar antigo.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from data_sintetico import gerar_csv  # noqa: E402
+
+PROCESSADORES = {
+    'simples': ('data_processor', 'DengueDataProcessor'),
+    'fixed': ('data_processor_fixed', 'DengueAdvancedProcessor'),
+    'avancado': ('data_processor_advanced', 'DengueAdvancedProcessor'),
+}
+
+# Executado no processo filho: roda o processador e grava o perfil
+EXECUTAR = """
+import sys
+from {modulo} import {classe}
+processor = {classe}({csv!r}, perfil_path={perfil!r}, **{opcoes!r})
+sys.exit(0 if processor.process_all() else 1)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark dos processadores de dados de dengue")
+    parser.add_argument(
+        '--linhas', type=int, nargs='+', default=[100000],
+        help="Tamanhos (número de notificações) dos CSVs sintéticos (padrão: 100000)"
+    )
+    parser.add_argument(
+        '--processadores', nargs='+', choices=list(PROCESSADORES), default=list(PROCESSADORES),
+        help="Processadores a medir (padrão: todos)"
+    )
+    parser.add_argument(
+        '--chunksize', type=int, default=None,
+        help="Mede também o processador avançado em blocos deste tamanho"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help="Mede também o processador avançado em paralelo com este número de processos"
+    )
+    parser.add_argument(
+        '--repeticoes', type=int, default=1,
+        help="Execuções de cada caso; fica a mais rápida (padrão: 1)"
+    )
+    parser.add_argument(
+        '--semente', type=int, default=0,
+        help="Semente do gerador sintético (padrão: 0)"
+    )
+    parser.add_argument(
+        '--dados-dir', default='Documentos/sintetico',
+        help="Onde guardar os CSVs sintéticos, reaproveitados entre execuções"
+    )
+    parser.add_argument(
+        '--saida', default='benchmark_processadores.json',
+        help="Arquivo JSON com os resultados"
+    )
+    parser.add_argument(
+        '--comparar', metavar='ANTERIOR', default=None,
+        help="JSON de um benchmark anterior para comparar tempos e memória"
+    )
+    return parser.parse_args()
+
+
+def commit_atual():
+    try:
+        resultado = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+            capture_output=True, text=True, check=True
+        )
+        return resultado.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def csv_sintetico(dados_dir, linhas, semente):
+    """
+    Caminho do CSV sintético, gerando-o se ainda não existir
+    """
+    os.makedirs(dados_dir, exist_ok=True)
+    caminho = os.path.abspath(os.path.join(dados_dir, f'dengbr_sintetico_{linhas}_s{semente}.csv'))
+    if not os.path.exists(caminho):
+        print(f"Gerando {linhas:,} notificações sintéticas em {caminho}...")
+        temporario = caminho + '.tmp'
+        gerar_csv(temporario, linhas, semente)
+        os.replace(temporario, caminho)
+    return caminho
+
+
+def casos(args):
+    """
+    (processador, modo, opções) de cada caso a medir
+    """
+    lista = [(nome, 'memoria', {}) for nome in args.processadores]
+    if 'avancado' in args.processadores:
+        if args.chunksize:
+            lista.append(('avancado', 'streaming', {'chunksize': args.chunksize}))
+        if args.workers:
+            opcoes = {'workers': args.workers}
+            if args.chunksize:
+                opcoes['chunksize'] = args.chunksize
+            lista.append(('avancado', 'paralelo', opcoes))
+    return lista
+
+
+def executar(processador, opcoes, csv):
+    """
+    Roda o processador num processo novo (memória isolada) e devolve o perfil
+    """
+    modulo, classe = PROCESSADORES[processador]
+    with tempfile.TemporaryDirectory() as trabalho:
+        perfil = os.path.join(trabalho, 'perfil.json')
+        codigo = EXECUTAR.format(modulo=modulo, classe=classe, csv=csv, perfil=perfil, opcoes=opcoes)
+        ambiente = dict(os.environ, PYTHONPATH=RAIZ)
+
+        inicio = time.perf_counter()
+        resultado = subprocess.run(
+            [sys.executable, '-c', codigo], cwd=trabalho, env=ambiente,
+            capture_output=True, text=True
+        )
+        tempo_processo = time.perf_counter() - inicio
+
+        if resultado.returncode != 0 or not os.path.exists(perfil):
+            saida = (resultado.stdout[-2000:] + resultado.stderr[-2000:]).strip()
+            raise RuntimeError(f"{processador} falhou (código {resultado.returncode}):\n{saida}")
+
+        with open(perfil, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+
+    dados['tempo_processo_s'] = round(tempo_processo, 4)
+    return dados
+
+
+def medir(processador, modo, opcoes, linhas, csv, repeticoes):
+    execucoes = [executar(processador, opcoes, csv) for _ in range(repeticoes)]
+    melhor = min(execucoes, key=lambda perfil: perfil['tempo_total_s'])
+    tempo = melhor['tempo_total_s']
+
+    return {
+        'processador': processador,
+        'modo': modo,
+        'opcoes': opcoes,
+        'linhas': linhas,
+        'tamanho_csv_mb': round(os.path.getsize(csv) / (1024 * 1024), 2),
+        'tempo_total_s': tempo,
+        'tempos_s': [perfil['tempo_total_s'] for perfil in execucoes],
+        'tempo_processo_s': melhor['tempo_processo_s'],
+        'cpu_total_s': melhor['cpu_total_s'],
+        'linhas_por_s': round(linhas / tempo, 1) if tempo > 0 else None,
+        'pico_rss_mb': melhor['pico_rss_mb'],
+        'etapas': melhor['etapas'],
+    }
+
+
+def _chave(resultado):
+    return (resultado['processador'], resultado['modo'], resultado['linhas'])
+
+
+def comparar(atual, anterior):
+    """
+    Imprime a razão atual/anterior do tempo e do pico de memória de cada caso
+    """
+    anteriores = {_chave(resultado): resultado for resultado in anterior['resultados']}
+
+    print(f"\nComparação com {anterior.get('commit') or 'benchmark anterior'} (atual / anterior):")
+    for resultado in atual['resultados']:
+        base = anteriores.get(_chave(resultado))
+        rotulo = f"{resultado['processador']:<9} {resultado['modo']:<10} {resultado['linhas']:>11,}"
+        if base is None:
+            print(f"  {rotulo}  sem correspondente")
+            continue
+
+        razao_tempo = resultado['tempo_total_s'] / base['tempo_total_s'] if base['tempo_total_s'] else float('nan')
+        razao_memoria = resultado['pico_rss_mb'] / base['pico_rss_mb'] if base['pico_rss_mb'] else float('nan')
+        print(f"  {rotulo}  tempo {razao_tempo:6.2f}x  memória {razao_memoria:6.2f}x")
+
+        etapas_base = {etapa['etapa']: etapa for etapa in base['etapas']}
+        for etapa in resultado['etapas']:
+            anterior_etapa = etapas_base.get(etapa['etapa'])
+            if anterior_etapa and anterior_etapa['tempo_s']:
+                print(f"      {etapa['etapa']:<32} {etapa['tempo_s'] / anterior_etapa['tempo_s']:6.2f}x")
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 80)
+    print("BENCHMARK DOS PROCESSADORES DE DADOS DE DENGUE")
+    print("=" * 80)
+
+    resultados = []
+    for linhas in args.linhas:
+        csv = csv_sintetico(args.dados_dir, linhas, args.semente)
+        for processador, modo, opcoes in casos(args):
+            print(f"Medindo {processador} ({modo}) com {linhas:,} linhas...")
+            try:
+                resultado = medir(processador, modo, opcoes, linhas, csv, args.repeticoes)
+            except RuntimeError as e:
+                print(f"ERRO: {e}")
+                return False
+            resultados.append(resultado)
+            print(f"  {resultado['tempo_total_s']:.2f}s  {resultado['linhas_por_s']:,.0f} linhas/s  "
+                  f"pico {resultado['pico_rss_mb']:.0f} MB")
+
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(),
+        'commit': commit_atual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'semente': args.semente,
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            comparar(relatorio, json.load(f))
+
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -5,16 +5,55 @@ Script para executar o processador avançado de dados de dengue
 """
 
 from data_processor_advanced import DengueAdvancedProcessor
+import argparse
 import os
 import sys
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Processador avançado de dados de dengue")
+    parser.add_argument(
+        '--chunksize', type=int, default=None,
+        help="Processa o CSV em blocos deste número de linhas (modo streaming, memória limitada)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help="Número de processos para o modo paralelo (padrão: serial)"
+    )
+    parser.add_argument(
+        '--csv', default='Documentos/DENGBR25.csv',
+        help="Exportação do SINAN a processar"
+    )
+    parser.add_argument(
+        '--incremental', metavar='ESTADO_DIR', default=None,
+        help="Aplica o CSV como nova exportação ao estado salvo neste diretório, processando só a diferença"
+    )
+    parser.add_argument(
+        '--perfil', metavar='ARQUIVO', default=None,
+        help="Grava tempo, CPU, linhas e pico de memória de cada etapa neste arquivo JSON"
+    )
+    parser.add_argument(
+        '--rastrear-alocacoes', action='store_true',
+        help="Mede também o pico de memória alocada por etapa (tracemalloc; deixa o processamento mais lento)"
+    )
+    parser.add_argument(
+        '--cache-dir', default='Documentos/cache',
+        help="Diretório do cache colunar (Feather) do CSV já convertido"
+    )
+    parser.add_argument(
+        '--sem-cache', action='store_true',
+        help="Ignora o cache colunar e sempre relê o CSV"
+    )
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     print("=" * 80)
     print("PROCESSADOR AVANÇADO DE DADOS DE DENGUE")
     print("=" * 80)
     
     # Verificar se o arquivo CSV existe
-    csv_path = 'Documentos/DENGBR25.csv'
+    csv_path = args.csv
     
     if not os.path.exists(csv_path):
         print(f"Erro: O arquivo {csv_path} não foi encontrado.")
@@ -23,7 +62,15 @@ def main():
     
     # Criar e executar o processador avançado
     try:
-        processor = DengueAdvancedProcessor(csv_path)
+        processor = DengueAdvancedProcessor(
+            csv_path,
+            chunksize=args.chunksize,
+            workers=args.workers,
+            estado_dir=args.incremental,
+            perfil_path=args.perfil,
+            rastrear_alocacoes=args.rastrear_alocacoes,
+            cache_dir=None if args.sem_cache else args.cache_dir
+        )
         success = processor.process_all()
         
         if success:
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from data_processor import DengueDataProcessor
+from data_processor_advanced import DengueAdvancedProcessor
+from data_processor_fixed import DengueAdvancedProcessor as DengueAdvancedProcessorFixed
+from data_sintetico import gerar_csv
+
+
+class CelulasEmBrancoTests(unittest.TestCase):
+    """
+    NU_ANO e SG_UF_NOT em branco viram NA (Int16/Int8) e não podem quebrar nenhum modo
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.diretorio = tempfile.TemporaryDirectory()
+        cls.csv = gerar_csv(os.path.join(cls.diretorio.name, 'sintetico.csv'), 3000, semente=2)
+        df = pd.read_csv(cls.csv, dtype=str, keep_default_na=False)
+        df.loc[[5, 17, 400], 'NU_ANO'] = ''
+        df.loc[[8, 17, 900], 'SG_UF_NOT'] = ''
+        df.to_csv(cls.csv, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.diretorio.cleanup()
+
+    def setUp(self):
+        anterior = os.getcwd()
+        saida = tempfile.TemporaryDirectory()
+        self.addCleanup(saida.cleanup)
+        self.addCleanup(os.chdir, anterior)
+        os.chdir(saida.name)
+
+    def _processar(self, processador, arquivo='dengue_advanced_statistics.json'):
+        self.assertIs(processador.process_all(), True)
+        with open(arquivo, encoding='utf-8') as f:
+            stats = json.load(f)
+        stats.pop('metadata', None)
+        return stats
+
+    def test_todos_os_modos_do_processador_avancado(self):
+        memoria = self._processar(DengueAdvancedProcessor(self.csv))
+        self.assertEqual(memoria['geral']['anos_disponiveis'], [2025])
+        self.assertNotIn('<NA>', memoria['por_estado']['uf'])
+
+        modos = {
+            'streaming': {'chunksize': 700},
+            'paralelo': {'workers': 2},
+            'incremental': {'estado_dir': os.path.join(os.getcwd(), 'estado')},
+        }
+        for modo, opcoes in modos.items():
+            with self.subTest(modo=modo):
+                self.assertEqual(self._processar(DengueAdvancedProcessor(self.csv, **opcoes)), memoria)
+
+    def test_processadores_basico_e_corrigido(self):
+        self.assertIs(DengueDataProcessor(self.csv).process_all(), True)
+        self.assertIs(DengueAdvancedProcessorFixed(self.csv).process_all(), True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_idade import (
+    UNIDADES_LEGADO, idade_em_anos, idade_por_codigo, idade_por_nascimento
+)
+
+
+def _referencia_avancado(df):
+    """
+    Cálculo anterior de data_processor_advanced.py (apply por linha)
+    """
+    idade = df['NU_ANO'] - df['ANO_NASC']
+    return idade.apply(lambda x: x if pd.notna(x) and 0 <= x <= 120 else pd.NA)
+
+
+def _referencia_fixed(nu_idade_n):
+    """
+    Cálculo anterior de data_processor_fixed.py (máscaras com .loc)
+    """
+    df = pd.DataFrame({'NU_IDADE_N': nu_idade_n})
+    df['IDADE_ANOS'] = np.nan
+
+    mask_anos = df['NU_IDADE_N'] < 1000
+    df.loc[mask_anos, 'IDADE_ANOS'] = df.loc[mask_anos, 'NU_IDADE_N']
+
+    mask_codificados = df['NU_IDADE_N'] >= 1000
+    # Reindexados para alinhar com mask_codificados nas máscaras abaixo
+    unidade = (df.loc[mask_codificados, 'NU_IDADE_N'] // 1000).astype(int).reindex(df.index)
+    valor = (df.loc[mask_codificados, 'NU_IDADE_N'] % 1000).reindex(df.index)
+
+    for codigo, divisor in ((1, 365), (2, 12), (3, 1)):
+        mascara = mask_codificados & (unidade == codigo)
+        df.loc[mascara, 'IDADE_ANOS'] = valor[mascara] / divisor
+
+    return df['IDADE_ANOS']
+
+
+class IdadeTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        ano_nasc = pd.array(rng.integers(1880, 2030, n), dtype='Int16')
+        ano_nasc[rng.random(n) < 0.1] = pd.NA
+        nu_idade_n = pd.array(rng.integers(0, 5000, n), dtype='Int16')
+        nu_idade_n[rng.random(n) < 0.1] = pd.NA
+        self.df = pd.DataFrame({
+            'NU_ANO': pd.array(np.full(n, 2025), dtype='Int16'),
+            'ANO_NASC': ano_nasc,
+            'NU_IDADE_N': nu_idade_n,
+        })
+
+    def test_igual_ao_processador_avancado(self):
+        esperado = pd.to_numeric(_referencia_avancado(self.df), errors='coerce').to_numpy(dtype=float)
+        np.testing.assert_array_equal(idade_em_anos(self.df), esperado)
+
+    def test_igual_ao_processador_fixed(self):
+        esperado = _referencia_fixed(self.df['NU_IDADE_N']).to_numpy(dtype=float)
+        obtido = idade_por_codigo(
+            self.df['NU_IDADE_N'], UNIDADES_LEGADO, anos_sem_unidade=True, idade_maxima=None
+        )
+        np.testing.assert_array_equal(obtido, esperado)
+
+    def test_codificacao_sinan(self):
+        obtido = idade_por_codigo(pd.Series([4035, 3006, 2730, 1012, 4130, 5010, 35, None]))
+        np.testing.assert_allclose(
+            obtido, [35, 0.5, 730 / 365.25, 12 / (24 * 365.25), np.nan, np.nan, np.nan, np.nan]
+        )
+
+    def test_sem_ano_nascimento_usa_nu_idade_n(self):
+        df = self.df.drop(columns=['ANO_NASC'])
+        np.testing.assert_array_equal(idade_em_anos(df), idade_por_codigo(df['NU_IDADE_N']))
+
+    def test_valores_nao_numericos(self):
+        obtido = idade_por_nascimento(pd.Series(['2025', '2025', 'x']), pd.Series(['1990', '', '2000']))
+        np.testing.assert_array_equal(obtido, [35, np.nan, np.nan])
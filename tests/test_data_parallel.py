@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from data_parallel import _TrechoArquivo, particionar_csv
+
+
+class TrechoArquivoTests(unittest.TestCase):
+    def setUp(self):
+        descritor, self.csv = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, self.csv)
+        with os.fdopen(descritor, 'w') as f:
+            f.write('A,B\n' + ''.join(f'{i},{i * 2}\n' for i in range(10)))
+
+    def _trechos(self):
+        for inicio, fim in particionar_csv(self.csv, 3):
+            with open(self.csv, 'rb') as f:
+                f.seek(inicio)
+                yield inicio, fim, _TrechoArquivo(f, fim - inicio)
+
+    def test_iteracao_por_linhas_para_no_fim_do_trecho(self):
+        with open(self.csv, 'rb') as f:
+            linhas = f.readlines()[1:]
+
+        lidas = []
+        for inicio, fim, trecho in self._trechos():
+            linhas_trecho = list(trecho)
+            self.assertEqual(sum(map(len, linhas_trecho)), fim - inicio)
+            lidas.extend(linhas_trecho)
+        self.assertEqual(lidas, linhas)
+
+    def test_leitura_pelo_motor_python(self):
+        partes = []
+        for _, _, trecho in self._trechos():
+            partes.append(pd.read_csv(trecho, header=None, names=['A', 'B'], engine='python'))
+        pd.testing.assert_frame_equal(pd.concat(partes, ignore_index=True), pd.read_csv(self.csv))
+
+
+if __name__ == '__main__':
+    unittest.main()
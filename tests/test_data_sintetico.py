@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_idade import idade_em_anos
+from data_schema import ler_csv_sinan
+from data_sintetico import BLOCO_GERACAO, PARTICIPACAO_UF, gerar_csv, gerar_dengbr
+
+
+def _gerar(n_linhas, semente=0):
+    return pd.concat(gerar_dengbr(n_linhas, semente), ignore_index=True)
+
+
+class GeradorSinteticoTests(unittest.TestCase):
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        pd.testing.assert_frame_equal(_gerar(5000, semente=3), _gerar(5000, semente=3))
+        self.assertFalse(_gerar(5000, semente=3).equals(_gerar(5000, semente=4)))
+
+    def test_arquivo_menor_e_inicio_do_maior(self):
+        maior = _gerar(BLOCO_GERACAO + 500)
+        menor = _gerar(BLOCO_GERACAO - 10)
+
+        self.assertEqual(len(maior), BLOCO_GERACAO + 500)
+        pd.testing.assert_frame_equal(maior.iloc[:len(menor)], menor)
+        self.assertTrue(maior['NU_NOTIFIC'].is_unique)
+
+    def test_distribuicoes_marginais(self):
+        df = _gerar(BLOCO_GERACAO)
+
+        participacao = df['SG_UF_NOT'].value_counts(normalize=True)
+        self.assertAlmostEqual(participacao[35], PARTICIPACAO_UF[35], delta=0.01)
+        self.assertAlmostEqual(participacao[42], PARTICIPACAO_UF[42], delta=0.005)
+        self.assertTrue((df['ID_MUNICIP'] // 10000 == df['SG_UF_NOT']).all())
+
+        self.assertAlmostEqual((df['FEBRE'] == 1).sum() / len(df), 0.88 * 0.92, delta=0.01)
+        self.assertTrue(set(df['EVOLUCAO'].dropna().unique()) <= {1, 2, 3, 4, 9})
+
+        unidades = set((df['NU_IDADE_N'].dropna() // 1000).unique())
+        self.assertEqual(unidades, {1, 2, 3, 4})
+
+    def test_csv_lido_pelo_esquema_dos_processadores(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = gerar_csv(os.path.join(diretorio, 'sintetico.csv'), 2000, semente=1)
+            df = ler_csv_sinan(caminho, ['geral', 'idade', 'sintomas', 'genero_detalhado'])
+
+        self.assertEqual(len(df), 2000)
+        idade = idade_em_anos(df)
+        self.assertGreater(np.isfinite(idade).mean(), 0.9)
+        self.assertLessEqual(np.nanmax(idade), 101)
+
+
+if __name__ == '__main__':
+    unittest.main()